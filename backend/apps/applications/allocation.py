@@ -0,0 +1,159 @@
+"""
+Offer Allocation Engine for the HireSphereX Project.
+
+Resolves a multi-job drive's results in one pass: students rank the drive's jobs through
+`JobPreference.preference_order`, the company ranks the students it would hire for each job and
+gives each job a capacity, and the engine assigns every student at most one `offered_job`.
+
+ALGORITHM:
+==========
+Student-proposing deferred acceptance (Gale-Shapley), which yields the stable matching that is
+best for every student: no student and job would both rather be matched to each other than to
+what they were given, and no student can do better by misreporting their preferences.
+
+1. Every free student proposes to their most preferred job they have not proposed to yet.
+   Jobs that did not rank the student are skipped.
+2. A job keeps its `capacity` best-ranked proposers so far and releases the rest, who propose again.
+3. This repeats until every student is held by a job or has run out of jobs.
+
+Students and jobs are numbered 0..n-1 / 0..m-1 and all state lives in flat `array`s (rank tables,
+next-proposal pointers, assignments) plus one heap per job, so a 3,000-applicant, 15-job drive is
+resolved in milliseconds.
+"""
+import time
+import heapq
+from array import array
+from .models import CompanyDriveApplication, JobPreference
+from .transitions import apply_status_transitions
+
+UNRANKED = -1
+
+
+def deferred_acceptance(student_preferences, job_ranks, capacities):
+    """
+    Runs student-proposing deferred acceptance on numbered students and jobs.
+
+    Args:
+        student_preferences (list): For each student, an `array` of job numbers, most preferred first.
+        job_ranks (list): For each job, an `array` indexed by student number holding the company's
+                          rank of that student (0 = best), or UNRANKED if the job would not hire them.
+        capacities (sequence): For each job, the number of students it can take.
+
+    Returns:
+        array: For each student, the job number they are matched to, or -1.
+    """
+    student_count = len(student_preferences)
+    matched = array('l', [-1]) * student_count
+    next_choice = array('l', [0]) * student_count
+    # Per job, a max-heap of (-rank, student) so the worst held student is found in O(1).
+    held = [[] for _ in capacities]
+    free = list(range(student_count))
+
+    while free:
+        student = free.pop()
+        preferences = student_preferences[student]
+        while next_choice[student] < len(preferences):
+            job = preferences[next_choice[student]]
+            next_choice[student] += 1
+            rank = job_ranks[job][student]
+            if rank == UNRANKED or capacities[job] == 0:
+                continue
+
+            if len(held[job]) < capacities[job]:
+                heapq.heappush(held[job], (-rank, student))
+                matched[student] = job
+                break
+            worst_rank, worst_student = held[job][0]
+            if rank < -worst_rank:
+                heapq.heapreplace(held[job], (-rank, student))
+                matched[student] = job
+                matched[worst_student] = -1
+                free.append(worst_student)
+                break
+    return matched
+
+
+def allocate_offers(company_drive, job_inputs, dry_run=True):
+    """
+    Allocates offers for `company_drive` among its 'Applied' applications.
+
+    Args:
+        company_drive (CompanyDrive): The drive.
+        job_inputs (list): One dict per job: `job` (id), `capacity` and `ranking` (the company's
+                           ranked list of enrollment numbers, best first). Jobs left out take no one.
+        dry_run (bool): If True, only returns the allocation; otherwise the offers are made
+                        through `apply_status_transitions` (one transaction, batched emails).
+
+    Returns:
+        dict: The assignments, the applicants left without an offer, per-job fill and timings.
+    """
+    applications = list(
+        CompanyDriveApplication.objects.filter(company_drive=company_drive, status='Applied').order_by('id').values_list(
+            'id', 'student__enrollment_number'
+        )
+    )
+    student_index = {application_id: index for index, (application_id, _) in enumerate(applications)}
+    enrollment_index = {enrollment_number: index for index, (_, enrollment_number) in enumerate(applications)}
+    job_ids = [job_input['job'] for job_input in job_inputs]
+    job_index = {job_id: index for index, job_id in enumerate(job_ids)}
+
+    student_preferences = [array('l') for _ in applications]
+    preference_orders = [{} for _ in applications]
+    for application_id, job_id, preference_order in JobPreference.objects.filter(
+        drive_application__company_drive=company_drive, drive_application__status='Applied', job_id__in=job_ids
+    ).order_by('drive_application_id', 'preference_order').values_list('drive_application_id', 'job_id', 'preference_order'):
+        student = student_index.get(application_id)
+        if student is not None:
+            student_preferences[student].append(job_index[job_id])
+            preference_orders[student][job_id] = preference_order
+
+    job_ranks = []
+    unknown = {}
+    for job_input in job_inputs:
+        ranks = array('l', [UNRANKED]) * len(applications)
+        for rank, enrollment_number in enumerate(job_input['ranking']):
+            student = enrollment_index.get(enrollment_number)
+            if student is None:
+                unknown.setdefault(job_input['job'], []).append(enrollment_number)
+            elif ranks[student] == UNRANKED:
+                ranks[student] = rank
+        job_ranks.append(ranks)
+    capacities = array('l', [job_input['capacity'] for job_input in job_inputs])
+
+    started = time.perf_counter()
+    matched = deferred_acceptance(student_preferences, job_ranks, capacities)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    assignments, unmatched = [], []
+    filled = [0] * len(job_ids)
+    for student, (application_id, enrollment_number) in enumerate(applications):
+        job = matched[student]
+        if job == -1:
+            unmatched.append({'application': application_id, 'enrollment_number': enrollment_number})
+            continue
+        filled[job] += 1
+        assignments.append({
+            'application': application_id,
+            'enrollment_number': enrollment_number,
+            'offered_job': job_ids[job],
+            'preference_order': preference_orders[student][job_ids[job]],
+        })
+
+    if not dry_run and assignments:
+        # Re-checked under lock: if an application changed since it was read, nothing is applied.
+        apply_status_transitions([
+            {'application': assignment['application'], 'status': 'Offered', 'offered_job': assignment['offered_job']}
+            for assignment in assignments
+        ])
+
+    return {
+        'dry_run': dry_run,
+        'assignments': assignments,
+        'unmatched': unmatched,
+        'jobs': [
+            {'job': job_id, 'capacity': capacities[index], 'filled': filled[index]}
+            for index, job_id in enumerate(job_ids)
+        ],
+        'unknown_enrollment_numbers': unknown,
+        'matching_ms': round(elapsed_ms, 2),
+    }
@@ -0,0 +1,86 @@
+"""
+Application Exports for the HireSphereX Project.
+
+Streams a drive's applicant list as CSV for the company. Applications are read in keyset order
+(`id > last_id`, `EXPORT_BATCH_SIZE` at a time) as plain `.values()` rows, and every batch's job
+preferences are fetched with one extra query, so memory stays constant and the first bytes are
+sent as soon as the first batch has been read.
+"""
+import re
+import csv
+from .models import CompanyDriveApplication, JobPreference
+
+EXPORT_BATCH_SIZE = 1000
+PHONE_OR_NUMBER = re.compile(r'[+-]?[\d\s().-]+')
+
+# (CSV header, `.values()` lookup) for every exported column except the job preferences.
+EXPORT_COLUMNS = (
+    ('Enrollment Number', 'student__enrollment_number'),
+    ('First Name', 'student__user__first_name'),
+    ('Last Name', 'student__user__last_name'),
+    ('Email', 'student__user__email'),
+    ('Phone Number', 'student__user__phone_number'),
+    ('Program', 'student__program__abbreviation'),
+    ('Degree Level', 'student__program__degree_level'),
+    ('Graduation Year', 'student__graduation_year'),
+    ('CGPA', 'student__current_cgpa'),
+    ('10th %', 'student__tenth_percentage'),
+    ('12th %', 'student__twelfth_percentage'),
+    ('Active Backlogs', 'student__active_backlogs'),
+    ('Status', 'status'),
+    ('Offered Job', 'offered_job__title'),
+    ('Applied At', 'applied_at'),
+    ('Resume', 'resume'),
+)
+
+
+class Echo:
+    """A write-only file whose `write` returns the value, so `csv.writer` can feed a generator."""
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    """Formats a value for the CSV, neutralising text a spreadsheet would run as a formula."""
+    if value is None:
+        return ''
+    value = str(value)
+    if value[:1] in ('=', '+', '-', '@') and not PHONE_OR_NUMBER.fullmatch(value):
+        return f"'{value}"
+    return value
+
+
+def iter_application_rows(company_drive, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yields one dict per application to `company_drive`, in id order, with a `job_preferences`
+    list of job titles in preference order. Only one batch is held in memory at a time.
+    """
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    applications = CompanyDriveApplication.objects.filter(company_drive=company_drive).order_by('id')
+    last_id = 0
+    while True:
+        batch = list(applications.filter(id__gt=last_id).values('id', *lookups)[:batch_size])
+        if not batch:
+            return
+
+        preferences = {}
+        for application_id, job_title in JobPreference.objects.filter(
+            drive_application_id__in=[row['id'] for row in batch]
+        ).order_by('drive_application_id', 'preference_order').values_list('drive_application_id', 'job__title'):
+            preferences.setdefault(application_id, []).append(job_title)
+
+        for row in batch:
+            row['job_preferences'] = preferences.get(row['id'], [])
+            yield row
+        last_id = batch[-1]['id']
+
+
+def stream_applications_csv(company_drive, batch_size=EXPORT_BATCH_SIZE):
+    """Yields the CSV export of `company_drive`'s applications, one encoded line at a time."""
+    writer = csv.writer(Echo())
+    yield writer.writerow([header for header, _ in EXPORT_COLUMNS] + ['Job Preferences'])
+    for row in iter_application_rows(company_drive, batch_size):
+        yield writer.writerow(
+            [_cell(row[lookup]) for _, lookup in EXPORT_COLUMNS]
+            + [_cell('; '.join(f"{order}. {title}" for order, title in enumerate(row['job_preferences'], start=1)))]
+        )
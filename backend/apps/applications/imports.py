@@ -0,0 +1,176 @@
+"""
+Round Result Imports for the HireSphereX Project.
+
+Applies a company's results spreadsheet (CSV or XLSX) to a drive's applications.
+
+FILE FORMAT:
+============
+A header row, then one row per candidate. Column names are case-insensitive:
+- `enrollment_number` (required): identifies the student's application to the drive.
+- `result` (required): `Offered` / `Selected` or `Rejected` / `Not Selected`.
+- `job` (required for offers when the drive has more than one job): the job id or title.
+
+PROCESSING:
+===========
+The file is read row by row (XLSX in openpyxl's read-only mode), and handled in chunks of
+`RESULT_IMPORT_CHUNK_SIZE` rows. Each chunk costs one `IN` lookup of the enrollment numbers, is
+checked with the same rules as the bulk status endpoint (apps.applications.transitions) and is
+applied in its own transaction, so memory use does not grow with the size of the file.
+Invalid rows are skipped and reported; the other rows are applied.
+
+XLSX files are read with `openpyxl` (in requirements.txt).
+"""
+import io
+import csv
+from django.conf import settings
+from django.db import transaction
+from apps.core.utils import chunked
+from apps.placements.models import Job
+from .transitions import check_transition, locked_applications, apply_checked_transitions
+
+REQUIRED_COLUMNS = ('enrollment_number', 'result')
+RESULT_ALIASES = {
+    'offered': 'Offered', 'offer': 'Offered', 'selected': 'Offered',
+    'rejected': 'Rejected', 'reject': 'Rejected', 'not selected': 'Rejected',
+}
+
+
+class ResultFileError(Exception):
+    """The uploaded file cannot be read as a results sheet (as opposed to a single bad row)."""
+
+
+def _normalize_header(values):
+    header = [str(value or '').strip().lower().replace(' ', '_') for value in values]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ResultFileError(f"Missing column(s): {', '.join(missing)}.")
+    return header
+
+
+def _csv_rows(upload):
+    reader = csv.reader(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''))
+    header = _normalize_header(next(reader, []))
+    for row in reader:
+        yield dict(zip(header, row))
+
+
+def _xlsx_rows(upload):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ResultFileError("XLSX files need the openpyxl package on the server. Upload a CSV file instead.")
+
+    workbook = load_workbook(upload.file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _normalize_header(next(rows, []))
+        for row in rows:
+            yield dict(zip(header, row))
+    finally:
+        workbook.close()
+
+
+def read_result_rows(upload):
+    """
+    Yields (row_number, {column: value}) for every non-empty row of an uploaded CSV or XLSX file.
+    Row numbers are as shown in a spreadsheet program (the header is row 1).
+    """
+    name = (upload.name or '').lower()
+    if name.endswith('.csv'):
+        rows = _csv_rows(upload)
+    elif name.endswith('.xlsx'):
+        rows = _xlsx_rows(upload)
+    else:
+        raise ResultFileError("Upload a .csv or .xlsx file.")
+
+    try:
+        for row_number, row in enumerate(rows, start=2):
+            row = {key: str(value).strip() if value is not None else '' for key, value in row.items()}
+            if any(row.values()):
+                yield row_number, row
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ResultFileError(f"Could not read the file: {e}")
+
+
+def _resolve_job(value, jobs_by_id, jobs_by_title):
+    """The drive's job a row refers to, by id or (case-insensitive) title; the only job if blank."""
+    if not value:
+        return next(iter(jobs_by_id.values())) if len(jobs_by_id) == 1 else None
+    if value.isdigit() and int(value) in jobs_by_id:
+        return jobs_by_id[int(value)]
+    return jobs_by_title.get(value.lower())
+
+
+def import_round_results(company_drive, upload, chunk_size=None):
+    """
+    Applies a results file to `company_drive`'s applications.
+
+    Returns:
+        dict: {'summary': {outcome: count}, 'rows': [...]}, where every row is reported as
+              {'row', 'enrollment_number', 'outcome', 'message'} with outcome 'applied',
+              'unchanged' (already in that status) or 'error'.
+
+    Raises:
+        ResultFileError: If the file itself cannot be read.
+    """
+    chunk_size = chunk_size or getattr(settings, 'RESULT_IMPORT_CHUNK_SIZE', 500)
+    jobs_by_id = Job.objects.filter(company_drive=company_drive).in_bulk()
+    jobs_by_title = {job.title.strip().lower(): job for job in jobs_by_id.values()}
+
+    report = []
+    summary = {'applied': 0, 'unchanged': 0, 'error': 0}
+    seen = set()
+
+    def add(row_number, enrollment_number, outcome, message=''):
+        report.append({'row': row_number, 'enrollment_number': enrollment_number, 'outcome': outcome, 'message': message})
+        summary[outcome] += 1
+
+    for chunk in chunked(read_result_rows(upload), chunk_size):
+        with transaction.atomic():
+            enrollment_numbers = {row.get('enrollment_number', '') for _, row in chunk}
+            applications = {
+                application.student.enrollment_number: application
+                for application in locked_applications(
+                    company_drive=company_drive, student__enrollment_number__in=enrollment_numbers
+                )
+            }
+
+            transitions = []
+            for row_number, row in chunk:
+                enrollment_number = row.get('enrollment_number', '')
+                status = RESULT_ALIASES.get(row.get('result', '').lower())
+                application = applications.get(enrollment_number)
+
+                if not enrollment_number:
+                    add(row_number, enrollment_number, 'error', "Missing enrollment number.")
+                elif enrollment_number in seen:
+                    add(row_number, enrollment_number, 'error', "Duplicate row for this enrollment number.")
+                elif status is None:
+                    add(row_number, enrollment_number, 'error', f"Unknown result '{row.get('result', '')}'.")
+                elif application is None:
+                    add(row_number, enrollment_number, 'error', "No application to this drive.")
+                else:
+                    job = _resolve_job(row.get('job', ''), jobs_by_id, jobs_by_title) if status == 'Offered' else None
+                    if application.status == status and (job is None or application.offered_job_id == job.id):
+                        add(row_number, enrollment_number, 'unchanged', f"Already {status}.")
+                        seen.add(enrollment_number)
+                    elif status == 'Offered' and job is None:
+                        add(row_number, enrollment_number, 'error', "Specify the offered job in the 'job' column.")
+                    else:
+                        error = check_transition(application, status, job)
+                        if error:
+                            add(row_number, enrollment_number, 'error', error)
+                        else:
+                            transitions.append({
+                                'application': application.id, 'status': status,
+                                'offered_job': job.id if job else None,
+                            })
+                            add(row_number, enrollment_number, 'applied', status)
+                            seen.add(enrollment_number)
+
+            if transitions:
+                apply_checked_transitions(
+                    transitions, {application.id: application for application in applications.values()}, jobs_by_id
+                )
+
+    return {'summary': summary, 'rows': report}
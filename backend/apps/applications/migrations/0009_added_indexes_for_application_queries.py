@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0008_withdraw_state_removed'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='companydriveapplication',
+            index=models.Index(fields=['student', '-applied_at'], name='application_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companydriveapplication',
+            index=models.Index(fields=['company_drive', 'status', '-applied_at'], name='application_drive_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companydriveapplication',
+            index=models.Index(condition=models.Q(('status', 'Offered')), fields=['company_drive', 'offered_job'], name='application_offered_idx'),
+        ),
+    ]
@@ -1,5 +1,55 @@
-from django.db import models
+from django.db import models, connections
+from django.utils import timezone
 from cloudinary.models import CloudinaryField
+from apps.placements.models import CompanyDrive
+
+
+class CompanyDriveApplicationQuerySet(models.QuerySet):
+    def create_if_open(self, company_drive, student, resume):
+        """
+        Creates an 'Applied' application in a single statement, only if the drive is still open and
+        its deadline has not passed, and only if the student has not applied to it already:
+
+            INSERT ... SELECT ... FROM company drive WHERE open AND before deadline
+            ON CONFLICT (company_drive_id, student_id) DO NOTHING RETURNING id
+
+        Concurrent submissions therefore cannot both succeed or fail on the unique constraint,
+        and a drive that closes between validation and insert is respected.
+
+        Returns:
+            CompanyDriveApplication: The new application, or None if nothing was inserted.
+        """
+        now = timezone.now()
+        opts = self.model._meta
+        connection = connections[self.db]
+        db_now = connection.ops.adapt_datetimefield_value(now)
+        drive_table = connection.ops.quote_name(CompanyDrive._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {connection.ops.quote_name(opts.db_table)}
+                    (company_drive_id, student_id, status, resume, applied_at, updated_at)
+                SELECT drive.id, %s, %s, %s, %s, %s
+                FROM {drive_table} drive
+                WHERE drive.id = %s AND drive.status = %s
+                    AND (drive.application_deadline IS NULL OR drive.application_deadline >= %s)
+                ON CONFLICT (company_drive_id, student_id) DO NOTHING
+                RETURNING id
+                """,
+                [student.pk, 'Applied', resume, db_now, db_now, company_drive.pk, 'Open', db_now]
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return None
+
+        application = self.model(
+            id=row[0], company_drive=company_drive, student=student, status='Applied',
+            resume=resume, applied_at=now, updated_at=now
+        )
+        application._state.adding = False
+        application._state.db = self.db
+        return application
+
 
 class CompanyDriveApplication(models.Model):
     STATUS_CHOICES = [
@@ -18,9 +68,22 @@ class CompanyDriveApplication(models.Model):
     applied_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CompanyDriveApplicationQuerySet.as_manager()
+
     class Meta:
         unique_together = ('company_drive', 'student')
         ordering = ['-applied_at']
+        indexes = [
+            # A student's own applications, newest first.
+            models.Index(fields=['student', '-applied_at'], name='application_student_idx'),
+            # A drive's applicants, optionally by status, newest first.
+            models.Index(fields=['company_drive', 'status', '-applied_at'], name='application_drive_status_idx'),
+            # Offers are a small fraction of all applications; this keeps offer lookups per drive and job cheap.
+            models.Index(
+                fields=['company_drive', 'offered_job'], condition=models.Q(status='Offered'),
+                name='application_offered_idx'
+            ),
+        ]
         
     def __str__(self):
         return f"Application for {self.job.title} by {self.student}"
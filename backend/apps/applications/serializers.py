@@ -2,10 +2,27 @@ from rest_framework import serializers
 from django.db import transaction
 from django.utils import timezone
 from apps.applications.models import CompanyDriveApplication, JobPreference
-from apps.placements.models import Job
+from apps.placements.models import Job, CompanyDrive
+from apps.placements.eligibility import eligibility_cache, annotate_job_eligibility
+
+
+class PrefetchedJobField(serializers.PrimaryKeyRelatedField):
+    """
+    A Job primary key field that first looks the job up in `context['prefetched_jobs']`
+    ({id: Job}), so a list of preferences does not cost one query per job.
+    """
+    def to_internal_value(self, data):
+        prefetched = self.context.get('prefetched_jobs')
+        if prefetched is not None:
+            try:
+                return prefetched[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
 
 
 class JobPreferenceSerializer(serializers.ModelSerializer):
+    job = PrefetchedJobField(queryset=Job.objects.all())
     job_title = serializers.CharField(source='job.title', read_only=True)
     job_drive_type = serializers.CharField(source='job.company_drive.drive_type', read_only=True)
     job_mode = serializers.CharField(source='job.company_drive.job_mode', read_only=True)
@@ -82,14 +99,8 @@ class CompanyDriveApplicationBaseSerializer(serializers.ModelSerializer):
         if company_drive.application_deadline and company_drive.application_deadline < timezone.now():
             raise serializers.ValidationError("Application deadline has passed")
 
-        if company_drive and CompanyDriveApplication.objects.filter(
-            student=student_profile, 
-            company_drive=company_drive
-        ).exists():
-            raise serializers.ValidationError({
-                'company_drive': 'You have already applied to this drive'
-            })
-
+        # Duplicates are not looked up here: the insert itself skips them (see create()),
+        # which also holds when two submissions race each other.
         return attrs
 
 
@@ -100,13 +111,34 @@ class CompanyDriveApplicationCreateSerializer(CompanyDriveApplicationBaseSeriali
     class Meta(CompanyDriveApplicationBaseSerializer.Meta):
         fields = CompanyDriveApplicationBaseSerializer.Meta.fields + ['job_preferences']
 
+    def to_internal_value(self, data):
+        """
+        Loads every job referenced by the preferences in one query, together with the student's
+        eligibility for each of them, before the nested fields are resolved.
+        """
+        preferences = data.get('job_preferences') if hasattr(data, 'get') else None
+        job_ids = set()
+        for preference in preferences if isinstance(preferences, list) else []:
+            job_id = preference.get('job') if isinstance(preference, dict) else None
+            if str(job_id).isdigit():
+                job_ids.add(int(job_id))
+
+        if job_ids:
+            jobs = Job.objects.filter(pk__in=job_ids)
+            student_profile = self.context.get('student_profile')
+            if student_profile is not None:
+                jobs = annotate_job_eligibility(jobs, student_profile)
+            self.context['prefetched_jobs'] = {job.pk: job for job in jobs}
+
+        return super().to_internal_value(data)
+
     def validate(self, attrs):
         """
         Comprehensive validation in proper order:
         1. Parent validations (drive status, duplicates)
         2. Multiple jobs allowed check
-        3. Job eligibility check
-        4. Job preference validation (via JobPreferenceSerializer)
+        3. Jobs belong to the drive
+        4. Job eligibility check (in memory, on the jobs prefetched by to_internal_value)
         """
         # 1. Run parent validations first
         attrs = super().validate(attrs)
@@ -127,7 +159,18 @@ class CompanyDriveApplicationCreateSerializer(CompanyDriveApplicationBaseSeriali
                 'job_preferences': 'This drive allows only one job application. Please select only one job.'
             })
 
-        # 3. Check eligibility for each job
+        # 3. Every job must belong to this drive, once, with a distinct preference order
+        for pref_data in job_preferences_data:
+            if pref_data['job'].company_drive_id != company_drive.id:
+                raise serializers.ValidationError({
+                    'job_preferences': f"Job \"{pref_data['job'].title}\" does not belong to this company drive."
+                })
+        if len({pref_data['job'].pk for pref_data in job_preferences_data}) != len(job_preferences_data):
+            raise serializers.ValidationError({'job_preferences': 'Each job can only be selected once.'})
+        if len({pref_data['preference_order'] for pref_data in job_preferences_data}) != len(job_preferences_data):
+            raise serializers.ValidationError({'job_preferences': 'Each preference must have a unique preference_order.'})
+
+        # 4. Check eligibility for each job
         eligibility_errors = self._validate_job_eligibility(student_profile, job_preferences_data)
         if eligibility_errors:
             raise serializers.ValidationError(eligibility_errors)
@@ -136,64 +179,106 @@ class CompanyDriveApplicationCreateSerializer(CompanyDriveApplicationBaseSeriali
 
     def _validate_job_eligibility(self, student_profile, job_preferences_data):
         """Validate eligibility for all jobs - stop at first error"""
-        for pref_data in job_preferences_data:
-            job = pref_data.get('job')
-            is_eligible, error_message = self._check_single_job_eligibility(student_profile, job)
-            
-            if not is_eligible:
-                return {'eligibility': f'Not eligible for {job.title}: {error_message}'}
+        jobs = [pref_data.get('job') for pref_data in job_preferences_data]
+        # The rules live in apps.placements.eligibility; decisions are cached per (student, job) version.
+        reasons_by_job = eligibility_cache.get_many_reasons(student_profile, jobs)
+
+        for job in jobs:
+            reasons = reasons_by_job[job.pk]
+            if reasons:
+                return {'eligibility': f'Not eligible for {job.title}: {reasons[0]}'}
         return None
 
-    def _check_single_job_eligibility(self, student_profile, job):
-        """Check eligibility for a single job"""
-        # 1. Program eligibility
-        if not job.eligible_programs.filter(id=student_profile.program.id).exists():
-            return False, "Your program is not eligible for this job"
-
-        # 2. CGPA check based on program level
-        if student_profile.program.degree_level == 'UG':
-            if job.min_ug_cgpa and student_profile.current_cgpa < job.min_ug_cgpa:
-                return False, f"UG CGPA {student_profile.current_cgpa} below required {job.min_ug_cgpa}"
-        elif student_profile.program.degree_level == 'PG':
-            if job.min_pg_cgpa and student_profile.current_cgpa < job.min_pg_cgpa:
-                return False, f"PG CGPA {student_profile.current_cgpa} below required {job.min_pg_cgpa}"
-
-        # 3. Academic percentages
-        if job.min_tenth_percentage and student_profile.tenth_percentage < job.min_tenth_percentage:
-            return False, f"10th percentage {student_profile.tenth_percentage} below required {job.min_tenth_percentage}"
-
-        if job.min_twelfth_percentage and student_profile.twelfth_percentage < job.min_twelfth_percentage:
-            return False, f"12th percentage {student_profile.twelfth_percentage} below required {job.min_twelfth_percentage}"
-
-        # 4. Backlogs check
-        if job.max_active_backlogs is not None and student_profile.active_backlogs > job.max_active_backlogs:
-            return False, f"Active backlogs {student_profile.active_backlogs} exceed maximum {job.max_active_backlogs}"
-
-        return True, "Eligible"
-
     @transaction.atomic
     def create(self, validated_data):
         """Create application and job preferences in single transaction"""
         job_preferences_data = validated_data.pop('job_preferences', [])
         
-        # Auto-assign student and create application
+        # Inserted only if the drive is still open and the student has not applied yet,
+        # checked in the same statement, so concurrent submissions cannot slip through.
         student_profile = self.context.get('student_profile')
-        validated_data['student'] = student_profile
-        application = super().create(validated_data)
+        company_drive = validated_data['company_drive']
+        application = CompanyDriveApplication.objects.create_if_open(
+            company_drive, student_profile, validated_data['resume']
+        )
+        if application is None:
+            raise serializers.ValidationError(self._rejection_reason(company_drive, student_profile))
         
         # Create job preferences (JobPreferenceSerializer validation already done)
-        for pref_data in job_preferences_data:
-            JobPreference.objects.create(
-                drive_application=application,
-                **pref_data
-            )
+        JobPreference.objects.bulk_create([
+            JobPreference(drive_application=application, **pref_data)
+            for pref_data in job_preferences_data
+        ])
         
         return application
 
+    @staticmethod
+    def _rejection_reason(company_drive, student_profile):
+        """Explains why `create_if_open` inserted nothing, from the current state of the database."""
+        if CompanyDriveApplication.objects.filter(company_drive=company_drive, student=student_profile).exists():
+            return {'company_drive': 'You have already applied to this drive'}
+        company_drive.refresh_from_db(fields=['status', 'application_deadline'])
+        if company_drive.status != 'Open':
+            return "This drive is no longer accepting applications"
+        return "Application deadline has passed"
+
 
 class CompanyDriveApplicationDetailSerializer(CompanyDriveApplicationBaseSerializer):
     """Serializer for detailed view with job preferences"""
     job_preferences = JobPreferenceSerializer(many=True, read_only=True)
 
     class Meta(CompanyDriveApplicationBaseSerializer.Meta):
-        fields = CompanyDriveApplicationBaseSerializer.Meta.fields + ['job_preferences']
\ No newline at end of file
+        fields = CompanyDriveApplicationBaseSerializer.Meta.fields + ['job_preferences']
+
+
+class StatusTransitionSerializer(serializers.Serializer):
+    """One decision in a bulk status update: move `application` to `status`."""
+    application = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=['Offered', 'Rejected'])
+    offered_job = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if attrs['status'] == 'Offered' and not attrs.get('offered_job'):
+            raise serializers.ValidationError({'offered_job': 'This field is required for offers.'})
+        return attrs
+
+
+class BulkStatusTransitionSerializer(serializers.Serializer):
+    """A batch of status transitions, e.g. the results of a round. Checked against the database by `apply_status_transitions`."""
+    transitions = StatusTransitionSerializer(many=True, allow_empty=False, max_length=1000)
+
+    def validate_transitions(self, value):
+        application_ids = [transition['application'] for transition in value]
+        if len(set(application_ids)) != len(application_ids):
+            raise serializers.ValidationError('Each application can only appear once.')
+        return value
+
+
+class RoundResultImportSerializer(serializers.Serializer):
+    """A company's results sheet (CSV or XLSX) for one drive; see apps.applications.imports for the format."""
+    company_drive = serializers.PrimaryKeyRelatedField(queryset=CompanyDrive.objects.all())
+    file = serializers.FileField()
+
+
+class JobAllocationInputSerializer(serializers.Serializer):
+    """A company's input for one job: how many it can take and whom it prefers (enrollment numbers, best first)."""
+    job = serializers.IntegerField()
+    capacity = serializers.IntegerField(min_value=0)
+    ranking = serializers.ListField(child=serializers.CharField(max_length=50), allow_empty=True)
+
+
+class OfferAllocationSerializer(serializers.Serializer):
+    """Input of the offer allocation engine (apps.applications.allocation)."""
+    company_drive = serializers.PrimaryKeyRelatedField(queryset=CompanyDrive.objects.all())
+    jobs = JobAllocationInputSerializer(many=True, allow_empty=False)
+    dry_run = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        job_ids = [job_input['job'] for job_input in attrs['jobs']]
+        if len(set(job_ids)) != len(job_ids):
+            raise serializers.ValidationError({'jobs': 'Each job can only appear once.'})
+        drive_job_ids = set(Job.objects.filter(company_drive=attrs['company_drive']).values_list('id', flat=True))
+        foreign = [job_id for job_id in job_ids if job_id not in drive_job_ids]
+        if foreign:
+            raise serializers.ValidationError({'jobs': f"Jobs {foreign} do not belong to this company drive."})
+        return attrs
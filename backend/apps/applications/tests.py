@@ -1,3 +1,818 @@
-from django.test import TestCase
+import csv
+import time
+import random
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from array import array
+from unittest import skipUnless, mock
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework.exceptions import ValidationError
+from django.utils import timezone
+from apps.users.models import User
+from apps.core.models import Degree, Program, EmailOutbox, IdempotencyKey
+from apps.core.idempotency import request_fingerprint
+from apps.companies.models import Company
+from apps.students.models import StudentProfile
+from apps.placements.models import PlacementDrive, CompanyDrive, Job, JobProgram
+from apps.applications.models import CompanyDriveApplication, JobPreference
+from apps.applications.serializers import CompanyDriveApplicationCreateSerializer
+from apps.applications.views import CompanyDriveApplicationViewSet
+from apps.applications.transitions import ALLOWED_TRANSITIONS, check_transition, apply_status_transitions
+from apps.applications.imports import import_round_results, ResultFileError
+from apps.applications.exports import iter_application_rows, stream_applications_csv
+from apps.applications.allocation import UNRANKED, deferred_acceptance, allocate_offers
 
-# Create your tests here.
+
+def create_company_drive(**fields):
+    """
+    A UG program and a drive of one company in 'Placements 2026', open for applications for a week.
+    `fields` override the drive's defaults. Returns (program, company_drive).
+    """
+    degree = Degree.objects.create(name='Bachelor of Technology', abbreviation='BTech')
+    program = Program.objects.create(
+        name='Computer Science', abbreviation='CSE', degree_level='UG', duration_years=4, degree=degree
+    )
+    company = Company.objects.create(name='Acme', email='hr@acme.com', phone_number='9999999999')
+    defaults = {
+        'drive_type': 'FullTime', 'job_mode': 'Remote', 'application_deadline': timezone.now() + timedelta(days=7),
+    }
+    company_drive = CompanyDrive.objects.create(
+        placement_drive=PlacementDrive.objects.create(title='Placements 2026'), company=company,
+        **{**defaults, **fields}
+    )
+    return program, company_drive
+
+
+class ApplicationCreateQueryCountTests(TestCase):
+    """
+    Applying is the busiest write at deadlines. Jobs and the student's eligibility for them are
+    loaded in one query, so the number of queries must not grow with the number of preferences.
+    """
+    # Job + eligibility, company drive, SAVEPOINT, conditional application INSERT
+    # (which also rejects duplicates), job preferences bulk INSERT, RELEASE SAVEPOINT.
+    EXPECTED_QUERIES = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.program, cls.company_drive = create_company_drive(multiple_allowed=True)
+        cls.jobs = []
+        for index in range(8):
+            job = Job.objects.create(
+                company_drive=cls.company_drive, title=f'Role {index}',
+                min_ug_cgpa=Decimal('7.00'), min_tenth_percentage=Decimal('60.00'), max_active_backlogs=1
+            )
+            JobProgram.objects.create(job=job, program=cls.program)
+            cls.jobs.append(job)
+
+        cls.students = []
+        for index in range(2):
+            user = User.objects.create_user(
+                email=f'student{index}@example.com', phone_number=f'90000000{index}', first_name='Student'
+            )
+            cls.students.append(StudentProfile.objects.create(
+                user=user, program=cls.program, enrollment_number=f'ENR{index}', joining_year=2023,
+                current_cgpa=Decimal('8.50'), tenth_percentage=Decimal('85.00'),
+                twelfth_percentage=Decimal('80.00'), active_backlogs=0, is_verified=True
+            ))
+
+    def setUp(self):
+        cache.clear()
+
+    def _apply(self, student, jobs):
+        student = StudentProfile.objects.select_related('program').get(pk=student.pk)
+        serializer = CompanyDriveApplicationCreateSerializer(
+            data={
+                'company_drive': self.company_drive.id,
+                'resume': 'resume.pdf',
+                'job_preferences': [
+                    {'job': job.id, 'preference_order': order} for order, job in enumerate(jobs, start=1)
+                ],
+            },
+            context={'student_profile': student}
+        )
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            return serializer.save()
+
+    def test_single_preference(self):
+        application = self._apply(self.students[0], self.jobs[:1])
+        self.assertEqual(application.job_preferences.count(), 1)
+
+    def test_query_count_does_not_grow_with_preferences(self):
+        application = self._apply(self.students[1], self.jobs)
+        self.assertEqual(application.job_preferences.count(), len(self.jobs))
+        self.assertEqual(CompanyDriveApplication.objects.count(), 1)
+
+
+@skipUnless(connection.vendor == 'postgresql', "Query plans are only checked on PostgreSQL.")
+class ApplicationQueryPlanTests(TestCase):
+    """
+    The hot application queries must be served by the indexes declared on CompanyDriveApplication,
+    not by sequential scans, once the table is large (200k rows: 2,000 students x 100 drives).
+    """
+    STUDENTS = 2000
+    DRIVES = 100
+
+    @classmethod
+    def setUpTestData(cls):
+        program, company_drive = create_company_drive(application_deadline=None)
+        drives = [company_drive] + CompanyDrive.objects.bulk_create([
+            CompanyDrive(
+                placement_drive=company_drive.placement_drive, company=company_drive.company,
+                drive_type='FullTime', job_mode='Remote'
+            )
+            for _ in range(cls.DRIVES - 1)
+        ])
+        users = User.objects.bulk_create([
+            User(email=f'student{n}@example.com', phone_number=f'plan-{n}', password='!')
+            for n in range(cls.STUDENTS)
+        ])
+        StudentProfile.objects.bulk_create([
+            StudentProfile(user=user, program=program, enrollment_number=f'PLAN{n}', joining_year=2023)
+            for n, user in enumerate(users)
+        ])
+
+        # Every student applies to every drive; about 2% of the applications are offers.
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO {CompanyDriveApplication._meta.db_table}
+                    (company_drive_id, student_id, status, resume, applied_at, updated_at)
+                SELECT drive.id, student.user_id,
+                       CASE WHEN random() < 0.02 THEN 'Offered' WHEN random() < 0.25 THEN 'Rejected' ELSE 'Applied' END,
+                       'resume.pdf', now() - random() * interval '90 days', now()
+                FROM {CompanyDrive._meta.db_table} drive CROSS JOIN {StudentProfile._meta.db_table} student
+            """)
+            cursor.execute(f"ANALYZE {CompanyDriveApplication._meta.db_table}")
+
+        cls.student = StudentProfile.objects.get(enrollment_number='PLAN42')
+        cls.company_drive = drives[7]
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+        self.assertNotIn(f"Seq Scan on {CompanyDriveApplication._meta.db_table}", plan, plan)
+
+    def test_seeded_table_size(self):
+        self.assertEqual(CompanyDriveApplication.objects.count(), self.STUDENTS * self.DRIVES)
+
+    def test_student_applications_use_student_index(self):
+        queryset = CompanyDriveApplication.objects.filter(student=self.student).order_by('-applied_at')[:20]
+        self.assertUsesIndex(queryset, 'application_student_idx')
+
+    def test_drive_applicants_by_status_use_drive_status_index(self):
+        queryset = CompanyDriveApplication.objects.filter(
+            company_drive=self.company_drive, status='Applied'
+        ).order_by('-applied_at')[:20]
+        self.assertUsesIndex(queryset, 'application_drive_status_idx')
+
+    def test_drive_offers_use_partial_index(self):
+        queryset = CompanyDriveApplication.objects.filter(company_drive=self.company_drive, status='Offered')
+        self.assertUsesIndex(queryset, 'application_offered_idx')
+
+
+def create_drive_with_students(student_count, deadline_in=timedelta(days=7)):
+    """A one-job open drive and `student_count` verified students who are all eligible for it."""
+    program, company_drive = create_company_drive(application_deadline=timezone.now() + deadline_in)
+    job = Job.objects.create(company_drive=company_drive, title='Engineer', min_ug_cgpa=Decimal('6.00'))
+    JobProgram.objects.create(job=job, program=program)
+
+    users = User.objects.bulk_create([
+        User(email=f'applicant{n}@example.com', phone_number=f'apply-{n}', password='!')
+        for n in range(student_count)
+    ])
+    students = StudentProfile.objects.bulk_create([
+        StudentProfile(
+            user=user, program=program, enrollment_number=f'APPLY{n}', joining_year=2023,
+            current_cgpa=Decimal('8.00'), tenth_percentage=Decimal('80.00'),
+            twelfth_percentage=Decimal('80.00'), is_verified=True
+        )
+        for n, user in enumerate(users)
+    ])
+    return company_drive, job, students
+
+
+def application_serializer(company_drive, job, student):
+    student = StudentProfile.objects.select_related('program').get(pk=student.pk)
+    return CompanyDriveApplicationCreateSerializer(
+        data={
+            'company_drive': company_drive.id,
+            'resume': 'resume.pdf',
+            'job_preferences': [{'job': job.id, 'preference_order': 1}],
+        },
+        context={'student_profile': student}
+    )
+
+
+class ApplicationInsertRaceTests(TestCase):
+    """
+    The drive state and duplicates are checked by the INSERT itself, so anything that changes
+    between validation and saving (another submission, the drive closing) is still caught.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.company_drive, cls.job, cls.students = create_drive_with_students(1)
+
+    def setUp(self):
+        cache.clear()
+
+    def _validated(self):
+        serializer = application_serializer(self.company_drive, self.job, self.students[0])
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer
+
+    def test_second_of_two_simultaneous_submissions_is_rejected(self):
+        first, second = self._validated(), self._validated()
+        first.save()
+        with self.assertRaisesMessage(ValidationError, 'You have already applied to this drive'):
+            second.save()
+        self.assertEqual(CompanyDriveApplication.objects.count(), 1)
+        self.assertEqual(JobPreference.objects.count(), 1)
+
+    def test_drive_closed_after_validation(self):
+        serializer = self._validated()
+        CompanyDrive.objects.filter(pk=self.company_drive.pk).update(status='Closed')
+        with self.assertRaisesMessage(ValidationError, 'This drive is no longer accepting applications'):
+            serializer.save()
+        self.assertFalse(CompanyDriveApplication.objects.exists())
+        self.assertFalse(JobPreference.objects.exists())
+
+    def test_deadline_passed_after_validation(self):
+        serializer = self._validated()
+        CompanyDrive.objects.filter(pk=self.company_drive.pk).update(
+            application_deadline=timezone.now() - timedelta(seconds=1)
+        )
+        with self.assertRaisesMessage(ValidationError, 'Application deadline has passed'):
+            serializer.save()
+        self.assertFalse(CompanyDriveApplication.objects.exists())
+
+
+@skipUnless(connection.vendor == 'postgresql', "The concurrent load test needs PostgreSQL.")
+class ConcurrentApplyLoadTests(TransactionTestCase):
+    """
+    500 submissions released at the same moment: every student submits twice, so exactly half
+    must succeed and the other half must be told they already applied, with no database errors.
+    """
+    STUDENTS = 250
+    SUBMISSIONS_PER_STUDENT = 2
+    # Concurrent database connections; PostgreSQL allows 100 by default.
+    WORKERS = 50
+
+    def setUp(self):
+        cache.clear()
+        self.company_drive, self.job, self.students = create_drive_with_students(self.STUDENTS)
+
+    def test_500_simultaneous_applies(self):
+        start = threading.Event()
+
+        def apply(student):
+            start.wait()
+            try:
+                serializer = application_serializer(self.company_drive, self.job, student)
+                if not serializer.is_valid():
+                    return 'invalid', serializer.errors
+                serializer.save()
+                return 'created', None
+            except ValidationError as e:
+                return 'rejected', e.detail
+            except Exception as e:
+                return 'error', repr(e)
+            finally:
+                connection.close()
+
+        submissions = [student for student in self.students for _ in range(self.SUBMISSIONS_PER_STUDENT)]
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as executor:
+            futures = [executor.submit(apply, student) for student in submissions]
+            start.set()
+            results = [future.result() for future in futures]
+
+        outcomes = [outcome for outcome, _ in results]
+        self.assertEqual(len(results), 500)
+        self.assertEqual(outcomes.count('error'), 0, [detail for outcome, detail in results if outcome == 'error'][:5])
+        self.assertEqual(outcomes.count('invalid'), 0, [detail for outcome, detail in results if outcome == 'invalid'][:5])
+        self.assertEqual(outcomes.count('created'), self.STUDENTS)
+        self.assertEqual(outcomes.count('rejected'), self.STUDENTS)
+        self.assertTrue(all(
+            detail == {'company_drive': ['You have already applied to this drive']}
+            for outcome, detail in results if outcome == 'rejected'
+        ))
+        self.assertEqual(CompanyDriveApplication.objects.count(), self.STUDENTS)
+        self.assertEqual(JobPreference.objects.count(), self.STUDENTS)
+        self.assertEqual(
+            CompanyDriveApplication.objects.values('student').distinct().count(), self.STUDENTS
+        )
+
+
+def create_drive_with_applications(student_count, job_count=2):
+    """
+    A multi-job drive and `student_count` 'Applied' applications to it, each ranking every job
+    (in job order). Returns (company_drive, jobs, applications).
+    """
+    program, company_drive = create_company_drive(multiple_allowed=True)
+    jobs = [Job.objects.create(company_drive=company_drive, title=f'Role {index}') for index in range(job_count)]
+    applications = []
+    for index in range(student_count):
+        user = User.objects.create_user(
+            email=f'candidate{index}@example.com', phone_number=f'result-{index}', first_name=f'Candidate{index}'
+        )
+        student = StudentProfile.objects.create(
+            user=user, program=program, enrollment_number=f'ENR{index:04}', joining_year=2023,
+            current_cgpa=Decimal('8.00'), tenth_percentage=Decimal('80.00'), twelfth_percentage=Decimal('80.00')
+        )
+        applications.append(CompanyDriveApplication.objects.create(
+            company_drive=company_drive, student=student, resume='resume.pdf'
+        ))
+    JobPreference.objects.bulk_create([
+        JobPreference(drive_application=application, job=job, preference_order=order)
+        for application in applications
+        for order, job in enumerate(jobs, start=1)
+    ])
+    return company_drive, jobs, applications
+
+
+class StatusTransitionTests(TestCase):
+    """Bulk offers and rejections (apps.applications.transitions)."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.company_drive, cls.jobs, cls.applications = create_drive_with_applications(6)
+        cls.other_job = Job.objects.create(
+            company_drive=CompanyDrive.objects.create(
+                placement_drive=cls.company_drive.placement_drive, company=cls.company_drive.company,
+                drive_type='Internship', job_mode='Onsite'
+            ),
+            title='Other drive role'
+        )
+
+    def setUp(self):
+        patcher = mock.patch('apps.core.tasks.get_email_dispatcher')
+        self.dispatcher = patcher.start().return_value
+        self.dispatcher.worker_count = 4
+        self.addCleanup(patcher.stop)
+
+    def _statuses(self):
+        return dict(CompanyDriveApplication.objects.values_list('id', 'status'))
+
+    def test_allowed_transitions(self):
+        application = self.applications[0]
+        for status in ('Applied', 'Offered', 'Accepted', 'Declined', 'Rejected'):
+            application.status = status
+            for target, sources in ALLOWED_TRANSITIONS.items():
+                with self.subTest(current=status, target=target):
+                    job = self.jobs[0] if target == 'Offered' else None
+                    self.assertEqual(check_transition(application, target, job) is None, status in sources)
+
+        application.status = 'Applied'
+        self.assertEqual(check_transition(application, 'Offered'), "Offered job not found.")
+        self.assertIn('does not belong to', check_transition(application, 'Offered', self.other_job))
+
+    def test_batch_with_an_invalid_row_changes_nothing(self):
+        accepted = self.applications[2]
+        CompanyDriveApplication.objects.filter(pk=accepted.pk).update(status='Accepted')
+        before = self._statuses()
+
+        with self.assertRaises(ValidationError) as raised:
+            apply_status_transitions([
+                {'application': self.applications[0].id, 'status': 'Offered', 'offered_job': self.jobs[0].id},
+                {'application': self.applications[1].id, 'status': 'Rejected'},
+                {'application': accepted.id, 'status': 'Rejected'},
+                {'application': 999999, 'status': 'Rejected'},
+            ])
+
+        self.assertEqual(set(raised.exception.detail), {accepted.id, 999999})
+        self.assertEqual(self._statuses(), before)
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    def test_one_update_per_status_and_job(self):
+        transitions = [
+            {'application': self.applications[0].id, 'status': 'Offered', 'offered_job': self.jobs[0].id},
+            {'application': self.applications[1].id, 'status': 'Offered', 'offered_job': self.jobs[0].id},
+            {'application': self.applications[2].id, 'status': 'Offered', 'offered_job': self.jobs[1].id},
+            {'application': self.applications[3].id, 'status': 'Rejected'},
+            {'application': self.applications[4].id, 'status': 'Rejected'},
+            {'application': self.applications[5].id, 'status': 'Rejected'},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            counts = apply_status_transitions(transitions)
+
+        self.assertEqual(counts, {'Offered': 3, 'Rejected': 3})
+        table = CompanyDriveApplication._meta.db_table
+        updates = [query['sql'] for query in queries if query['sql'].startswith(f'UPDATE "{table}"')]
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(
+            list(CompanyDriveApplication.objects.order_by('id').values_list('status', 'offered_job_id')),
+            [('Offered', self.jobs[0].id)] * 2 + [('Offered', self.jobs[1].id)] + [('Rejected', None)] * 3
+        )
+        self.assertEqual(
+            sorted(EmailOutbox.objects.values_list('recipients', flat=True)),
+            [[f'candidate{index}@example.com'] for index in range(3)]
+        )
+
+    def test_emails_are_dispatched_only_after_commit(self):
+        submit = self.dispatcher.submit
+        offers = [
+            {'application': application.id, 'status': 'Offered', 'offered_job': self.jobs[0].id}
+            for application in self.applications[:2]
+        ]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            apply_status_transitions(offers)
+            submit.assert_not_called()
+        self.assertTrue(callbacks)
+        for callback in callbacks:
+            callback()
+        self.assertTrue(submit.called)
+        self.assertEqual(EmailOutbox.objects.count(), 2)
+
+    def test_no_emails_when_the_transaction_rolls_back(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    apply_status_transitions([
+                        {'application': self.applications[0].id, 'status': 'Offered', 'offered_job': self.jobs[0].id}
+                    ])
+                    raise RuntimeError('rolled back')
+
+        self.dispatcher.submit.assert_not_called()
+        self.assertFalse(EmailOutbox.objects.exists())
+        self.assertEqual(CompanyDriveApplication.objects.get(pk=self.applications[0].pk).status, 'Applied')
+
+
+class RoundResultImportTests(TestCase):
+    """Results sheets (apps.applications.imports); CSV, since it needs no optional package."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.company_drive, cls.jobs, cls.applications = create_drive_with_applications(5)
+        CompanyDriveApplication.objects.filter(pk=cls.applications[1].pk).update(status='Rejected')
+        CompanyDriveApplication.objects.filter(pk=cls.applications[4].pk).update(status='Accepted')
+
+    def setUp(self):
+        patcher = mock.patch('apps.core.tasks.get_email_dispatcher')
+        patcher.start().return_value.worker_count = 4
+        self.addCleanup(patcher.stop)
+
+    def _import(self, content, name='results.csv', chunk_size=None):
+        return import_round_results(self.company_drive, SimpleUploadedFile(name, content.encode()), chunk_size)
+
+    def test_mixed_rows_are_reported_and_only_valid_rows_applied(self):
+        report = self._import(
+            "Enrollment Number,Result,Job\n"
+            "ENR0000,Offered,Role 0\n"       # applied
+            "ENR0001,Rejected,\n"            # unchanged
+            "ENR0002,Offered,\n"             # error: no job
+            "ENR0002,Selected,role 1\n"      # applied: a corrected row after an errored one
+            "ENR0000,Rejected,\n"            # error: duplicate of an applied row
+            "ENR0001,Rejected,\n"            # error: duplicate of an unchanged row
+            "ENR0003,Maybe,\n"               # error: unknown result
+            "ENR9999,Rejected,\n"            # error: not an applicant
+            ",Rejected,\n"                   # error: no enrollment number
+            "ENR0004,Rejected,\n",           # error: already accepted
+            chunk_size=3
+        )
+
+        self.assertEqual(report['summary'], {'applied': 2, 'unchanged': 1, 'error': 7})
+        self.assertEqual(
+            [(row['row'], row['enrollment_number'], row['outcome']) for row in report['rows']],
+            [
+                (2, 'ENR0000', 'applied'), (3, 'ENR0001', 'unchanged'), (4, 'ENR0002', 'error'),
+                (5, 'ENR0002', 'applied'), (6, 'ENR0000', 'error'), (7, 'ENR0001', 'error'),
+                (8, 'ENR0003', 'error'), (9, 'ENR9999', 'error'), (10, '', 'error'), (11, 'ENR0004', 'error'),
+            ]
+        )
+        messages = [row['message'] for row in report['rows']]
+        self.assertEqual(messages[2], "Specify the offered job in the 'job' column.")
+        self.assertEqual(messages[4:9], [
+            "Duplicate row for this enrollment number.", "Duplicate row for this enrollment number.",
+            "Unknown result 'Maybe'.", "No application to this drive.", "Missing enrollment number.",
+        ])
+        self.assertEqual(
+            list(CompanyDriveApplication.objects.order_by('id').values_list('status', 'offered_job_id')),
+            [
+                ('Offered', self.jobs[0].id), ('Rejected', None), ('Offered', self.jobs[1].id),
+                ('Applied', None), ('Accepted', None),
+            ]
+        )
+
+    def test_reimporting_the_same_sheet_reports_rows_as_unchanged(self):
+        sheet = "enrollment_number,result,job\nENR0000,Offered,Role 0\nENR0003,Rejected,\n"
+        self.assertEqual(self._import(sheet)['summary'], {'applied': 2, 'unchanged': 0, 'error': 0})
+        self.assertEqual(self._import(sheet)['summary'], {'applied': 0, 'unchanged': 2, 'error': 0})
+
+    def test_unreadable_files_are_rejected(self):
+        for name, content, message in (
+            ('results.pdf', 'enrollment_number,result\n', "Upload a .csv or .xlsx file."),
+            ('results.csv', 'enrollment_number,job\nENR0000,Role 0\n', "Missing column(s): result."),
+        ):
+            with self.subTest(name=name), self.assertRaises(ResultFileError) as raised:
+                self._import(content, name=name)
+            self.assertIn(message, str(raised.exception))
+        self.assertEqual(CompanyDriveApplication.objects.filter(status='Applied').count(), 3)
+
+
+def random_matching_market(rng, student_count, job_count, max_preferences, ranked_share=0.5, max_capacity=5):
+    """
+    Numbered inputs for `deferred_acceptance`: every student ranks a few jobs and every job ranks a
+    random `ranked_share` of the students. Returns (student_preferences, job_ranks, capacities).
+    """
+    student_preferences = [
+        array('l', rng.sample(range(job_count), rng.randint(0, min(max_preferences, job_count)))) for _ in range(student_count)
+    ]
+    job_ranks = []
+    for _ in range(job_count):
+        ranks = array('l', [UNRANKED]) * student_count
+        for rank, student in enumerate(rng.sample(range(student_count), int(student_count * ranked_share))):
+            ranks[student] = rank
+        job_ranks.append(ranks)
+    capacities = array('l', [rng.randint(0, max_capacity) for _ in range(job_count)])
+    return student_preferences, job_ranks, capacities
+
+
+class DeferredAcceptanceTests(SimpleTestCase):
+    """The matching itself (apps.applications.allocation.deferred_acceptance), on random markets."""
+    def assertValidStableMatching(self, student_preferences, job_ranks, capacities, matched):
+        self.assertEqual(len(matched), len(student_preferences))
+        held = [[] for _ in capacities]
+        for student, job in enumerate(matched):
+            if job != -1:
+                # Only pairs that both sides ranked.
+                self.assertIn(job, student_preferences[student])
+                self.assertNotEqual(job_ranks[job][student], UNRANKED)
+                held[job].append(student)
+        for job, students in enumerate(held):
+            self.assertLessEqual(len(students), capacities[job])
+
+        for student, preferences in enumerate(student_preferences):
+            current = matched[student]
+            better = preferences if current == -1 else preferences[:list(preferences).index(current)]
+            for job in better:
+                rank = job_ranks[job][student]
+                if rank == UNRANKED or capacities[job] == 0:
+                    continue
+                # A job the student prefers must be full of students the company ranks higher.
+                self.assertEqual(len(held[job]), capacities[job], (student, job))
+                self.assertTrue(all(job_ranks[job][other] < rank for other in held[job]), (student, job))
+
+    def test_matching_is_stable_and_respects_rankings_and_capacity(self):
+        rng = random.Random(2026)
+        for market in range(200):
+            with self.subTest(market=market):
+                student_preferences, job_ranks, capacities = random_matching_market(
+                    rng, student_count=rng.randint(1, 40), job_count=rng.randint(1, 6), max_preferences=4
+                )
+                matched = deferred_acceptance(student_preferences, job_ranks, capacities)
+                self.assertValidStableMatching(student_preferences, job_ranks, capacities, matched)
+
+    def test_unranked_pairs_are_never_matched(self):
+        # Student 0 only wants job 0, which did not rank them; job 1 ranks student 1 first,
+        # but student 1 did not list job 1.
+        matched = deferred_acceptance(
+            [array('l', [0]), array('l', [0]), array('l', [1, 0])],
+            [array('l', [UNRANKED, 0, 1]), array('l', [1, 0, 2])],
+            array('l', [1, 1]),
+        )
+        self.assertEqual(list(matched), [-1, 0, 1])
+
+    def test_3000_students_and_15_jobs_within_budget(self):
+        market = random_matching_market(
+            random.Random(3000), student_count=3000, job_count=15, max_preferences=5, max_capacity=60
+        )
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            matched = deferred_acceptance(*market)
+            timings.append((time.perf_counter() - started) * 1000)
+        self.assertValidStableMatching(*market, matched)
+        # Runs in about 6 ms here; the budget leaves room for slow CI machines.
+        self.assertLess(min(timings), 50)
+
+
+class OfferAllocationTests(TestCase):
+    """Allocating a drive's offers from the company's rankings (apps.applications.allocation.allocate_offers)."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.company_drive, cls.jobs, cls.applications = create_drive_with_applications(6)
+        # ENR0004 only wants Role 0, which will not rank them.
+        JobPreference.objects.filter(drive_application=cls.applications[4], job=cls.jobs[1]).delete()
+        cls.job_inputs = [
+            {'job': cls.jobs[0].id, 'capacity': 2, 'ranking': ['ENR0003', 'ENR0000', 'ENR0001', 'ENR0005']},
+            {'job': cls.jobs[1].id, 'capacity': 2, 'ranking': ['ENR0001', 'ENR0002', 'ENR0004', 'ENR9999']},
+        ]
+
+    def setUp(self):
+        patcher = mock.patch('apps.core.tasks.get_email_dispatcher')
+        patcher.start().return_value.worker_count = 4
+        self.addCleanup(patcher.stop)
+
+    def _statuses(self):
+        return list(CompanyDriveApplication.objects.order_by('id').values_list('status', 'offered_job_id'))
+
+    def test_dry_run_returns_the_allocation_and_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = allocate_offers(self.company_drive, self.job_inputs, dry_run=True)
+
+        self.assertTrue(result['dry_run'])
+        self.assertEqual(
+            [(assignment['enrollment_number'], assignment['offered_job'], assignment['preference_order'])
+             for assignment in result['assignments']],
+            [
+                ('ENR0000', self.jobs[0].id, 1), ('ENR0001', self.jobs[1].id, 2),
+                ('ENR0002', self.jobs[1].id, 2), ('ENR0003', self.jobs[0].id, 1),
+            ]
+        )
+        self.assertEqual([row['enrollment_number'] for row in result['unmatched']], ['ENR0004', 'ENR0005'])
+        self.assertEqual(result['jobs'], [
+            {'job': self.jobs[0].id, 'capacity': 2, 'filled': 2}, {'job': self.jobs[1].id, 'capacity': 2, 'filled': 2},
+        ])
+        self.assertEqual(result['unknown_enrollment_numbers'], {self.jobs[1].id: ['ENR9999']})
+        self.assertFalse([query for query in queries if not query['sql'].startswith('SELECT')])
+        self.assertEqual(self._statuses(), [('Applied', None)] * 6)
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    def test_offers_are_made_once_per_student(self):
+        allocate_offers(self.company_drive, self.job_inputs, dry_run=False)
+
+        self.assertEqual(self._statuses(), [
+            ('Offered', self.jobs[0].id), ('Offered', self.jobs[1].id), ('Offered', self.jobs[1].id),
+            ('Offered', self.jobs[0].id), ('Applied', None), ('Applied', None),
+        ])
+        self.assertEqual(
+            sorted(EmailOutbox.objects.values_list('recipients', flat=True)),
+            [[f'candidate{index}@example.com'] for index in range(4)]
+        )
+        # Offered applications are no longer 'Applied', so a second run only places the rest.
+        second = allocate_offers(self.company_drive, self.job_inputs, dry_run=True)
+        self.assertEqual([assignment['enrollment_number'] for assignment in second['assignments']], ['ENR0005'])
+
+    def test_nothing_is_applied_when_an_application_changed_meanwhile(self):
+        def reject_first_then_match(*args):
+            # The company rejects ENR0000 between the read and the write.
+            CompanyDriveApplication.objects.filter(pk=self.applications[0].pk).update(status='Rejected')
+            return deferred_acceptance(*args)
+
+        with mock.patch('apps.applications.allocation.deferred_acceptance', side_effect=reject_first_then_match):
+            with self.assertRaises(ValidationError) as raised:
+                allocate_offers(self.company_drive, self.job_inputs, dry_run=False)
+
+        self.assertEqual(set(raised.exception.detail), {self.applications[0].id})
+        self.assertEqual(self._statuses(), [('Rejected', None)] + [('Applied', None)] * 5)
+        self.assertFalse(EmailOutbox.objects.exists())
+
+
+@override_settings(IDEMPOTENCY_KEY_LOCK_TIMEOUT=60)
+class IdempotencyKeyApiTests(TestCase):
+    """Retries with an Idempotency-Key header (apps.core.idempotency) on the application endpoints."""
+    URL = '/api/v1/applications/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company_drive, cls.job, (cls.student, cls.other_student) = create_drive_with_students(2)
+        cls.payload = {
+            'company_drive': cls.company_drive.id, 'resume': 'resume.pdf',
+            'job_preferences': [{'job': cls.job.id, 'preference_order': 1}],
+        }
+
+    def setUp(self):
+        patcher = mock.patch('apps.core.tasks.get_email_dispatcher')
+        patcher.start().return_value.worker_count = 4
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('apps.core.permissions.IsStudentRole.has_permission', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student.user)
+
+    def _post(self, path, data, key='retry-1'):
+        return self.client.post(path, data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_replayed_create_does_not_run_the_view_again(self):
+        first = self._post(self.URL, self.payload)
+        self.assertEqual(first.status_code, 201, first.data)
+        self.assertNotIn('Idempotent-Replayed', first)
+
+        with mock.patch.object(CompanyDriveApplicationViewSet, 'perform_create') as perform_create:
+            retry = self._post(self.URL, self.payload)
+
+        perform_create.assert_not_called()
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(CompanyDriveApplication.objects.count(), 1)
+
+    def test_replayed_accept_offer_sends_one_email(self):
+        application = CompanyDriveApplication.objects.create(
+            company_drive=self.company_drive, student=self.student, resume='resume.pdf',
+            status='Offered', offered_job=self.job
+        )
+        path = f'{self.URL}{application.id}/accept_offer/'
+
+        with self.captureOnCommitCallbacks(execute=True):
+            responses = [self._post(path, {}) for _ in range(2)]
+
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+        self.assertEqual(responses[1]['Idempotent-Replayed'], 'true')
+        self.assertEqual(CompanyDriveApplication.objects.get(pk=application.pk).status, 'Accepted')
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    def test_key_in_progress_returns_409_and_an_abandoned_one_is_taken_over(self):
+        # The state left by a first request that is still running (or whose worker died).
+        fingerprint = request_fingerprint(SimpleNamespace(method='POST', path=self.URL, data=self.payload))
+        now = timezone.now()
+        record = IdempotencyKey.objects.create(
+            user=self.student.user, key='retry-1', request_fingerprint=fingerprint,
+            locked_at=now, expires_at=now + timedelta(days=1)
+        )
+
+        response = self._post(self.URL, self.payload)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['error_code'], 'IDEMPOTENCY_KEY_IN_PROGRESS')
+        self.assertFalse(CompanyDriveApplication.objects.exists())
+
+        IdempotencyKey.objects.filter(pk=record.pk).update(locked_at=now - timedelta(seconds=61))
+        response = self._post(self.URL, self.payload)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(CompanyDriveApplication.objects.count(), 1)
+        record.refresh_from_db()
+        self.assertEqual((record.response_status, record.locked_at), (201, None))
+
+    def test_key_reused_for_a_different_request_returns_422(self):
+        self.assertEqual(self._post(self.URL, self.payload).status_code, 201)
+        application = CompanyDriveApplication.objects.get()
+
+        for path, data in (
+            (self.URL, {**self.payload, 'resume': 'other.pdf'}),
+            (f'{self.URL}{application.id}/accept_offer/', {}),
+        ):
+            with self.subTest(path=path):
+                response = self._post(path, data)
+                self.assertEqual(response.status_code, 422)
+                self.assertEqual(response.data['error_code'], 'IDEMPOTENCY_KEY_REUSED')
+        self.assertEqual(CompanyDriveApplication.objects.count(), 1)
+
+    def test_keys_are_scoped_to_the_user(self):
+        self.assertEqual(self._post(self.URL, self.payload).status_code, 201)
+        self.client.force_authenticate(self.other_student.user)
+        response = self._post(self.URL, self.payload)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(CompanyDriveApplication.objects.count(), 2)
+
+    def test_server_error_releases_the_key(self):
+        with mock.patch.object(
+            CompanyDriveApplicationViewSet, 'perform_create', side_effect=RuntimeError('database went away')
+        ), self.assertLogs('django.request', 'ERROR'):
+            response = self._post(self.URL, self.payload)
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        response = self._post(self.URL, self.payload)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(CompanyDriveApplication.objects.count(), 1)
+
+
+class ApplicationExportTests(TestCase):
+    """The streamed applicant CSV (apps.applications.exports)."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.company_drive, cls.jobs, cls.applications = create_drive_with_applications(5, job_count=3)
+        # The second applicant ranks the jobs in reverse.
+        reversed_application = cls.applications[1]
+        JobPreference.objects.filter(drive_application=reversed_application).delete()
+        JobPreference.objects.bulk_create([
+            JobPreference(drive_application=reversed_application, job=job, preference_order=order)
+            for order, job in enumerate(reversed(cls.jobs), start=1)
+        ])
+        User.objects.filter(pk=cls.applications[2].student.user_id).update(
+            first_name='=HYPERLINK("http://example.com","Open")', phone_number='+91 98765 43210'
+        )
+
+    def test_batches_cover_every_application_once_in_id_order(self):
+        # 5 applications in batches of 2: three batches plus the empty read that ends the loop,
+        # and one preferences query per non-empty batch.
+        with self.assertNumQueries(7):
+            rows = list(iter_application_rows(self.company_drive, batch_size=2))
+
+        self.assertEqual([row['id'] for row in rows], [application.id for application in self.applications])
+        titles = [job.title for job in self.jobs]
+        self.assertEqual(
+            [row['job_preferences'] for row in rows],
+            [titles, titles[::-1], titles, titles, titles]
+        )
+
+    def test_csv_escapes_formulas_but_not_phone_numbers(self):
+        lines = list(csv.reader(''.join(stream_applications_csv(self.company_drive, batch_size=2)).splitlines()))
+        header, rows = lines[0], lines[1:]
+        columns = {name: index for index, name in enumerate(header)}
+
+        self.assertEqual(
+            [row[columns['Enrollment Number']] for row in rows], [f'ENR{index:04}' for index in range(5)]
+        )
+        self.assertEqual(rows[1][columns['Job Preferences']], '1. Role 2; 2. Role 1; 3. Role 0')
+        self.assertEqual(rows[2][columns['First Name']], '\'=HYPERLINK("http://example.com","Open")')
+        self.assertEqual(rows[2][columns['Phone Number']], '+91 98765 43210')
@@ -0,0 +1,136 @@
+"""
+Application Status Transitions for the HireSphereX Project.
+
+Applies the placement team's decisions (offers and rejections) to many applications at once,
+e.g. when a company sends the results of a round for a whole shortlist.
+
+ALLOWED TRANSITIONS (same as the single-application actions):
+=============================================================
+- Applied -> Offered (with an `offered_job` from the application's drive)
+- Applied / Offered -> Rejected
+
+The whole batch is validated before anything is written: if any transition is invalid, nothing
+is applied. The applications are locked for the duration, updated with one
+`UPDATE ... WHERE id IN (...)` per target status (and per offered job), and the offer emails are
+queued to the outbox with a single bulk insert, all in one transaction.
+"""
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from apps.core.tasks import send_emails_in_background
+from apps.placements.models import Job
+from .models import CompanyDriveApplication
+
+ALLOWED_TRANSITIONS = {
+    'Offered': {'Applied'},
+    'Rejected': {'Applied', 'Offered'},
+}
+
+
+def job_offer_email(application, job):
+    """The job offer email for `application`, in the form taken by `send_emails_in_background`."""
+    company_drive = application.company_drive
+    return {
+        'subject': f"Job Offer from {company_drive.company.name}",
+        'template_name': "emails/job_offer.html",
+        'context': {
+            'student_name': application.student.user.get_full_name(),
+            'company_name': company_drive.company.name,
+            'job_title': job.title,
+            'job_type': company_drive.drive_type,
+            'job_mode': company_drive.job_mode,
+            'package_range': f"₹{job.ug_package_min} - ₹{job.ug_package_max} LPA" if job.ug_package_min else "As per company standards",
+            'accept_deadline': "48 hours",
+            'drive_title': company_drive.placement_drive.title,
+            'placement_portal_url': settings.FRONTEND_URL
+        },
+        'recipient_list': [application.student.user.email],
+    }
+
+
+def check_transition(application, status, job=None):
+    """Returns why `application` cannot be moved to `status` (with `job` for offers), or None if it can."""
+    if application.status not in ALLOWED_TRANSITIONS[status]:
+        return f"Cannot move a '{application.status}' application to '{status}'."
+    if status == 'Offered':
+        if job is None:
+            return "Offered job not found."
+        if job.company_drive_id != application.company_drive_id:
+            return f'Job "{job.title}" does not belong to {application.company_drive.company.name} drive.'
+    return None
+
+
+def apply_checked_transitions(transitions, applications, jobs):
+    """
+    Writes transitions that passed `check_transition` with one UPDATE per (status, offered job) and
+    queues the offer emails as one batch. Must run inside the transaction that locked `applications`
+    ({id: application}); `jobs` is {id: Job}.
+    """
+    # .update() skips auto_now, so updated_at is set here.
+    now = timezone.now()
+    groups = defaultdict(list)
+    for transition in transitions:
+        offered_job = transition.get('offered_job') if transition['status'] == 'Offered' else None
+        groups[(transition['status'], offered_job)].append(transition['application'])
+
+    counts = defaultdict(int)
+    for (status, offered_job), ids in groups.items():
+        changes = {'status': status, 'updated_at': now}
+        if offered_job:
+            changes['offered_job_id'] = offered_job
+        counts[status] += CompanyDriveApplication.objects.filter(id__in=ids).update(**changes)
+
+    send_emails_in_background(
+        job_offer_email(applications[transition['application']], jobs[transition['offered_job']])
+        for transition in transitions if transition['status'] == 'Offered'
+    )
+    return counts
+
+
+def locked_applications(**filters):
+    """
+    Applications matching `filters`, locked until the current transaction ends, so a student
+    cannot accept or withdraw in between. Loaded with everything the offer email needs.
+    """
+    return CompanyDriveApplication.objects.select_for_update(of=('self',)).filter(**filters).select_related(
+        'student__user', 'company_drive__company', 'company_drive__placement_drive'
+    )
+
+
+def apply_status_transitions(transitions):
+    """
+    Validates and applies a batch of status transitions.
+
+    Args:
+        transitions (list): Dicts with `application` (id), `status` and, for offers, `offered_job` (id).
+
+    Returns:
+        dict: The number of applications moved to each status, e.g. {'Offered': 12, 'Rejected': 388}.
+
+    Raises:
+        serializers.ValidationError: {application_id: message} for every invalid transition.
+    """
+    application_ids = [transition['application'] for transition in transitions]
+    job_ids = {transition['offered_job'] for transition in transitions if transition.get('offered_job')}
+
+    with transaction.atomic():
+        applications = {application.id: application for application in locked_applications(id__in=application_ids)}
+        jobs = Job.objects.in_bulk(job_ids)
+
+        errors = {}
+        for transition in transitions:
+            application = applications.get(transition['application'])
+            if application is None:
+                errors[transition['application']] = "Application not found."
+                continue
+            error = check_transition(application, transition['status'], jobs.get(transition.get('offered_job')))
+            if error:
+                errors[transition['application']] = error
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        counts = apply_checked_transitions(transitions, applications, jobs)
+
+    return dict(counts)
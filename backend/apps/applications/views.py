@@ -1,4 +1,4 @@
-from rest_framework import permissions
+from rest_framework import permissions, serializers
 from apps.core.views import BaseViewSet
 from rest_framework.decorators import action  
 from apps.core.permissions import IsAdminRole, IsStudentRole, IsPlacementTeam
@@ -6,13 +6,23 @@ from .models import CompanyDriveApplication, JobPreference
 from apps.placements.models import CompanyDrive, Job
 from apps.students.models import StudentProfile
 from django_filters.rest_framework import DjangoFilterBackend
-from apps.core.response import SuccessResponse, ForbiddenResponse,ErrorResponse, ValidationErrorResponse
+from apps.core.response import SuccessResponse, ForbiddenResponse,ErrorResponse, ValidationErrorResponse, NotFoundResponse
 from .serializers import (
     CompanyDriveApplicationCreateSerializer,
     CompanyDriveApplicationDetailSerializer,
-    CompanyDriveApplicationBaseSerializer
+    CompanyDriveApplicationBaseSerializer,
+    BulkStatusTransitionSerializer,
+    RoundResultImportSerializer,
+    OfferAllocationSerializer
 )
+from .transitions import apply_status_transitions, job_offer_email
+from .imports import import_round_results, ResultFileError
+from .exports import stream_applications_csv
+from .allocation import allocate_offers
+from django.http import StreamingHttpResponse
+from django.utils.text import slugify
 from apps.core.tasks import send_email_in_background
+from apps.core.idempotency import idempotent
 from django.conf import settings
 from django.utils import timezone
 
@@ -38,7 +48,7 @@ class CompanyDriveApplicationViewSet(BaseViewSet):
         if hasattr(self.request, "user") and self.request.user.is_authenticated:
             try:
                 # Add student_profile for student users
-                context['student_profile'] = StudentProfile.objects.get(user=self.request.user)
+                context['student_profile'] = StudentProfile.objects.select_related('program').get(user=self.request.user)
             except StudentProfile.DoesNotExist:
                 context['student_profile'] = None
 
@@ -72,6 +82,11 @@ class CompanyDriveApplicationViewSet(BaseViewSet):
         ).prefetch_related('job_preferences__job')
 
     
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        """POST /api/applications/ (honours the Idempotency-Key header)"""
+        return super().create(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """Auto-assign student profile during creation"""
         # Student profile is already in context and validated by serializer
@@ -102,6 +117,7 @@ class CompanyDriveApplicationViewSet(BaseViewSet):
         return SuccessResponse(message="Application withdrawn successfully")
 
     @action(detail=True, methods=['post'], permission_classes=[IsStudentRole])
+    @idempotent
     def accept_offer(self, request, pk=None):
         """POST /api/applications/1/accept_offer/"""
         application = self.get_object()
@@ -149,6 +165,7 @@ class CompanyDriveApplicationViewSet(BaseViewSet):
 
     # Admin Actions
     @action(detail=True, methods=['post'], permission_classes=[IsPlacementTeam | IsAdminRole])
+    @idempotent
     def offer_job(self, request, pk=None):
         """POST /api/applications/1/offer_job/"""
         application = self.get_object()
@@ -177,22 +194,7 @@ class CompanyDriveApplicationViewSet(BaseViewSet):
         application.save()
 
 
-        send_email_in_background(
-            subject=f"Job Offer from {application.company_drive.company.name}",
-            template_name="emails/job_offer.html",
-            context={
-                'student_name': application.student.user.get_full_name(),
-                'company_name': application.company_drive.company.name,
-                'job_title': job.title,
-                'job_type': job.company_drive.drive_type,
-                'job_mode': job.company_drive.job_mode,
-                'package_range': f"₹{job.ug_package_min} - ₹{job.ug_package_max} LPA" if job.ug_package_min else "As per company standards",
-                'accept_deadline': "48 hours",  # You can make this dynamic
-                'drive_title': application.company_drive.placement_drive.title,
-                'placement_portal_url': settings.FRONTEND_URL
-            },
-            recipient_list=[application.student.user.email]
-        )
+        send_email_in_background(**job_offer_email(application, job))
         
         return SuccessResponse(message="Job offered successfully")
 
@@ -207,4 +209,101 @@ class CompanyDriveApplicationViewSet(BaseViewSet):
         application.status = 'Rejected'
         application.save()
         
-        return SuccessResponse(message="Application rejected successfully")
\ No newline at end of file
+        return SuccessResponse(message="Application rejected successfully")
+
+    @action(detail=False, methods=['post'], url_path='bulk-status', permission_classes=[IsPlacementTeam | IsAdminRole])
+    def bulk_status(self, request):
+        """
+        POST /api/applications/bulk-status/
+        Offers and rejections for many applications at once, e.g. a company's results for a round.
+        Body: {"transitions": [{"application": 1, "status": "Offered", "offered_job": 5},
+                               {"application": 2, "status": "Rejected"}]}
+
+        Either every transition is applied, or none is and the errors are returned per application.
+        """
+        serializer = BulkStatusTransitionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return ValidationErrorResponse(errors=serializer.errors)
+
+        try:
+            counts = apply_status_transitions(serializer.validated_data['transitions'])
+        except serializers.ValidationError as e:
+            return ValidationErrorResponse(errors={'transitions': e.detail})
+
+        return SuccessResponse(
+            data={'updated': counts},
+            message=f"{sum(counts.values())} applications updated successfully"
+        )
+
+    @action(detail=False, methods=['post'], url_path='import-results', permission_classes=[IsPlacementTeam | IsAdminRole])
+    def import_results(self, request):
+        """
+        POST /api/applications/import-results/ (multipart: company_drive, file)
+        Applies a company's results sheet (CSV or XLSX, keyed by enrollment number) to the drive's
+        applications and returns a report for every row. Valid rows are applied even if others fail.
+        """
+        serializer = RoundResultImportSerializer(data=request.data)
+        if not serializer.is_valid():
+            return ValidationErrorResponse(errors=serializer.errors)
+
+        try:
+            report = import_round_results(
+                serializer.validated_data['company_drive'], serializer.validated_data['file']
+            )
+        except ResultFileError as e:
+            return ValidationErrorResponse(errors={'file': [str(e)]})
+
+        summary = report['summary']
+        return SuccessResponse(
+            data=report,
+            message=f"{summary['applied']} applied, {summary['unchanged']} unchanged, {summary['error']} with errors"
+        )
+
+    @action(detail=False, methods=['get'], permission_classes=[IsPlacementTeam | IsAdminRole])
+    def export(self, request):
+        """
+        GET /api/applications/export/?company_drive=1
+        Streams the drive's applicant list as a CSV download (student details, academics,
+        resume link and job preferences), starting before the whole list has been read.
+        """
+        company_drive_id = request.query_params.get('company_drive', '')
+        if not company_drive_id.isdigit():
+            return ValidationErrorResponse({'company_drive': 'A company drive id is required'})
+        company_drive = CompanyDrive.objects.select_related('company').filter(id=int(company_drive_id)).first()
+        if company_drive is None:
+            return NotFoundResponse(message="Company drive not found.")
+
+        response = StreamingHttpResponse(stream_applications_csv(company_drive), content_type='text/csv')
+        filename = f"{slugify(company_drive.company.name)}-drive-{company_drive.id}-applications.csv"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=['post'], permission_classes=[IsPlacementTeam | IsAdminRole])
+    def allocate(self, request):
+        """
+        POST /api/applications/allocate/
+        Assigns offers for a multi-job drive by stable matching of the students' job preferences
+        with the company's per-job capacities and rankings (see apps.applications.allocation).
+        Body: {"company_drive": 1, "dry_run": true,
+               "jobs": [{"job": 5, "capacity": 10, "ranking": ["ENR001", "ENR042", ...]}]}
+
+        With dry_run (the default) nothing is saved; otherwise all offers are made in one transaction.
+        """
+        serializer = OfferAllocationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return ValidationErrorResponse(errors=serializer.errors)
+
+        data = serializer.validated_data
+        try:
+            result = allocate_offers(data['company_drive'], data['jobs'], dry_run=data['dry_run'])
+        except serializers.ValidationError as e:
+            return ValidationErrorResponse(
+                errors={'transitions': e.detail},
+                message="Some applications changed while allocating; nothing was applied. Please run it again."
+            )
+
+        action_taken = "would receive" if result['dry_run'] else "received"
+        return SuccessResponse(
+            data=result,
+            message=f"{len(result['assignments'])} students {action_taken} an offer; {len(result['unmatched'])} unmatched"
+        )
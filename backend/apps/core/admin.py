@@ -1,7 +1,18 @@
 from django.contrib import admin
-from .models import Country, State, City, Program
+from .models import Country, State, City, Program, EmailOutbox
 
 admin.site.register(Country)
 admin.site.register(State)
 admin.site.register(City)
-admin.site.register(Program)
\ No newline at end of file
+admin.site.register(Program)
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """Read-mostly view of the email outbox for diagnosing delivery problems."""
+    list_display = ('subject', 'template_name', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'template_name', 'is_bulk')
+    search_fields = ('subject',)
+    readonly_fields = ('created_at', 'sent_at', 'claimed_at', 'last_error')
+    # The context can hold one-time secrets (e.g. a generated password in the welcome email).
+    exclude = ('context',)
@@ -0,0 +1,67 @@
+"""
+Custom Email Backends for the HireSphereX Project.
+
+`FakeESPBackend` is an in-process stand-in for the Brevo API, for load testing and local
+development without sending real email. Enable it with:
+
+    EMAIL_BACKEND=apps.core.email_backends.FakeESPBackend
+"""
+import time
+import random
+import threading
+from django.conf import settings
+from anymail.exceptions import AnymailAPIError
+from anymail.message import AnymailRecipientStatus
+from anymail.backends.test import EmailBackend as AnymailTestBackend
+
+
+class FakeESPBackend(AnymailTestBackend):
+    """
+    Simulates an email provider's HTTP API.
+
+    It is an Anymail backend, so the pipeline takes exactly the same code path as with
+    Brevo (including batch sends via `merge_data`). Each API call:
+    - waits `EMAIL_FAKE_LATENCY_MS` (plus up to `EMAIL_FAKE_LATENCY_JITTER_MS` of random jitter),
+    - fails with an `AnymailAPIError` with probability `EMAIL_FAKE_ERROR_RATE` (0.0 - 1.0).
+
+    Messages are not kept in `mail.outbox`, so large cohorts do not skew memory measurements.
+    Instead, every call is recorded in the class-level `deliveries` log as
+    (finished_at, recipient_count, succeeded), read with `get_deliveries()`.
+    """
+    esp_name = "Fake"
+
+    _lock = threading.Lock()
+    deliveries = []
+
+    def __init__(self, *args, latency_ms=None, jitter_ms=None, error_rate=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latency_ms = latency_ms if latency_ms is not None else getattr(settings, 'EMAIL_FAKE_LATENCY_MS', 100)
+        self.jitter_ms = jitter_ms if jitter_ms is not None else getattr(settings, 'EMAIL_FAKE_LATENCY_JITTER_MS', 0)
+        self.error_rate = error_rate if error_rate is not None else getattr(settings, 'EMAIL_FAKE_ERROR_RATE', 0.0)
+
+    def post_to_esp(self, payload, message):
+        delay_ms = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+        recipient_count = len(payload.recipient_emails)
+        succeeded = random.random() >= self.error_rate
+        with self._lock:
+            self.deliveries.append((time.monotonic(), recipient_count, succeeded))
+
+        if not succeeded:
+            raise AnymailAPIError("Simulated provider error", backend=self, email_message=message, payload=payload)
+        status = AnymailRecipientStatus(message_id=None, status='sent')
+        return {'recipient_status': {email: status for email in payload.recipient_emails}}
+
+    @classmethod
+    def get_deliveries(cls):
+        """Returns a copy of the delivery log."""
+        with cls._lock:
+            return list(cls.deliveries)
+
+    @classmethod
+    def reset(cls):
+        """Clears the delivery log."""
+        with cls._lock:
+            cls.deliveries.clear()
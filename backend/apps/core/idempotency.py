@@ -0,0 +1,143 @@
+"""
+Idempotency Keys for the HireSphereX Project.
+
+Lets a client safely retry a POST (e.g. after a dropped connection) by sending the same
+`Idempotency-Key` header: the first response is stored per (user, key) and replayed on retries
+without running the view again, so no duplicate writes or emails happen.
+
+USAGE:
+======
+    @action(detail=True, methods=['post'])
+    @idempotent
+    def accept_offer(self, request, pk=None):
+        ...
+
+BEHAVIOUR:
+==========
+- No header: the view runs as usual.
+- First request with a key: the key is claimed, the view runs and its response is stored
+  (except 5xx responses and unhandled errors, which release the key so a retry runs again).
+- Retry with the same key and the same method, path and body: the stored response is returned
+  with an `Idempotent-Replayed: true` header.
+- Same key while the first request is still running: 409, the client should retry shortly.
+- Same key with a different request: 422.
+
+Keys expire after `IDEMPOTENCY_KEY_TTL` seconds; `purge_idempotency_keys` deletes expired rows.
+"""
+import json
+import hashlib
+from datetime import timedelta
+from functools import wraps
+from django.conf import settings
+from django.db import transaction, IntegrityError
+from django.utils import timezone
+from rest_framework.response import Response
+from .models import IdempotencyKey
+from .response import ConflictResponse, ValidationErrorResponse
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def request_fingerprint(request):
+    """A SHA-256 of the request's method, path and parsed body."""
+    payload = json.dumps([request.method, request.path, request.data], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def claim_key(user, key, fingerprint):
+    """
+    Claims `key` for `user`'s request.
+
+    Returns:
+        tuple: (IdempotencyKey, claimed). `claimed` is True when the caller should run the view:
+               the key is new, had expired, or was left in progress longer than
+               `IDEMPOTENCY_KEY_LOCK_TIMEOUT` by a request that never finished.
+    """
+    now = timezone.now()
+    record = IdempotencyKey.objects.filter(user=user, key=key).first()
+    if record is not None and record.expires_at <= now:
+        IdempotencyKey.objects.filter(pk=record.pk, expires_at__lte=now).delete()
+        record = None
+
+    if record is None:
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=user, key=key, request_fingerprint=fingerprint, locked_at=now,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+                )
+                return record, True
+        except IntegrityError:
+            # Another request with the same key claimed it first.
+            record = IdempotencyKey.objects.get(user=user, key=key)
+
+    abandoned = now - timedelta(seconds=settings.IDEMPOTENCY_KEY_LOCK_TIMEOUT)
+    if (
+        record.response_status is None and record.request_fingerprint == fingerprint
+        and record.locked_at is not None and record.locked_at <= abandoned
+    ):
+        # Conditional on the old lock time, so only one retry takes over an abandoned key.
+        if IdempotencyKey.objects.filter(
+            pk=record.pk, response_status__isnull=True, locked_at=record.locked_at
+        ).update(locked_at=now):
+            record.locked_at = now
+            return record, True
+    return record, False
+
+
+def replay(record):
+    """The stored response of a completed key."""
+    response = Response(data=record.response_body, status=record.response_status)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view_method):
+    """
+    Makes a viewset method honour the `Idempotency-Key` header (see the module docstring).
+    Runs after authentication and permission checks, so keys are always scoped to a real user.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return ValidationErrorResponse({IDEMPOTENCY_HEADER: f'Must be at most {MAX_KEY_LENGTH} characters'})
+
+        fingerprint = request_fingerprint(request)
+        record, claimed = claim_key(request.user, key, fingerprint)
+        if not claimed:
+            if record.request_fingerprint != fingerprint:
+                return ValidationErrorResponse(
+                    {IDEMPOTENCY_HEADER: 'This key was already used for a different request'},
+                    message="Idempotency-Key reused", error_code="IDEMPOTENCY_KEY_REUSED"
+                )
+            if record.response_status is None:
+                return ConflictResponse(
+                    message="A request with this Idempotency-Key is still being processed. Retry shortly.",
+                    error_code="IDEMPOTENCY_KEY_IN_PROGRESS"
+                )
+            return replay(record)
+
+        try:
+            try:
+                response = view_method(self, request, *args, **kwargs)
+            except Exception as exc:
+                # Turned into the error response here (as dispatch() would) so it can be stored.
+                response = self.handle_exception(exc)
+        except BaseException:
+            record.delete()
+            raise
+
+        if response.status_code >= 500 or not hasattr(response, 'data'):
+            record.delete()
+        else:
+            record.response_status = response.status_code
+            record.response_body = response.data
+            record.locked_at = None
+            record.save(update_fields=['response_status', 'response_body', 'locked_at'])
+        return response
+
+    return wrapper
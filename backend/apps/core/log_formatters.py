@@ -0,0 +1,27 @@
+"""
+Logging Formatters for the HireSphereX Project.
+
+`JSONFormatter` writes one JSON object per line, so log aggregators (e.g. Render's log
+stream) can filter and chart on individual fields instead of parsing free text.
+"""
+import json
+import logging
+from datetime import datetime, timezone
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats a record as JSON. Structured fields passed through `extra={'email': {...}}`
+    (see `apps.core.utils`) are merged into the top level of the object.
+    """
+    def format(self, record):
+        payload = {
+            'timestamp': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        payload.update(getattr(record, 'email', {}))
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
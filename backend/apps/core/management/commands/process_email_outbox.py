@@ -0,0 +1,55 @@
+"""
+Management command that delivers emails from the durable `EmailOutbox`.
+
+USAGE:
+------
+    python manage.py process_email_outbox              # run forever, polling every few seconds
+    python manage.py process_email_outbox --once       # deliver everything currently due, then exit
+
+Several copies of this command can run at the same time (e.g. one per worker dyno): rows are claimed
+with `SELECT ... FOR UPDATE SKIP LOCKED`, so each email is delivered by exactly one worker.
+"""
+import time
+from django.core.management.base import BaseCommand
+from apps.core.tasks import claim_outbox_emails, deliver_outbox_email
+
+
+class Command(BaseCommand):
+    help = "Delivers pending emails from the email outbox, retrying failures with exponential backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=50,
+            help="Maximum number of emails claimed per database round trip (default: 50)."
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=5.0,
+            help="Seconds to sleep when no email is due (default: 5)."
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Exit as soon as there are no more due emails instead of polling forever."
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        sent = failed = 0
+
+        try:
+            while True:
+                emails = claim_outbox_emails(batch_size=batch_size)
+                if not emails:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                for email in emails:
+                    if deliver_outbox_email(email):
+                        sent += 1
+                    else:
+                        failed += 1
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Outbox processed: {sent} sent, {failed} failed."))
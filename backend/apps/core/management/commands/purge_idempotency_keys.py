@@ -0,0 +1,21 @@
+"""
+Management command that deletes expired idempotency keys.
+
+USAGE:
+------
+    python manage.py purge_idempotency_keys     # e.g. hourly from cron
+
+Expired keys are already ignored (and replaced) when a client reuses them, so this only keeps
+the table small.
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.core.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Deletes idempotency keys whose stored responses have expired."
+
+    def handle(self, *args, **options):
+        deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency key(s)."))
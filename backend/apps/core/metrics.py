@@ -0,0 +1,145 @@
+"""
+In-Process Metrics for the HireSphereX Project.
+
+A small, dependency-free registry of counters and latency histograms, used to instrument
+email delivery (see `apps.core.utils` and `apps.core.tasks`).
+
+USAGE:
+======
+from apps.core.metrics import metrics
+
+metrics.increment('emails_sent_total', template='emails/welcome.html')
+with metrics.timer('email_send_seconds', template='emails/welcome.html'):
+    ...
+
+`metrics.snapshot()` returns everything recorded so far as a JSON-serializable dict; it is
+exposed at `GET /api/v1/core/metrics/email/`.
+
+NOTE: Values are kept per process. With several Gunicorn workers, each worker reports its own
+numbers, and they are reset when the worker restarts.
+"""
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Upper bounds (in seconds) of the latency buckets. They cover a cached render (well under 5ms)
+# up to a slow batch call to the email provider.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """
+    A fixed-bucket histogram of observed values, with approximate percentiles.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # The last slot counts values above every bucket.
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction):
+        """
+        Returns the upper bound of the bucket holding the given percentile (e.g. 0.99),
+        or the largest observed value if it falls above the last bucket.
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def as_dict(self):
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            buckets[f"le_{bound}"] = cumulative
+        buckets['le_inf'] = self.count
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'avg': round(self.total / self.count, 6) if self.count else None,
+            'max': round(self.max, 6),
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'buckets': buckets,
+        }
+
+
+class MetricsRegistry:
+    """
+    A thread-safe store of named counters and histograms, each optionally split by labels
+    (e.g. `template='emails/welcome.html'`).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def increment(self, name, amount=1, **labels):
+        """Adds `amount` to the counter `name` for the given labels."""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        """Records `value` (usually a duration in seconds) in the histogram `name`."""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        Times the enclosed block and records its duration, even if it raises.
+        Yields a dict whose 'seconds' key holds the duration once the block exits.
+        """
+        timing = {'seconds': None}
+        start = time.perf_counter()
+        try:
+            yield timing
+        finally:
+            timing['seconds'] = time.perf_counter() - start
+            self.observe(name, timing['seconds'], **labels)
+
+    def snapshot(self):
+        """
+        Returns all metrics as a JSON-serializable dict:
+        {'counters': {name: [{'labels': {...}, 'value': n}]}, 'histograms': {name: [{'labels': {...}, ...}]}}
+        """
+        with self._lock:
+            counters = {}
+            for (name, labels), value in sorted(self._counters.items()):
+                counters.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+            histograms = {}
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                histograms.setdefault(name, []).append({'labels': dict(labels), **histogram.as_dict()})
+        return {'counters': counters, 'histograms': histograms}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+metrics = MetricsRegistry()
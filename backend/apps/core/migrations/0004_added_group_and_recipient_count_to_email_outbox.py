@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_added_email_outbox_table'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='group',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='recipient_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.conf import settings
+from django.utils import timezone
+from django.core.serializers.json import DjangoJSONEncoder
 
 class Country(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -60,4 +63,92 @@ class Program(models.Model):
         return f"{self.degree.abbreviation} {self.abbreviation}"
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class EmailOutbox(models.Model):
+    """
+    A durable queue of outgoing emails.
+
+    Rows are written inside the caller's transaction, so an email only exists if the
+    business change that triggered it was committed. Delivery workers claim rows with
+    `SELECT ... FOR UPDATE SKIP LOCKED`, which lets several workers run in parallel
+    without sending the same email twice.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'Pending', 'Pending'
+        SENDING = 'Sending', 'Sending'
+        SENT = 'Sent', 'Sent'
+        FAILED = 'Failed', 'Failed'
+
+    subject = models.CharField(max_length=255)
+    template_name = models.CharField(max_length=255)
+    context = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    recipients = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    recipient_count = models.PositiveIntegerField(default=0)
+    is_bulk = models.BooleanField(default=False)
+    # Optional key tying related emails together (e.g. one drive announcement),
+    # so their delivery progress can be aggregated with `group_progress()`.
+    group = models.CharField(max_length=100, blank=True, default='', db_index=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='core_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient_count} recipient(s) [{self.status}]"
+
+    @classmethod
+    def group_progress(cls, group):
+        """
+        Summarises delivery of every email in `group`, counted in recipients.
+
+        Returns:
+            dict: {'queued': int, 'sent': int, 'failed': int}, where 'queued' covers
+                  emails that are pending, being sent or waiting for a retry.
+        """
+        totals = dict(
+            cls.objects.filter(group=group).values_list('status').annotate(
+                recipients=models.Sum('recipient_count')
+            ).order_by()
+        )
+        return {
+            'queued': totals.get(cls.Status.PENDING, 0) + totals.get(cls.Status.SENDING, 0),
+            'sent': totals.get(cls.Status.SENT, 0),
+            'failed': totals.get(cls.Status.FAILED, 0),
+        }
+
+class IdempotencyKey(models.Model):
+    """
+    The stored outcome of a POST sent with an `Idempotency-Key` header.
+
+    A row is claimed (with `response_status` empty) before the view runs and completed with the
+    response afterwards, so a retry with the same key gets the first response back instead of
+    running the view again. Keys are scoped to the user and expire after `IDEMPOTENCY_KEY_TTL`.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    # SHA-256 of the method, path and body, so a key reused for a different request is refused.
+    request_fingerprint = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    # Set while the first request is running; cleared once its response is stored.
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='core_idempotency_user_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.user_id}) -> {self.response_status or 'in progress'}"
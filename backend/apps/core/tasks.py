@@ -1,32 +1,446 @@
+"""
+Background Tasks for the HireSphereX Project.
+
+This module owns all "fire and forget" work that must not block an API response, most importantly email delivery.
+
+EMAIL DELIVERY:
+===============
+1. `send_email_in_background` / `send_bulk_email_in_background` / `send_emails_in_background` write
+   the email into the durable `EmailOutbox` table, inside the caller's transaction.
+2. Once that transaction commits, the row id is handed to the process-wide `EmailDispatcher`,
+   a fixed-size pool of worker threads fed by a bounded queue, which delivers it right away.
+3. Anything the dispatcher could not deliver (provider errors, a worker restart) stays in the
+   outbox and is retried with exponential backoff by `python manage.py process_email_outbox`.
+"""
+import os
+import queue
+import atexit
+import logging
 import threading
-from .utils import send_hirespherex_email
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Q, F, Count
+from django.utils import timezone
+from django.db import transaction, close_old_connections
+from .models import EmailOutbox
+from .metrics import metrics
+from .utils import send_hirespherex_email, send_hirespherex_bulk_email, chunked, PartialDeliveryError
+
+logger = logging.getLogger(__name__)
+
+
+class EmailDispatcher:
+    """
+    A fixed-size worker pool that delivers emails from a bounded in-memory queue.
+
+    DESIGN:
+    -------
+    - Workers are started lazily on the first submission (and restarted after a fork),
+      so a pre-forking server like Gunicorn never shares threads between processes.
+    - The queue is bounded. When it is full, `submit()` blocks for up to `enqueue_timeout`
+      seconds and then runs the job in the caller's thread. This applies backpressure to
+      the producer instead of silently dropping mail or growing memory without limit.
+    - `shutdown()` is registered with `atexit`, so a worker that is being stopped drains
+      every queued email before the process exits.
+    """
+    _STOP = object()
+
+    def __init__(self, worker_count=4, queue_size=1000, enqueue_timeout=5.0, shutdown_timeout=30.0):
+        self.worker_count = max(1, worker_count)
+        self.queue_size = queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self.shutdown_timeout = shutdown_timeout
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._workers = []
+        self._is_shutting_down = False
+
+    @property
+    def queue_depth(self):
+        """The number of jobs currently waiting for a free worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Schedules `func(*args, **kwargs)` to run on one of the pool's worker threads.
+
+        Falls back to running the job synchronously if the dispatcher is shutting down
+        or the queue stays full for longer than `enqueue_timeout`.
+        """
+        if self._is_shutting_down:
+            self._run_job(func, args, kwargs)
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put((func, args, kwargs), timeout=self.enqueue_timeout)
+        except queue.Full:
+            metrics.increment('email_jobs_run_inline_total')
+            logger.warning(
+                "Email queue is full (%s jobs); sending in the calling thread.", self.queue_size
+            )
+            self._run_job(func, args, kwargs)
+
+    def shutdown(self, timeout=None):
+        """
+        Stops accepting new work, drains everything already queued and joins the workers.
+
+        Args:
+            timeout (float): The total number of seconds to wait for the queue to drain.
+                             Defaults to `shutdown_timeout`.
+        """
+        with self._lock:
+            if self._is_shutting_down or not self._workers or self._pid != os.getpid():
+                return
+            self._is_shutting_down = True
+            workers = list(self._workers)
+
+        # One sentinel per worker. The queue is FIFO, so every job submitted
+        # before shutdown is processed before a worker sees its sentinel.
+        for _ in workers:
+            self._queue.put(self._STOP)
+
+        timeout = self.shutdown_timeout if timeout is None else timeout
+        for worker in workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                logger.error("Email worker %s did not finish draining within %ss.", worker.name, timeout)
+
+    def _ensure_started(self):
+        """Starts the worker threads for the current process if they are not running yet."""
+        pid = os.getpid()
+        if self._pid == pid and self._workers:
+            return
+
+        with self._lock:
+            if self._pid == pid and self._workers:
+                return
+            # Threads do not survive a fork, so a child process always builds its own pool.
+            self._pid = pid
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._workers = []
+            for index in range(self.worker_count):
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"email-worker-{index}",
+                    daemon=True,
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def _worker_loop(self):
+        """The main loop of a single worker thread."""
+        while True:
+            job = self._queue.get()
+            try:
+                if job is self._STOP:
+                    return
+                func, args, kwargs = job
+                self._run_job(func, args, kwargs)
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _run_job(func, args, kwargs):
+        """Runs a single job, logging failures instead of letting them kill the worker."""
+        # Worker threads are long-lived, so stale or broken database connections
+        # are recycled around each job, just like Django does around each request.
+        close_old_connections()
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            logger.exception("Background email job %s failed.", getattr(func, '__name__', func))
+        finally:
+            close_old_connections()
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_email_dispatcher():
+    """
+    Returns the process-wide `EmailDispatcher`, creating it from settings on first use.
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = EmailDispatcher(
+                    worker_count=getattr(settings, 'EMAIL_WORKER_COUNT', 4),
+                    queue_size=getattr(settings, 'EMAIL_QUEUE_MAXSIZE', 1000),
+                    enqueue_timeout=getattr(settings, 'EMAIL_ENQUEUE_TIMEOUT', 5.0),
+                    shutdown_timeout=getattr(settings, 'EMAIL_SHUTDOWN_TIMEOUT', 30.0),
+                )
+                atexit.register(_dispatcher.shutdown)
+    return _dispatcher
+
+
+def email_queue_stats():
+    """
+    Returns the current backlog of email delivery, for monitoring.
+
+    - 'dispatcher': jobs waiting for a free worker in this process's `EmailDispatcher`.
+    - 'outbox': outbox rows per status, counted across all processes (from the database),
+      plus how many pending rows are already due.
+    """
+    dispatcher = get_email_dispatcher()
+    by_status = dict(
+        EmailOutbox.objects.exclude(status=EmailOutbox.Status.SENT)
+        .values_list('status').annotate(total=Count('id')).order_by()
+    )
+    return {
+        'dispatcher': {
+            'queue_depth': dispatcher.queue_depth,
+            'queue_size': dispatcher.queue_size,
+            'worker_count': dispatcher.worker_count,
+        },
+        'outbox': {
+            'pending': by_status.get(EmailOutbox.Status.PENDING, 0),
+            'due': EmailOutbox.objects.filter(
+                status=EmailOutbox.Status.PENDING, next_attempt_at__lte=timezone.now()
+            ).count(),
+            'sending': by_status.get(EmailOutbox.Status.SENDING, 0),
+            'failed': by_status.get(EmailOutbox.Status.FAILED, 0),
+        },
+    }
+
+
+def claim_outbox_emails(batch_size=50, email_ids=None):
+    """
+    Atomically claims a batch of due outbox rows for delivery by the current worker.
+
+    Rows are locked with `SELECT ... FOR UPDATE SKIP LOCKED`, so concurrent workers never claim
+    the same row, and are moved to `Sending` before the lock is released. A row left in `Sending`
+    by a worker that died is reclaimed once `EMAIL_OUTBOX_CLAIM_TIMEOUT` seconds have passed.
+
+    Args:
+        batch_size (int): The maximum number of rows to claim.
+        email_ids (list): Restricts the claim to these outbox ids (used by the in-process dispatcher).
+
+    Returns:
+        list: The claimed `EmailOutbox` instances.
+    """
+    now = timezone.now()
+    stale_claim = now - timedelta(seconds=getattr(settings, 'EMAIL_OUTBOX_CLAIM_TIMEOUT', 300))
+
+    with transaction.atomic():
+        due = EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+            Q(status=EmailOutbox.Status.PENDING, next_attempt_at__lte=now) |
+            Q(status=EmailOutbox.Status.SENDING, claimed_at__lt=stale_claim)
+        )
+        if email_ids is not None:
+            due = due.filter(id__in=email_ids)
+
+        claimed_ids = list(due.order_by('next_attempt_at').values_list('id', flat=True)[:batch_size])
+        if not claimed_ids:
+            return []
+
+        EmailOutbox.objects.filter(id__in=claimed_ids).update(
+            status=EmailOutbox.Status.SENDING,
+            claimed_at=now,
+            attempts=F('attempts') + 1,
+        )
+
+    return list(EmailOutbox.objects.filter(id__in=claimed_ids))
+
+
+def deliver_outbox_email(email):
+    """
+    Sends one claimed outbox row and records the outcome.
+
+    On failure the next attempt is scheduled with exponential backoff, until
+    `EMAIL_OUTBOX_MAX_ATTEMPTS` is reached and the row is marked `Failed`. Once the row is
+    `Sent` or `Failed` its context is cleared, since it may contain one-time secrets such as
+    generated passwords. If a bulk send fails part-way, the recipients already reached are split
+    off first, so the retry does not send them a second copy.
+
+    Args:
+        email (EmailOutbox): A row previously returned by `claim_outbox_emails`.
+
+    Returns:
+        bool: True if the email was sent.
+    """
+    send = send_hirespherex_bulk_email if email.is_bulk else send_hirespherex_email
+    try:
+        send(email.subject, email.template_name, email.context, email.recipients)
+    except Exception as exc:
+        if isinstance(exc, PartialDeliveryError):
+            _split_delivered_recipients(email, exc.delivered)
+        max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+        base_delay = getattr(settings, 'EMAIL_OUTBOX_RETRY_BASE_SECONDS', 30)
+        max_delay = getattr(settings, 'EMAIL_OUTBOX_RETRY_MAX_SECONDS', 3600)
+
+        if email.attempts >= max_attempts:
+            # Nothing will read the context again, and it may hold a one-time password.
+            email.status = EmailOutbox.Status.FAILED
+            email.context = {}
+            metrics.increment('email_outbox_failed_total', template=email.template_name)
+        else:
+            metrics.increment('email_outbox_retries_total', template=email.template_name)
+            delay = min(base_delay * (2 ** (email.attempts - 1)), max_delay)
+            email.status = EmailOutbox.Status.PENDING
+            email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        email.last_error = f"{exc.__class__.__name__}: {exc}"
+        email.save(update_fields=['status', 'next_attempt_at', 'context', 'last_error'])
+        logger.warning(
+            "Email %s (%s) failed on attempt %s: %s", email.id, email.template_name, email.attempts, exc
+        )
+        return False
+
+    email.status = EmailOutbox.Status.SENT
+    email.sent_at = timezone.now()
+    email.context = {}
+    email.last_error = ''
+    email.save(update_fields=['status', 'sent_at', 'context', 'last_error'])
+    return True
+
+
+def _split_delivered_recipients(email, delivered):
+    """
+    Moves the recipients a bulk send already reached into a separate `Sent` row (same group, so
+    progress counts stay right), leaving only the undelivered ones on `email` for the retry.
+    """
+    delivered_set = set(delivered)
+    remaining = [address for address in email.recipients if address not in delivered_set]
+    with transaction.atomic():
+        EmailOutbox.objects.create(
+            subject=email.subject,
+            template_name=email.template_name,
+            recipients=delivered,
+            recipient_count=len(delivered),
+            is_bulk=email.is_bulk,
+            group=email.group,
+            status=EmailOutbox.Status.SENT,
+            attempts=email.attempts,
+            sent_at=timezone.now(),
+        )
+        email.recipients = remaining
+        email.recipient_count = len(remaining)
+        email.save(update_fields=['recipients', 'recipient_count'])
+
+
+def process_outbox_emails(email_ids):
+    """
+    Claims and delivers specific outbox rows. This is the job run by the `EmailDispatcher`
+    right after the transaction that created the rows commits.
+    """
+    for email in claim_outbox_emails(batch_size=len(email_ids), email_ids=email_ids):
+        deliver_outbox_email(email)
+
+
+def _dispatch_after_commit(email_ids, per_job=1):
+    """
+    Hands the given outbox rows to the worker pool once the current transaction commits,
+    `per_job` rows per worker job.
+    """
+    dispatcher = get_email_dispatcher()
+    for chunk in chunked(email_ids, per_job):
+        transaction.on_commit(lambda chunk=chunk: dispatcher.submit(process_outbox_emails, chunk))
+
 
 def send_email_in_background(subject, template_name, context, recipient_list):
     """
-    Sends an email in a separate background thread.
+    Queues an email for delivery on the shared background worker pool.
     This makes the API response return immediately without waiting for the email to be sent.
-    
+
+    The email is stored in the `EmailOutbox` as part of the caller's transaction: if the
+    transaction rolls back, no email is sent. If delivery fails, it is retried later by
+    the `process_email_outbox` management command.
+
     USAGE:
     ------
     # In views or serializers, call this instead of send_hirespherex_email directly
     send_email_in_background(
         subject="Welcome to HireSphereX!",
-        template_name="emails/welcome.html", 
-        context={'user': user, 'password': temp_password},
+        template_name="emails/welcome.html",
+        context={'first_name': user.first_name, 'password': temp_password},
         recipient_list=[user.email]
     )
-    
+
     PARAMETERS:
     ----------
     :param subject: Email subject line
     :param template_name: Path to email template (e.g., 'emails/welcome.html')
-    :param context: Dictionary of variables to render in template
+    :param context: JSON-serializable dictionary of variables to render in template
     :param recipient_list: List of email addresses to receive the email
     """
-    # Create a new thread that will run the send_hirespherex_email function
-    email_thread = threading.Thread(
-        target=send_hirespherex_email,
-        args=(subject, template_name, context, recipient_list)
+    recipient_list = list(recipient_list)
+    email = EmailOutbox.objects.create(
+        subject=subject,
+        template_name=template_name,
+        context=context,
+        recipients=recipient_list,
+        recipient_count=len(recipient_list),
     )
-    # Start the thread. This returns immediately.
-    email_thread.start()
\ No newline at end of file
+    _dispatch_after_commit([email.id])
+
+
+def send_bulk_email_in_background(subject, template_name, context, recipient_list, group=''):
+    """
+    Queues the same email for many recipients on the shared background worker pool.
+
+    Recipients are split into chunks of `EMAIL_BATCH_SIZE`, and each chunk becomes one outbox row
+    which `send_hirespherex_bulk_email` delivers with one batch API call (or one shared connection).
+    Use this for fan-out notifications where the context is identical for every recipient.
+
+    PARAMETERS:
+    ----------
+    :param subject: Email subject line
+    :param template_name: Path to email template (e.g., 'emails/drive_notification.html')
+    :param context: JSON-serializable dictionary of variables to render in template, shared by all recipients
+    :param recipient_list: Iterable of email addresses, each of which receives a separate email
+    :param group: Optional key to track the delivery progress of this send with `EmailOutbox.group_progress`
+    """
+    batch_size = getattr(settings, 'EMAIL_BATCH_SIZE', 500)
+    emails = EmailOutbox.objects.bulk_create([
+        EmailOutbox(
+            subject=subject,
+            template_name=template_name,
+            context=context,
+            recipients=chunk,
+            recipient_count=len(chunk),
+            is_bulk=True,
+            group=group,
+        )
+        for chunk in chunked(recipient_list, batch_size)
+    ])
+    _dispatch_after_commit([email.id for email in emails])
+
+
+def send_emails_in_background(emails, group=''):
+    """
+    Queues many individual emails (each with its own context) in one go.
+
+    All rows are written to the outbox with a single bulk insert, and handed to the worker pool
+    in chunks once the caller's transaction commits. Use this when one action notifies many
+    people with personalized emails, e.g. results for a whole shortlist.
+
+    PARAMETERS:
+    ----------
+    :param emails: Iterable of dicts with the keys `subject`, `template_name`, `context` and `recipient_list`,
+                   i.e. the arguments of `send_email_in_background`
+    :param group: Optional key to track the delivery progress of these emails with `EmailOutbox.group_progress`
+    """
+    outbox = []
+    for email in emails:
+        recipient_list = list(email['recipient_list'])
+        outbox.append(EmailOutbox(
+            subject=email['subject'],
+            template_name=email['template_name'],
+            context=email['context'],
+            recipients=recipient_list,
+            recipient_count=len(recipient_list),
+            group=group,
+        ))
+    if not outbox:
+        return []
+
+    outbox = EmailOutbox.objects.bulk_create(outbox)
+    dispatcher = get_email_dispatcher()
+    per_job = max(1, -(-len(outbox) // dispatcher.worker_count))
+    _dispatch_after_commit([email.id for email in outbox], per_job=min(per_job, 50))
+    return outbox
+
@@ -1,3 +1,175 @@
-from django.test import TestCase
+import threading
+from io import StringIO
+from datetime import timedelta
+from unittest import mock
+from smtplib import SMTPException
+from django.contrib import admin
+from django.core import mail
+from django.core.management import call_command
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.utils import timezone
+from .admin import EmailOutboxAdmin
+from apps.users.models import User
+from .models import EmailOutbox, IdempotencyKey
+from .tasks import (
+    EmailDispatcher, claim_outbox_emails, deliver_outbox_email, send_bulk_email_in_background,
+)
 
-# Create your tests here.
+
+class FlakySMTPBackend(LocmemEmailBackend):
+    """Delivers like the test backend, but drops the connection at every address in `failing`."""
+    failing = set()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.failing:
+                raise SMTPException('Connection unexpectedly closed')
+        return super().send_messages(messages)
+
+
+class EmailDispatcherTests(SimpleTestCase):
+    # Jobs recycle database connections around each run; this test runs no queries.
+    @mock.patch('apps.core.tasks.close_old_connections')
+    def test_runs_job_in_calling_thread_when_queue_is_full(self, close_old_connections):
+        dispatcher = EmailDispatcher(worker_count=1, queue_size=1, enqueue_timeout=0.01)
+        started, release = threading.Event(), threading.Event()
+        ran_in = []
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        try:
+            dispatcher.submit(block)
+            self.assertTrue(started.wait(5))
+            dispatcher.submit(lambda: ran_in.append('queued'))
+            # The only worker is busy and the queue is full, so this one cannot wait for a worker.
+            with self.assertLogs('apps.core.tasks', 'WARNING'):
+                dispatcher.submit(lambda: ran_in.append(threading.current_thread()))
+            self.assertEqual(ran_in, [threading.current_thread()])
+        finally:
+            release.set()
+            dispatcher.shutdown(timeout=5)
+        self.assertEqual(ran_in, [threading.current_thread(), 'queued'])
+
+
+@override_settings(
+    EMAIL_OUTBOX_MAX_ATTEMPTS=3, EMAIL_OUTBOX_RETRY_BASE_SECONDS=30,
+    EMAIL_OUTBOX_RETRY_MAX_SECONDS=45, EMAIL_OUTBOX_CLAIM_TIMEOUT=300,
+)
+class EmailOutboxDeliveryTests(TestCase):
+    def _email(self, **fields):
+        return EmailOutbox.objects.create(
+            subject='Welcome', template_name='emails/welcome.html', context={'first_name': 'Asha', 'password': 'Temp#4821'},
+            recipients=['asha@example.com'], recipient_count=1, **fields
+        )
+
+    def test_stale_sending_rows_are_reclaimed(self):
+        now = timezone.now()
+        stale = self._email(status=EmailOutbox.Status.SENDING, claimed_at=now - timedelta(seconds=301), attempts=1)
+        self._email(status=EmailOutbox.Status.SENDING, claimed_at=now - timedelta(seconds=10), attempts=1)
+        self._email(next_attempt_at=now + timedelta(minutes=5))
+
+        claimed = claim_outbox_emails()
+
+        self.assertEqual([email.pk for email in claimed], [stale.pk])
+        self.assertEqual(claimed[0].attempts, 2)
+        self.assertGreaterEqual(claimed[0].claimed_at, now)
+
+    @mock.patch('apps.core.tasks.send_hirespherex_email', side_effect=SMTPException('Service unavailable'))
+    def test_backoff_grows_until_the_row_fails(self, send):
+        email = self._email()
+        delays = []
+        for _ in range(3):
+            [claimed] = claim_outbox_emails()
+            before = timezone.now()
+            with self.assertLogs('apps.core.tasks', 'WARNING'):
+                self.assertFalse(deliver_outbox_email(claimed))
+            claimed.refresh_from_db()
+            if claimed.status == EmailOutbox.Status.PENDING:
+                self.assertEqual(claimed.context['password'], 'Temp#4821')
+                delays.append(round((claimed.next_attempt_at - before).total_seconds()))
+                # Make the retry due now instead of waiting for the backoff.
+                EmailOutbox.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+
+        email.refresh_from_db()
+        # 30s, then 60s capped at the 45s maximum; the third attempt is the last one.
+        self.assertEqual(delays, [30, 45])
+        self.assertEqual(email.status, EmailOutbox.Status.FAILED)
+        self.assertEqual(email.attempts, 3)
+        self.assertEqual(email.last_error, 'SMTPException: Service unavailable')
+        self.assertEqual(email.context, {})
+        self.assertEqual(send.call_count, 3)
+        self.assertEqual(claim_outbox_emails(), [])
+
+    @override_settings(EMAIL_BATCH_SIZE=2)
+    @mock.patch('apps.core.tasks.get_email_dispatcher')
+    def test_bulk_send_is_chunked_by_batch_size(self, get_dispatcher):
+        recipients = [f'student{index}@example.com' for index in range(5)]
+        with self.captureOnCommitCallbacks(execute=True):
+            send_bulk_email_in_background(
+                'New drive', 'emails/drive_notification.html', {'company_name': 'Acme'}, recipients, group='drive:1'
+            )
+
+        rows = list(EmailOutbox.objects.order_by('id').values_list('recipients', 'recipient_count', 'is_bulk', 'group'))
+        self.assertEqual(rows, [
+            (recipients[0:2], 2, True, 'drive:1'),
+            (recipients[2:4], 2, True, 'drive:1'),
+            (recipients[4:], 1, True, 'drive:1'),
+        ])
+        # One worker job per outbox row, handed over once the transaction committed.
+        self.assertEqual(get_dispatcher.return_value.submit.call_count, 3)
+
+    @override_settings(EMAIL_BACKEND='apps.core.tests.FlakySMTPBackend')
+    def test_partial_bulk_failure_only_retries_undelivered_recipients(self):
+        recipients = [f'student{index}@example.com' for index in range(4)]
+        email = EmailOutbox.objects.create(
+            subject='New drive', template_name='emails/drive_notification.html',
+            context={'company_name': 'Acme', 'job_roles': ['Engineer']}, recipients=recipients,
+            recipient_count=4, is_bulk=True, group='drive:1'
+        )
+
+        with mock.patch.object(FlakySMTPBackend, 'failing', {recipients[2]}), self.assertLogs('apps.core', 'WARNING'):
+            [claimed] = claim_outbox_emails()
+            self.assertFalse(deliver_outbox_email(claimed))
+        self.assertEqual([message.to for message in mail.outbox], [[recipients[0]], [recipients[1]]])
+
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.recipients, email.recipient_count), (EmailOutbox.Status.PENDING, recipients[2:], 2))
+        self.assertEqual(EmailOutbox.group_progress('drive:1'), {'queued': 2, 'sent': 2, 'failed': 0})
+
+        EmailOutbox.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        [claimed] = claim_outbox_emails()
+        with self.assertLogs('apps.core.utils', 'INFO'):
+            self.assertTrue(deliver_outbox_email(claimed))
+        self.assertEqual(sorted(address for message in mail.outbox for address in message.to), recipients)
+        self.assertEqual(EmailOutbox.group_progress('drive:1'), {'queued': 0, 'sent': 4, 'failed': 0})
+
+
+class EmailOutboxAdminTests(SimpleTestCase):
+    def test_context_is_not_shown(self):
+        model_admin = EmailOutboxAdmin(EmailOutbox, admin.site)
+        form = model_admin.get_form(request=None)
+        self.assertNotIn('context', form.base_fields)
+        self.assertNotIn('context', model_admin.get_fields(request=None))
+
+
+class PurgeIdempotencyKeysTests(TestCase):
+    def test_only_expired_keys_are_deleted(self):
+        user = User.objects.create_user(email='asha@example.com', phone_number='9000000001', first_name='Asha')
+        now = timezone.now()
+        for key, expires_in, response_status in (
+            ('expired', timedelta(seconds=-1), 201), ('expired-in-progress', timedelta(hours=-1), None),
+            ('live', timedelta(hours=1), 201), ('live-in-progress', timedelta(seconds=30), None),
+        ):
+            IdempotencyKey.objects.create(
+                user=user, key=key, request_fingerprint='0' * 64, response_status=response_status,
+                locked_at=None if response_status else now, expires_at=now + expires_in
+            )
+
+        stdout = StringIO()
+        call_command('purge_idempotency_keys', stdout=stdout)
+
+        self.assertEqual(sorted(IdempotencyKey.objects.values_list('key', flat=True)), ['live', 'live-in-progress'])
+        self.assertIn('Deleted 2 expired', stdout.getvalue())
@@ -7,4 +7,5 @@ router = DefaultRouter()
 urlpatterns = [
     path('', include(router.urls)),
     path('lookup/', views.LookupAPI.as_view(), name='core-lookup'),
+    path('metrics/email/', views.EmailMetricsAPI.as_view(), name='core-email-metrics'),
 ]
\ No newline at end of file
@@ -4,9 +4,91 @@ Core Utilities for the HireSphereX Project.
 This module contains shared, reusable utility functions that can be used by any app across the project. 
 Centralizing utilities like email sending ensures consistency and follows the DRY (Don't Repeat Yourself) principle.
 """
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from django.conf import settings
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+from django.template.loader import get_template
+from anymail.message import AnymailMessage
+from anymail.backends.base import AnymailBaseBackend
+from django.core.mail import send_mail, get_connection, EmailMultiAlternatives
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class EmailTemplateRenderer:
+    """
+    A rendering layer for email templates that avoids repeated work during fan-out sends.
+
+    - Templates are loaded with Django's `get_template`, so each one is compiled once per process by
+      the cached template loader, which the development server resets whenever a template is edited.
+    - Optionally, rendered HTML is memoized in an LRU cache keyed by (template, context fingerprint),
+      so sending the same email to a whole cohort renders it exactly once.
+
+    Memoization is opt-in because per-user emails (welcome, password reset, offers) carry unique
+    and sometimes sensitive context; their output is never kept in memory.
+    """
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._rendered = OrderedDict()
+
+    def render(self, template_name, context, memoize=False):
+        """
+        Renders `template_name` with `context`.
+
+        Args:
+            template_name (str): The path to the template, relative to the 'templates' directory.
+            context (dict): The data to render into the template.
+            memoize (bool): Whether to serve and store the output in the rendered-HTML cache.
+
+        Returns:
+            str: The rendered HTML.
+        """
+        key = self._cache_key(template_name, context) if memoize else None
+        if key is not None:
+            with self._lock:
+                html = self._rendered.get(key)
+                if html is not None:
+                    self._rendered.move_to_end(key)
+                    return html
+
+        html = get_template(template_name).render(context)
+
+        if key is not None:
+            with self._lock:
+                self._rendered[key] = html
+                self._rendered.move_to_end(key)
+                while len(self._rendered) > self.max_entries:
+                    self._rendered.popitem(last=False)
+        return html
+
+    def clear(self):
+        """Drops all memoized output (e.g. after editing a template)."""
+        with self._lock:
+            self._rendered.clear()
+
+    @staticmethod
+    def _cache_key(template_name, context):
+        """
+        Builds a stable fingerprint of the context. Returns None if the context
+        cannot be serialized, in which case the output is simply not memoized.
+        """
+        try:
+            payload = json.dumps(context, sort_keys=True, default=str)
+        except (TypeError, ValueError):
+            return None
+        return template_name, hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+email_renderer = EmailTemplateRenderer(
+    max_entries=getattr(settings, 'EMAIL_RENDER_CACHE_SIZE', 128)
+)
+
 
 def send_hirespherex_email(subject, template_name, context, recipient_list):
     """
@@ -27,14 +109,165 @@ def send_hirespherex_email(subject, template_name, context, recipient_list):
     """
     # Renders the specified HTML template with the provided context data,
     # turning it into a string that can be used as the email body.
-    html_message = render_to_string(template_name, context)
+    with metrics.timer('email_render_seconds', template=template_name) as render_timing:
+        html_message = email_renderer.render(template_name, context)
 
     # Uses Django's built-in mail function to send the email.
-    send_mail(
-        subject=subject,
-        message='',  
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=recipient_list,
-        html_message=html_message,
-        fail_silently=False, 
-    )
\ No newline at end of file
+    with _instrumented_send(template_name, len(recipient_list), render_timing, bulk=False):
+        send_mail(
+            subject=subject,
+            message='',  
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=recipient_list,
+            html_message=html_message,
+            fail_silently=False, 
+        )
+
+
+@contextmanager
+def _instrumented_send(template_name, recipient_count, render_timing, bulk):
+    """
+    Wraps a backend send: records its latency and success/failure counters per template,
+    and writes one structured log record (`extra` fields) for every delivery attempt.
+    """
+    outcome = 'sent'
+    error = ''
+    try:
+        with metrics.timer('email_send_seconds', template=template_name) as send_timing:
+            yield
+    except Exception as exc:
+        outcome = 'failed'
+        error = f"{exc.__class__.__name__}: {exc}"
+        raise
+    finally:
+        counter = 'emails_sent_total' if outcome == 'sent' else 'emails_failed_total'
+        metrics.increment(counter, template=template_name)
+        metrics.increment(f'email_recipients_{outcome}_total', recipient_count, template=template_name)
+
+        fields = {
+            'event': f'email_{outcome}',
+            'template': template_name,
+            'recipients': recipient_count,
+            'bulk': bulk,
+            'render_ms': round(render_timing['seconds'] * 1000, 2),
+            'send_ms': round(send_timing['seconds'] * 1000, 2),
+        }
+        if error:
+            fields['error'] = error
+        logger.log(
+            logging.WARNING if error else logging.INFO,
+            " ".join(f"{key}={value}" for key, value in fields.items()),
+            extra={'email': fields},
+        )
+
+
+def chunked(items, size):
+    """
+    Splits a sequence into consecutive lists of at most `size` items.
+
+    Args:
+        items (iterable): The items to split.
+        size (int): The maximum number of items per chunk.
+
+    Yields:
+        list: The next chunk of items.
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class PartialDeliveryError(Exception):
+    """A bulk send failed after some recipients were already sent their copy (in `delivered`)."""
+    def __init__(self, delivered, error):
+        self.delivered = list(delivered)
+        super().__init__(f"{error.__class__.__name__}: {error} (after {len(self.delivered)} recipient(s))")
+
+
+def send_hirespherex_bulk_email(subject, template_name, context, recipient_list):
+    """
+    Renders a template once and sends the same email to many recipients.
+
+    Unlike `send_hirespherex_email`, every recipient receives their own copy of the email, so
+    recipients never see each other's addresses. How this happens depends on the active backend:
+
+    - Anymail backends (e.g. Brevo): recipients are sent in chunks of `EMAIL_BATCH_SIZE`, using
+      Anymail's batch sending (`merge_data`). Each chunk is a single API call, and the provider
+      splits it into one isolated message per recipient.
+    - Any other backend (SMTP, console, ...): one message per recipient is sent over a single,
+      shared connection.
+
+    Args:
+        subject (str): The subject line of the email.
+        template_name (str): The path to the email template, relative to the 'templates' directory
+        context (dict): A dictionary of data to be rendered into the template. It must be the same
+                        for every recipient.
+        recipient_list (list): A list of recipient email addresses.
+
+    Raises:
+        PartialDeliveryError: If the (non-Anymail) backend fails after some recipients were sent.
+        Exception: Will raise an exception if the email backend fails to send a chunk.
+    """
+    recipient_list = list(recipient_list)
+    if not recipient_list:
+        return
+
+    # The context is shared by every recipient, so the output is memoized:
+    # all chunks of a fan-out send reuse a single render.
+    with metrics.timer('email_render_seconds', template=template_name) as render_timing:
+        html_message = email_renderer.render(template_name, context, memoize=True)
+    connection = get_connection(fail_silently=False)
+
+    if isinstance(connection, AnymailBaseBackend):
+        batch_size = getattr(settings, 'EMAIL_BATCH_SIZE', 500)
+        messages = []
+        for chunk in chunked(recipient_list, batch_size):
+            message = AnymailMessage(
+                subject=subject,
+                body='',
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=chunk,
+                connection=connection,
+            )
+            message.attach_alternative(html_message, 'text/html')
+            # An (empty) merge_data entry per recipient turns this into a batch send:
+            # one API call, but an individual message for every address in `to`.
+            message.merge_data = {address: {} for address in chunk}
+            messages.append(message)
+    else:
+        messages = []
+        for address in recipient_list:
+            message = EmailMultiAlternatives(
+                subject=subject,
+                body='',
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[address],
+                connection=connection,
+            )
+            message.attach_alternative(html_message, 'text/html')
+            messages.append(message)
+
+    with _instrumented_send(template_name, len(recipient_list), render_timing, bulk=True):
+        if isinstance(connection, AnymailBaseBackend):
+            connection.send_messages(messages)
+            return
+
+        # One message at a time over the shared connection, so that if the server fails
+        # half-way, the caller knows which recipients already have their copy.
+        delivered = []
+        connection.open()
+        try:
+            for message in messages:
+                connection.send_messages([message])
+                delivered.extend(message.to)
+        except Exception as exc:
+            if delivered:
+                raise PartialDeliveryError(delivered, exc) from exc
+            raise
+        finally:
+            connection.close()
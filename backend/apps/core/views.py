@@ -6,8 +6,11 @@ including a BaseViewSet that standardizes API responses for all CRUD operations.
 A set of `ReadOnlyModelViewSet` classes for providing public, 
 filterable lookup data (e.g., countries, states, programs) to the frontend.
 """
-from rest_framework import viewsets
+from rest_framework import viewsets, permissions
 from rest_framework.views import APIView
+from .metrics import metrics
+from .permissions import IsAdminRole
+from .tasks import email_queue_stats
 from .pagination import StandardPagination
 from .models import Country, State, City, Degree, Program
 from .response import (
@@ -161,4 +164,22 @@ class LookupAPI(APIView):
                 )
                 
         except Exception as e:
-            return ErrorResponse(message=str(e))
\ No newline at end of file
+            return ErrorResponse(message=str(e))
+
+
+class EmailMetricsAPI(APIView):
+    """
+    Email delivery metrics - ADMIN ONLY
+    URL: GET /api/v1/core/metrics/email/
+
+    Returns the current queue depth (in-process dispatcher and durable outbox), success/failure
+    counters and per-template render/send latency histograms (count, avg, p50/p95/p99, buckets).
+    Counters and histograms are per worker process; the outbox figures are global.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminRole]
+
+    def get(self, request):
+        return SuccessResponse(
+            data={'queue': email_queue_stats(), **metrics.snapshot()},
+            message="Email metrics retrieved successfully"
+        )
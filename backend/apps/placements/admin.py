@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import PlacementDrive, CompanyDrive
+from .models import PlacementDrive, CompanyDrive, DriveEligibilitySnapshot, SavedSearch
 
 admin.site.register(PlacementDrive)
-admin.site.register(CompanyDrive)
\ No newline at end of file
+admin.site.register(CompanyDrive)
+admin.site.register(DriveEligibilitySnapshot)
+admin.site.register(SavedSearch)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PlacementsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.placements'
+
+    def ready(self):
+        # Connects the receivers that invalidate cached eligibility decisions and rebuild job rankings.
+        import apps.placements.signals
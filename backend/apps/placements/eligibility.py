@@ -0,0 +1,407 @@
+"""
+Job Eligibility Engine for the HireSphereX Project.
+
+Translates a Job's criteria into SQL, so eligibility is evaluated by the database in one pass:
+either one job against the whole student table (`eligible_students_q`), or one student against
+every job (`annotate_job_eligibility`), instead of one student/job pair at a time in Python.
+
+RULES (same as the application validator):
+==========================================
+1. The student's program must be one of the job's `eligible_programs`.
+2. UG students need `current_cgpa >= min_ug_cgpa`, PG students `current_cgpa >= min_pg_cgpa`.
+   Other degree levels have no CGPA cutoff.
+3. `tenth_percentage >= min_tenth_percentage` and `twelfth_percentage >= min_twelfth_percentage`.
+4. `active_backlogs <= max_active_backlogs`.
+
+A cutoff that is not set (NULL or 0) does not apply. A student with no value for a cutoff
+that does apply (e.g. no CGPA entered yet) is not eligible.
+
+CACHING:
+========
+`eligibility_cache` stores the decision for each (student, job) pair, keyed by both objects'
+`eligibility_version`. Signals increment a version whenever a relevant field changes
+(apps.students.signals, apps.placements.signals), so a stale decision is simply never looked up
+again and expires on its own.
+
+SNAPSHOTS:
+==========
+`snapshot_due_drives` freezes every student's eligibility for each job of a drive whose
+application deadline has passed into `DriveEligibilitySnapshot` (one bulk insert per drive).
+"""
+import logging
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Q, F, Count, Case, When, Value, Exists, OuterRef, Subquery, BooleanField, ExpressionWrapper
+from apps.core.models import Program
+from apps.core.metrics import metrics
+from apps.core.utils import chunked
+from apps.students.models import StudentProfile
+from apps.applications.models import CompanyDriveApplication, JobPreference
+from .models import CompanyDrive, Job, JobProgram, DriveEligibilitySnapshot
+
+logger = logging.getLogger(__name__)
+
+
+def eligible_students_q(job, program_ids=None):
+    """
+    Builds a single `StudentProfile` predicate matching every student who is eligible for `job`.
+
+    Args:
+        job (Job): The job whose criteria are applied.
+        program_ids (iterable): The job's eligible program ids, if already known. Otherwise
+                                they are matched with a subquery on `JobProgram`.
+
+    Returns:
+        Q: A filter for `StudentProfile.objects.filter(...)`.
+    """
+    if program_ids is None:
+        program_ids = JobProgram.objects.filter(job=job).values('program_id')
+    else:
+        program_ids = list(program_ids)
+
+    predicate = Q(program_id__in=program_ids)
+
+    ug_cgpa = Q(program__degree_level=Program.DegreeLevel.UNDERGRADUATE)
+    if job.min_ug_cgpa:
+        ug_cgpa &= Q(current_cgpa__gte=job.min_ug_cgpa)
+    pg_cgpa = Q(program__degree_level=Program.DegreeLevel.POSTGRADUATE)
+    if job.min_pg_cgpa:
+        pg_cgpa &= Q(current_cgpa__gte=job.min_pg_cgpa)
+    other_levels = ~Q(program__degree_level__in=[
+        Program.DegreeLevel.UNDERGRADUATE, Program.DegreeLevel.POSTGRADUATE
+    ])
+    predicate &= ug_cgpa | pg_cgpa | other_levels
+
+    if job.min_tenth_percentage:
+        predicate &= Q(tenth_percentage__gte=job.min_tenth_percentage)
+    if job.min_twelfth_percentage:
+        predicate &= Q(twelfth_percentage__gte=job.min_twelfth_percentage)
+    if job.max_active_backlogs is not None:
+        predicate &= Q(active_backlogs__lte=job.max_active_backlogs)
+
+    return predicate
+
+
+def _meets_cutoff(field, value):
+    """
+    A Job-side predicate: the minimum in `field` is not set, or the student's `value` clears it.
+    A missing value (None) only passes when there is no cutoff.
+    """
+    not_set = Q(**{f'{field}__isnull': True}) | Q(**{field: 0})
+    if value is None:
+        return not_set
+    return not_set | Q(**{f'{field}__lte': value})
+
+
+def _as_flag(predicate):
+    return ExpressionWrapper(predicate, output_field=BooleanField())
+
+
+def annotate_job_eligibility(jobs, student):
+    """
+    Annotates a `Job` queryset with the eligibility of one student, criterion by criterion,
+    so that every job is evaluated in the same query that loads it.
+
+    Added boolean annotations: `is_program_eligible`, `meets_cgpa`, `meets_tenth`,
+    `meets_twelfth`, `meets_backlogs` and their conjunction, `is_eligible`.
+    Use `eligibility_reasons()` to turn them into messages.
+
+    Args:
+        jobs (QuerySet): The jobs to evaluate.
+        student (StudentProfile): The student, with `program` loaded.
+    """
+    degree_level = student.program.degree_level if student.program_id else None
+    if degree_level == Program.DegreeLevel.UNDERGRADUATE:
+        meets_cgpa = _meets_cutoff('min_ug_cgpa', student.current_cgpa)
+    elif degree_level == Program.DegreeLevel.POSTGRADUATE:
+        meets_cgpa = _meets_cutoff('min_pg_cgpa', student.current_cgpa)
+    else:
+        meets_cgpa = Q(pk__isnull=False)
+
+    meets_backlogs = Q(max_active_backlogs__isnull=True) | Q(max_active_backlogs__gte=student.active_backlogs)
+    criteria = {
+        'is_program_eligible': Q(Exists(
+            JobProgram.objects.filter(job=OuterRef('pk'), program_id=student.program_id)
+        )),
+        'meets_cgpa': meets_cgpa,
+        'meets_tenth': _meets_cutoff('min_tenth_percentage', student.tenth_percentage),
+        'meets_twelfth': _meets_cutoff('min_twelfth_percentage', student.twelfth_percentage),
+        'meets_backlogs': meets_backlogs,
+    }
+
+    is_eligible = Q()
+    for predicate in criteria.values():
+        is_eligible &= predicate
+
+    return jobs.annotate(
+        **{name: _as_flag(predicate) for name, predicate in criteria.items()},
+        is_eligible=_as_flag(is_eligible),
+    )
+
+
+def eligibility_reasons(job, student):
+    """
+    Explains why `student` is not eligible for `job`, from the annotations added by
+    `annotate_job_eligibility`. Returns an empty list if the student is eligible.
+    """
+    reasons = []
+    if not job.is_program_eligible:
+        reasons.append("Your program is not eligible for this job")
+    if not job.meets_cgpa:
+        level = student.program.degree_level
+        cutoff = job.min_ug_cgpa if level == Program.DegreeLevel.UNDERGRADUATE else job.min_pg_cgpa
+        reasons.append(f"{level} CGPA {student.current_cgpa} below required {cutoff}")
+    if not job.meets_tenth:
+        reasons.append(
+            f"10th percentage {student.tenth_percentage} below required {job.min_tenth_percentage}"
+        )
+    if not job.meets_twelfth:
+        reasons.append(
+            f"12th percentage {student.twelfth_percentage} below required {job.min_twelfth_percentage}"
+        )
+    if not job.meets_backlogs:
+        reasons.append(
+            f"Active backlogs {student.active_backlogs} exceed maximum {job.max_active_backlogs}"
+        )
+    return reasons
+
+
+def _histogram(students, field, cutoff, bin_width, window):
+    """
+    Counts `students` per `bin_width`-wide bin of `field`, for values within `window` of `cutoff`.
+    All bins are counted by a single aggregate query.
+    """
+    cutoff, bin_width, window = Decimal(cutoff), Decimal(bin_width), Decimal(window)
+    edges = []
+    low = cutoff - window
+    while low < cutoff + window:
+        edges.append((low, low + bin_width))
+        low += bin_width
+
+    counts = students.aggregate(**{
+        f'bin_{index}': Count('pk', filter=Q(**{f'{field}__gte': start, f'{field}__lt': end}))
+        for index, (start, end) in enumerate(edges)
+    }) if edges else {}
+    return [
+        {'from': start, 'to': end, 'count': counts[f'bin_{index}'], 'clears_cutoff': start >= cutoff}
+        for index, (start, end) in enumerate(edges)
+    ]
+
+
+def simulate_cutoffs(criteria, program_ids, students=None, cgpa_bin=Decimal('0.25'), cgpa_window=Decimal('1'),
+                     percentage_bin=Decimal('2.5'), percentage_window=Decimal('10')):
+    """
+    Evaluates a proposed set of job criteria against the student table without creating a job.
+
+    The eligible-count breakdown is one GROUP BY query. Each histogram is one aggregate query over
+    the students who meet every *other* criterion, so it shows how many students a small change
+    of that one cutoff would add or remove.
+
+    Args:
+        criteria (dict): Any of the Job cutoff fields (`min_ug_cgpa`, `min_pg_cgpa`,
+                         `min_tenth_percentage`, `min_twelfth_percentage`, `max_active_backlogs`).
+        program_ids (list): The programs the job would be open to.
+        students (QuerySet): The StudentProfile population to consider. Defaults to everyone.
+
+    Returns:
+        dict: {'eligible': int, 'by_program': [...], 'by_degree_level': [...],
+               'by_joining_year': [...], 'histograms': {...}}
+    """
+    if students is None:
+        students = StudentProfile.objects.all()
+    job = Job(**criteria)
+
+    rows = list(
+        students.filter(eligible_students_q(job, program_ids))
+        .values('program_id', 'joining_year', program_name=F('program__abbreviation'), degree_level=F('program__degree_level'))
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+
+    def breakdown(*fields):
+        totals = {}
+        for row in rows:
+            key = tuple(row[field] for field in fields)
+            totals[key] = totals.get(key, 0) + row['count']
+        return [dict(zip(fields, key), count=count) for key, count in sorted(totals.items())]
+
+    histograms = {}
+    cgpa_cutoffs = [
+        (Program.DegreeLevel.UNDERGRADUATE, 'min_ug_cgpa'),
+        (Program.DegreeLevel.POSTGRADUATE, 'min_pg_cgpa'),
+    ]
+    for level, field in cgpa_cutoffs:
+        if job_value := getattr(job, field):
+            others = students.filter(
+                eligible_students_q(Job(**{**criteria, field: None}), program_ids),
+                program__degree_level=level
+            )
+            histograms[f'{level.lower()}_cgpa'] = _histogram(others, 'current_cgpa', job_value, cgpa_bin, cgpa_window)
+    for field, student_field in (('min_tenth_percentage', 'tenth_percentage'), ('min_twelfth_percentage', 'twelfth_percentage')):
+        if job_value := getattr(job, field):
+            others = students.filter(eligible_students_q(Job(**{**criteria, field: None}), program_ids))
+            histograms[student_field] = _histogram(others, student_field, job_value, percentage_bin, percentage_window)
+
+    return {
+        'eligible': sum(row['count'] for row in rows),
+        'by_program': breakdown('program_id', 'program_name'),
+        'by_degree_level': breakdown('degree_level'),
+        'by_joining_year': breakdown('joining_year'),
+        'histograms': histograms,
+    }
+
+
+def snapshot_drive_eligibility(company_drive, batch_size=1000):
+    """
+    Replaces the eligibility snapshot of `company_drive` with the current state.
+
+    For every job, the population is the students of its eligible programs who had not graduated
+    before the deadline year, plus anyone who applied for the job. Eligibility, application status
+    and the academic values are evaluated in one query per job and written with bulk inserts.
+
+    Returns:
+        int: The number of snapshot rows written.
+    """
+    captured_at = timezone.now()
+    deadline_year = (company_drive.application_deadline or captured_at).year
+    applications = CompanyDriveApplication.objects.filter(company_drive=company_drive, student=OuterRef('pk'))
+
+    with transaction.atomic():
+        DriveEligibilitySnapshot.objects.filter(company_drive=company_drive).delete()
+
+        written = 0
+        for job in company_drive.jobs.all():
+            program_ids = list(JobProgram.objects.filter(job=job).values_list('program_id', flat=True))
+            applicants = JobPreference.objects.filter(job=job).values('drive_application__student_id')
+            students = StudentProfile.objects.filter(
+                Q(program_id__in=program_ids, graduation_year__gte=deadline_year) | Q(pk__in=applicants)
+            ).annotate(
+                # CASE rather than the bare predicate: a comparison with a missing value (e.g. no
+                # CGPA yet) is NULL in a SELECT list, where WHERE would simply treat it as false.
+                is_eligible=Case(
+                    When(eligible_students_q(job, program_ids), then=Value(True)),
+                    default=Value(False), output_field=BooleanField()
+                ),
+                has_applied=Exists(JobPreference.objects.filter(job=job, drive_application__student=OuterRef('pk'))),
+                application_status=Subquery(applications.values('status')[:1]),
+            ).values(
+                'pk', 'enrollment_number', 'program_id', 'graduation_year', 'current_cgpa', 'tenth_percentage',
+                'twelfth_percentage', 'active_backlogs', 'is_verified', 'is_placed', 'is_eligible',
+                'has_applied', 'application_status', degree_level=F('program__degree_level'),
+            )
+
+            rows = (
+                DriveEligibilitySnapshot(
+                    company_drive=company_drive,
+                    job=job,
+                    student_id=student.pop('pk'),
+                    degree_level=student.pop('degree_level') or '',
+                    application_status=student.pop('application_status') or '',
+                    captured_at=captured_at,
+                    **student,
+                )
+                for student in students.iterator(chunk_size=batch_size)
+            )
+            for batch in chunked(rows, batch_size):
+                DriveEligibilitySnapshot.objects.bulk_create(batch)
+                written += len(batch)
+
+        CompanyDrive.objects.filter(pk=company_drive.pk).update(eligibility_snapshot_at=captured_at)
+        company_drive.eligibility_snapshot_at = captured_at
+    return written
+
+
+def snapshot_due_drives():
+    """
+    Snapshots every drive whose application deadline has passed and that has no snapshot yet
+    (or whose deadline was extended after its last snapshot).
+
+    Each drive is claimed in a short transaction, by marking it snapshotted, and its snapshot is
+    built afterwards without holding the row lock, so concurrent runs pick different drives and
+    edits to the drive are not blocked. If the build fails, the claim is undone so the next run
+    retries it; a drive whose run was killed outright can be redone with `--drive`.
+
+    Returns:
+        int: The number of drives snapshotted.
+    """
+    now = timezone.now()
+    count = 0
+    while True:
+        with transaction.atomic():
+            company_drive = CompanyDrive.objects.select_for_update(skip_locked=True).filter(
+                Q(eligibility_snapshot_at__isnull=True) | Q(eligibility_snapshot_at__lt=F('application_deadline')),
+                application_deadline__lte=now,
+            ).order_by('application_deadline').first()
+            if company_drive is None:
+                return count
+            previous_snapshot_at = company_drive.eligibility_snapshot_at
+            claimed_at = timezone.now()
+            CompanyDrive.objects.filter(pk=company_drive.pk).update(eligibility_snapshot_at=claimed_at)
+
+        try:
+            rows = snapshot_drive_eligibility(company_drive)
+        except Exception:
+            CompanyDrive.objects.filter(pk=company_drive.pk, eligibility_snapshot_at=claimed_at).update(
+                eligibility_snapshot_at=previous_snapshot_at
+            )
+            raise
+        logger.info("Eligibility snapshot for drive %s: %s rows.", company_drive.pk, rows)
+        count += 1
+
+
+class EligibilityCache:
+    """
+    A cache of eligibility decisions (the list of reasons; empty means eligible), shared by the
+    application validator and the job listings. Hits and misses are counted in `apps.core.metrics`.
+    """
+    def __init__(self, timeout=3600):
+        self.timeout = timeout
+
+    @staticmethod
+    def _key(student, job):
+        return f"eligibility:{student.pk}:{student.eligibility_version}:{job.pk}:{job.eligibility_version}"
+
+    def get_reasons(self, student, job):
+        """Returns why `student` is not eligible for `job` (an empty list if eligible)."""
+        return self.get_many_reasons(student, [job])[job.pk]
+
+    def get_many_reasons(self, student, jobs):
+        """
+        Returns {job_id: reasons} for every job. Jobs missing from the cache are evaluated
+        together in a single query and stored. Jobs that were loaded through
+        `annotate_job_eligibility` for this student are evaluated without any query.
+        """
+        keys = {self._key(student, job): job for job in jobs}
+        cached = cache.get_many(keys)
+        results = {keys[key].pk: reasons for key, reasons in cached.items()}
+
+        missing = [job for key, job in keys.items() if key not in cached]
+        metrics.increment('eligibility_cache_hits_total', len(cached))
+        metrics.increment('eligibility_cache_misses_total', len(missing))
+        if missing:
+            if all(hasattr(job, 'is_eligible') for job in missing):
+                evaluated = missing
+            else:
+                evaluated = annotate_job_eligibility(Job.objects.filter(pk__in=[job.pk for job in missing]), student)
+            fresh = {job.pk: eligibility_reasons(job, student) for job in evaluated}
+            cache.set_many(
+                {self._key(student, job): fresh[job.pk] for job in missing if job.pk in fresh},
+                timeout=self.timeout
+            )
+            results.update(fresh)
+        return results
+
+    @staticmethod
+    def stats():
+        """Returns the hit/miss counters of this process."""
+        counters = metrics.snapshot()['counters']
+        hits = sum(entry['value'] for entry in counters.get('eligibility_cache_hits_total', []))
+        misses = sum(entry['value'] for entry in counters.get('eligibility_cache_misses_total', []))
+        total = hits + misses
+        return {'hits': hits, 'misses': misses, 'hit_rate': round(hits / total, 4) if total else None}
+
+
+eligibility_cache = EligibilityCache(timeout=getattr(settings, 'ELIGIBILITY_CACHE_TIMEOUT', 3600))
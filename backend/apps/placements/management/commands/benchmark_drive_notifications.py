@@ -0,0 +1,219 @@
+"""
+Management command that benchmarks the drive notification email pipeline offline.
+
+It creates synthetic final-year cohorts, announces a drive to each of them with
+`send_drive_notification` and delivers the emails through `FakeESPBackend`, an in-process
+stand-in for Brevo with configurable latency and error rate. For every cohort it reports:
+
+- throughput (recipients delivered per second),
+- peak Python memory (tracemalloc) and peak thread count during the run,
+- p50/p99 time-to-send, i.e. how long after the announcement each recipient's email was delivered.
+
+USAGE:
+======
+    python manage.py benchmark_drive_notifications
+    python manage.py benchmark_drive_notifications --cohorts 1000 10000 --latency-ms 250 --error-rate 0.01
+
+The synthetic students are deleted afterwards unless --keep-data is given. Run it against a
+development database only.
+"""
+import time
+import threading
+import tracemalloc
+from datetime import timedelta
+from django.db.models import Q
+from django.utils import timezone
+from django.test.utils import override_settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.users.models import User
+from apps.core.models import Degree, Program, EmailOutbox
+from apps.core.email_backends import FakeESPBackend
+from apps.core.tasks import get_email_dispatcher
+from apps.students.models import StudentProfile
+from apps.placements.utils import send_drive_notification
+
+EMAIL_DOMAIN = 'benchmark.invalid'
+PROGRAM_ABBREVIATION = 'BENCH'
+
+
+class ThreadSampler(threading.Thread):
+    """Records the highest number of live threads seen while running."""
+    def __init__(self, interval=0.01):
+        super().__init__(name='benchmark-thread-sampler', daemon=True)
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class Command(BaseCommand):
+    help = "Benchmarks drive notification emails against synthetic cohorts using a fake email provider."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cohorts', type=int, nargs='+', default=[1000, 10000, 50000],
+            help="Cohort sizes (number of students) to benchmark."
+        )
+        parser.add_argument('--latency-ms', type=float, default=100, help="Simulated latency of each provider API call.")
+        parser.add_argument('--jitter-ms', type=float, default=0, help="Maximum random latency added to each API call.")
+        parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction (0-1) of API calls that fail.")
+        parser.add_argument('--workers', type=int, help="Overrides EMAIL_WORKER_COUNT for the run.")
+        parser.add_argument('--batch-size', type=int, help="Overrides EMAIL_BATCH_SIZE for the run.")
+        parser.add_argument('--timeout', type=float, default=600, help="Seconds to wait for a cohort to be delivered.")
+        parser.add_argument('--keep-data', action='store_true', help="Keep the synthetic students after the run.")
+
+    def handle(self, *args, **options):
+        if not 0 <= options['error_rate'] <= 1:
+            raise CommandError("--error-rate must be between 0 and 1.")
+
+        overrides = {
+            'EMAIL_BACKEND': 'apps.core.email_backends.FakeESPBackend',
+            'EMAIL_FAKE_LATENCY_MS': options['latency_ms'],
+            'EMAIL_FAKE_LATENCY_JITTER_MS': options['jitter_ms'],
+            'EMAIL_FAKE_ERROR_RATE': options['error_rate'],
+        }
+        if options['workers']:
+            overrides['EMAIL_WORKER_COUNT'] = options['workers']
+        if options['batch_size']:
+            overrides['EMAIL_BATCH_SIZE'] = options['batch_size']
+
+        with override_settings(**overrides):
+            program = self._get_program()
+            dispatcher = get_email_dispatcher()
+            self.stdout.write(
+                f"Fake provider: {options['latency_ms']}ms latency (+{options['jitter_ms']}ms jitter), "
+                f"{options['error_rate']:.1%} errors. Workers: {dispatcher.worker_count}."
+            )
+            try:
+                for size in sorted(options['cohorts']):
+                    self._ensure_cohort(program, size)
+                    self._report(size, self._run(program, size, options['timeout']))
+            finally:
+                if not options['keep_data']:
+                    self._cleanup()
+
+    def _run(self, program, size, timeout):
+        """Announces one drive to the cohort and waits until every email was attempted once."""
+        group = f"benchmark:{size}:{int(time.time())}"
+        dispatcher = get_email_dispatcher()
+        FakeESPBackend.reset()
+
+        sampler = ThreadSampler()
+        sampler.start()
+        tracemalloc.start()
+
+        started = time.monotonic()
+        send_drive_notification(
+            company_name='Benchmark Corp',
+            application_deadline=timezone.now() + timedelta(days=7),
+            program_ids=[program.id],
+            job_title_list=['Software Engineer', 'Data Analyst'],
+            group=group,
+        )
+        enqueued = time.monotonic() - started
+
+        # Every row must leave the queue and have been attempted once; failed rows that are
+        # waiting for their (much later) retry are reported rather than waited for.
+        unfinished = EmailOutbox.objects.filter(group=group).filter(
+            Q(status=EmailOutbox.Status.SENDING) | Q(status=EmailOutbox.Status.PENDING, attempts=0)
+        )
+        deadline = started + timeout
+        while dispatcher.queue_depth or unfinished.exists():
+            if time.monotonic() > deadline:
+                self.stderr.write(f"Cohort of {size}: timed out after {timeout}s.")
+                break
+            time.sleep(0.05)
+
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        sampler.stop()
+
+        return {
+            'started': started,
+            'enqueued': enqueued,
+            'deliveries': FakeESPBackend.get_deliveries(),
+            'progress': EmailOutbox.group_progress(group),
+            'peak_memory': peak_memory,
+            'peak_threads': sampler.peak,
+        }
+
+    def _report(self, size, result):
+        delivered = sorted(
+            (finished - result['started'], count)
+            for finished, count, succeeded in result['deliveries'] if succeeded
+        )
+        recipients = sum(count for _, count in delivered)
+        elapsed = delivered[-1][0] if delivered else 0
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nCohort of {size} students"))
+        self.stdout.write(f"  Enqueue time (request path): {result['enqueued'] * 1000:.1f} ms")
+        self.stdout.write(
+            f"  Delivered: {recipients} recipients in {len(result['deliveries'])} API calls "
+            f"({result['progress']['queued']} awaiting retry, {result['progress']['failed']} failed)"
+        )
+        self.stdout.write(f"  Throughput: {recipients / elapsed if elapsed else 0:.1f} recipients/s")
+        self.stdout.write(
+            f"  Time-to-send: p50 {self._percentile(delivered, recipients, 0.50):.3f}s, "
+            f"p99 {self._percentile(delivered, recipients, 0.99):.3f}s"
+        )
+        self.stdout.write(f"  Peak memory: {result['peak_memory'] / (1024 * 1024):.1f} MiB")
+        self.stdout.write(f"  Peak threads: {result['peak_threads']}")
+
+    @staticmethod
+    def _percentile(delivered, recipients, fraction):
+        """The time by which `fraction` of the delivered recipients had their email."""
+        if not recipients:
+            return 0.0
+        seen = 0
+        for seconds, count in delivered:
+            seen += count
+            if seen >= fraction * recipients:
+                return seconds
+        return delivered[-1][0]
+
+    def _get_program(self):
+        degree, _ = Degree.objects.get_or_create(
+            abbreviation=PROGRAM_ABBREVIATION, defaults={'name': 'Benchmark Degree'}
+        )
+        program, _ = Program.objects.get_or_create(
+            abbreviation=PROGRAM_ABBREVIATION,
+            defaults={'name': 'Benchmark Program', 'degree': degree, 'degree_level': 'UG', 'duration_years': 4},
+        )
+        return program
+
+    def _ensure_cohort(self, program, size):
+        """Tops the synthetic final-year cohort up to `size` students."""
+        existing = StudentProfile.objects.filter(program=program).count()
+        if existing >= size:
+            return
+
+        self.stdout.write(f"Creating {size - existing} synthetic students...")
+        graduation_year = timezone.now().year
+        joining_year = graduation_year - program.duration_years + 1
+        for start in range(existing, size, 5000):
+            numbers = range(start, min(start + 5000, size))
+            users = User.objects.bulk_create([
+                User(email=f"student{n}@{EMAIL_DOMAIN}", phone_number=f"bench-{n}", password='!')
+                for n in numbers
+            ])
+            # bulk_create skips StudentProfile.save(), so the graduation year is set explicitly.
+            StudentProfile.objects.bulk_create([
+                StudentProfile(
+                    user=user, program=program, enrollment_number=f"BENCH{n}",
+                    joining_year=joining_year, graduation_year=graduation_year,
+                )
+                for user, n in zip(users, numbers)
+            ])
+
+    def _cleanup(self):
+        User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").delete()
+        Program.objects.filter(abbreviation=PROGRAM_ABBREVIATION).delete()
+        Degree.objects.filter(abbreviation=PROGRAM_ABBREVIATION).delete()
+        EmailOutbox.objects.filter(group__startswith='benchmark:').delete()
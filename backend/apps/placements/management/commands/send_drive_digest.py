@@ -0,0 +1,18 @@
+"""
+Management command that sends the drive announcement digest.
+
+Only relevant when `DRIVE_NOTIFICATION_DIGEST` is enabled. Schedule it at the desired digest
+frequency, e.g. once a day from a cron job:
+
+    python manage.py send_drive_digest
+"""
+from django.core.management.base import BaseCommand
+from apps.placements.utils import send_drive_digest
+
+
+class Command(BaseCommand):
+    help = "Sends every student one email covering all drive announcements queued since the last digest."
+
+    def handle(self, *args, **options):
+        count = send_drive_digest()
+        self.stdout.write(self.style.SUCCESS(f"Digest sent for {count} drive announcement(s)."))
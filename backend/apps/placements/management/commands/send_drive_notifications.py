@@ -0,0 +1,45 @@
+"""
+Management command that sends drive announcements whose coalescing window has closed.
+
+Web processes send these on their own with an in-process timer. This command is the safety net for
+announcements whose process restarted before the timer fired; run it periodically (e.g. every minute
+from a cron job) or continuously with `--loop`.
+
+USAGE:
+------
+    python manage.py send_drive_notifications
+    python manage.py send_drive_notifications --loop
+"""
+import time
+from django.core.management.base import BaseCommand
+from apps.placements.utils import run_due_drive_notifications
+
+
+class Command(BaseCommand):
+    help = "Sends all scheduled drive notifications that are due."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Keep running, checking for due notifications every --poll-interval seconds."
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=30.0,
+            help="Seconds between checks when running with --loop (default: 30)."
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                sent = run_due_drive_notifications()
+                total += sent
+                if sent:
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"{total} drive notification(s) sent."))
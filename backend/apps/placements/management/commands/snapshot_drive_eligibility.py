@@ -0,0 +1,54 @@
+"""
+Management command that freezes drive eligibility at the application deadline.
+
+Every drive whose deadline has passed gets its `DriveEligibilitySnapshot` rows written once.
+Run it periodically (e.g. every few minutes from a cron job) or continuously with `--loop`.
+A single drive can be (re-)snapshotted on demand with `--drive`.
+
+USAGE:
+------
+    python manage.py snapshot_drive_eligibility
+    python manage.py snapshot_drive_eligibility --loop
+    python manage.py snapshot_drive_eligibility --drive 42
+"""
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.placements.models import CompanyDrive
+from apps.placements.eligibility import snapshot_due_drives, snapshot_drive_eligibility
+
+
+class Command(BaseCommand):
+    help = "Writes the eligibility snapshot of every company drive whose application deadline has passed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--drive', type=int, help="Snapshot this CompanyDrive now, regardless of its deadline.")
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Keep running, checking for drives past their deadline every --poll-interval seconds."
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=60.0,
+            help="Seconds between checks when running with --loop (default: 60)."
+        )
+
+    def handle(self, *args, **options):
+        if options['drive']:
+            try:
+                company_drive = CompanyDrive.objects.get(pk=options['drive'])
+            except CompanyDrive.DoesNotExist:
+                raise CommandError(f"CompanyDrive {options['drive']} does not exist.")
+            rows = snapshot_drive_eligibility(company_drive)
+            self.stdout.write(self.style.SUCCESS(f"Snapshot of {company_drive}: {rows} row(s)."))
+            return
+
+        total = 0
+        try:
+            while True:
+                total += snapshot_due_drives()
+                if not options['loop']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"{total} drive snapshot(s) written."))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placements', '0006_added_json_field_in_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DriveNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Scheduled', 'Scheduled'), ('Running', 'Running'), ('Completed', 'Completed'), ('Failed', 'Failed')], default='Scheduled', max_length=10)),
+                ('scheduled_for', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company_drive', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='placements.companydrive')),
+            ],
+            options={
+                'ordering': ['scheduled_for'],
+                'indexes': [models.Index(fields=['status', 'scheduled_for'], name='placements_notif_due_idx')],
+            },
+        ),
+    ]
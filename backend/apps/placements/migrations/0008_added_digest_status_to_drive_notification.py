@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placements', '0007_added_drive_notification_table'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='drivenotification',
+            name='status',
+            field=models.CharField(choices=[('Scheduled', 'Scheduled'), ('Digest', 'Awaiting digest'), ('Running', 'Running'), ('Completed', 'Completed'), ('Failed', 'Failed')], default='Scheduled', max_length=10),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placements', '0008_added_digest_status_to_drive_notification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='drivenotification',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='drivenotification',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
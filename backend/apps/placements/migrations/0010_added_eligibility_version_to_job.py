@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placements', '0009_added_progress_timestamps_to_drive_notification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='eligibility_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_added_group_and_recipient_count_to_email_outbox'),
+        ('placements', '0010_added_eligibility_version_to_job'),
+        ('students', '0007_added_eligibility_version_to_student_profile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='companydrive',
+            name='eligibility_snapshot_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='DriveEligibilitySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('enrollment_number', models.CharField(max_length=50)),
+                ('degree_level', models.CharField(blank=True, max_length=20)),
+                ('graduation_year', models.IntegerField(blank=True, null=True)),
+                ('current_cgpa', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True)),
+                ('tenth_percentage', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('twelfth_percentage', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('active_backlogs', models.IntegerField(default=0)),
+                ('is_verified', models.BooleanField(default=False)),
+                ('is_placed', models.BooleanField(default=False)),
+                ('is_eligible', models.BooleanField()),
+                ('has_applied', models.BooleanField(default=False)),
+                ('application_status', models.CharField(blank=True, max_length=20)),
+                ('captured_at', models.DateTimeField()),
+                ('company_drive', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eligibility_snapshots', to='placements.companydrive')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eligibility_snapshots', to='placements.job')),
+                ('program', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.program')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eligibility_snapshots', to='students.studentprofile')),
+            ],
+            options={
+                'ordering': ['job', 'enrollment_number'],
+                'indexes': [models.Index(fields=['company_drive', 'job', 'is_eligible'], name='placements_snapshot_idx')],
+                'unique_together': {('job', 'student')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_added_group_and_recipient_count_to_email_outbox'),
+        ('placements', '0011_added_drive_eligibility_snapshot_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CohortJobRanking',
+            fields=[
+                ('program', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='job_ranking', serialize=False, to='core.program')),
+                ('entries', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placements', '0012_added_cohort_job_ranking_table'),
+        ('students', '0007_added_eligibility_version_to_student_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('drive_type', models.CharField(blank=True, choices=[('FullTime', 'FullTime'), ('Internship', 'Internship'), ('Contract', 'Contract')], max_length=20)),
+                ('job_mode', models.CharField(blank=True, choices=[('Onsite', 'Onsite'), ('Remote', 'Remote'), ('Hybrid', 'Hybrid')], max_length=20)),
+                ('location', models.CharField(blank=True, max_length=100)),
+                ('min_package', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('min_stipend', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to='students.studentprofile')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedSearchMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matched_at', models.DateTimeField(auto_now_add=True)),
+                ('seen_at', models.DateTimeField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_search_matches', to='placements.job')),
+                ('saved_search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='placements.savedsearch')),
+            ],
+            options={
+                'ordering': ['-matched_at'],
+                'unique_together': {('saved_search', 'job')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('saved_search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='placements.savedsearch')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['field', 'value'], name='saved_search_term_idx')],
+            },
+        ),
+    ]
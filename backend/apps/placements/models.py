@@ -28,6 +28,8 @@ class CompanyDrive(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     multiple_allowed = models.BooleanField(default=False)
+    # When the eligibility snapshot was last taken (see DriveEligibilitySnapshot).
+    eligibility_snapshot_at = models.DateTimeField(null=True, blank=True, editable=False)
     
     # class Meta:
     #     unique_together = ('drive', 'company')
@@ -67,6 +69,9 @@ class Job(models.Model):
     pg_stipend = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     
     eligible_programs = models.ManyToManyField('core.Program', through='JobProgram', blank=True)
+    # Incremented whenever the eligibility criteria or programs change (see apps.placements.signals),
+    # so cached eligibility decisions for the old criteria are never read again.
+    eligibility_version = models.PositiveIntegerField(default=0, editable=False)
     
     posted_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -80,4 +85,167 @@ class JobProgram(models.Model):
     program = models.ForeignKey('core.Program', on_delete=models.CASCADE)
     
     class Meta:
-        unique_together = ('job', 'program')
\ No newline at end of file
+        unique_together = ('job', 'program')
+
+
+class DriveNotification(models.Model):
+    """
+    A pending or completed "new drive" announcement for a CompanyDrive.
+
+    Announcements are not sent the moment a job is added. Instead, a single `Scheduled` row per drive
+    is pushed back every time the drive changes, and the cohort is notified once the drive has been
+    quiet for `DRIVE_NOTIFICATION_COALESCE_SECONDS`, with the final list of jobs.
+    In digest mode the row waits in `Digest` until the next `send_drive_digest` run instead.
+    """
+    class Status(models.TextChoices):
+        SCHEDULED = 'Scheduled', 'Scheduled'
+        DIGEST = 'Digest', 'Awaiting digest'
+        RUNNING = 'Running', 'Running'
+        COMPLETED = 'Completed', 'Completed'
+        FAILED = 'Failed', 'Failed'
+
+    company_drive = models.ForeignKey(CompanyDrive, on_delete=models.CASCADE, related_name='notifications')
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.SCHEDULED)
+    scheduled_for = models.DateTimeField()
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['scheduled_for']
+        indexes = [
+            models.Index(fields=['status', 'scheduled_for'], name='placements_notif_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Notification for {self.company_drive} [{self.status}]"
+
+    @property
+    def email_group(self):
+        """The `EmailOutbox.group` under which this notification's emails are queued."""
+        return f"drive-notification:{self.pk}"
+
+
+class DriveEligibilitySnapshot(models.Model):
+    """
+    Each student's eligibility for each job of a CompanyDrive, frozen at the application deadline.
+
+    One row per (job, student), written in bulk by `python manage.py snapshot_drive_eligibility`.
+    The academic values are copied as they were at the deadline, so shortlisting, reports and audits
+    read this table instead of re-deriving eligibility from live (and since edited) profiles.
+    """
+    company_drive = models.ForeignKey(CompanyDrive, on_delete=models.CASCADE, related_name='eligibility_snapshots')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='eligibility_snapshots')
+    student = models.ForeignKey('students.StudentProfile', on_delete=models.CASCADE, related_name='eligibility_snapshots')
+    enrollment_number = models.CharField(max_length=50)
+    program = models.ForeignKey('core.Program', on_delete=models.SET_NULL, null=True)
+    degree_level = models.CharField(max_length=20, blank=True)
+    graduation_year = models.IntegerField(null=True, blank=True)
+    current_cgpa = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True)
+    tenth_percentage = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    twelfth_percentage = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    active_backlogs = models.IntegerField(default=0)
+    is_verified = models.BooleanField(default=False)
+    is_placed = models.BooleanField(default=False)
+    is_eligible = models.BooleanField()
+    # Whether the student applied to the drive with this job among their preferences.
+    has_applied = models.BooleanField(default=False)
+    application_status = models.CharField(max_length=20, blank=True)
+    captured_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['job', 'enrollment_number']
+        unique_together = ('job', 'student')
+        indexes = [
+            models.Index(fields=['company_drive', 'job', 'is_eligible'], name='placements_snapshot_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.enrollment_number} - {self.job} ({'eligible' if self.is_eligible else 'not eligible'})"
+
+
+class CohortJobRanking(models.Model):
+    """
+    The precomputed ranking inputs of every open job a program's students can apply for.
+
+    Pay only depends on the program's degree level, so one row serves each of the program's
+    graduating cohorts. `entries` is a compact list of
+    [job_id, eligibility_version, pay_score, deadline_timestamp, job_mode], rebuilt by
+    `apps.placements.ranking` whenever one of those jobs (or its drive) changes.
+    """
+    program = models.OneToOneField('core.Program', on_delete=models.CASCADE, primary_key=True, related_name='job_ranking')
+    entries = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Job ranking for {self.program} ({len(self.entries)} jobs)"
+
+
+class SavedSearch(models.Model):
+    """
+    A student's standing query over new jobs, e.g. remote internships with a stipend of at least 20,000.
+
+    Empty fields match anything. Every saved search is also stored in `SavedSearchTerm`, an inverted
+    index on its equality predicates, so a newly posted job is matched against all saved searches
+    with one indexed lookup (see apps.placements.searches) instead of re-running each search.
+    """
+    # Indexed predicate fields; each saved search has exactly one SavedSearchTerm per field.
+    INDEXED_FIELDS = ('drive_type', 'job_mode', 'location')
+    ANY = '*'
+
+    student = models.ForeignKey('students.StudentProfile', on_delete=models.CASCADE, related_name='saved_searches')
+    name = models.CharField(max_length=100)
+    drive_type = models.CharField(max_length=20, choices=CompanyDrive.DRIVE_TYPES, blank=True)
+    job_mode = models.CharField(max_length=20, choices=CompanyDrive.JOB_MODES, blank=True)
+    # Matched case-insensitively against the drive's `locations`.
+    location = models.CharField(max_length=100, blank=True)
+    # Compared with the package / stipend of the student's degree level.
+    min_package = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    min_stipend = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.name} ({self.student})"
+
+    def index_terms(self):
+        """The (field, value) pairs under which this search is stored in the inverted index."""
+        return [
+            (field, (getattr(self, field) or '').strip().lower() or self.ANY)
+            for field in self.INDEXED_FIELDS
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.terms.all().delete()
+        SavedSearchTerm.objects.bulk_create(
+            SavedSearchTerm(saved_search=self, field=field, value=value) for field, value in self.index_terms()
+        )
+
+
+class SavedSearchTerm(models.Model):
+    """One entry of the saved-search inverted index: `saved_search` requires `field` to equal `value` ('*' = any)."""
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='terms')
+    field = models.CharField(max_length=20)
+    value = models.CharField(max_length=100)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['field', 'value'], name='saved_search_term_idx'),
+        ]
+
+
+class SavedSearchMatch(models.Model):
+    """A job that matched a saved search when it was posted."""
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='matches')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='saved_search_matches')
+    matched_at = models.DateTimeField(auto_now_add=True)
+    seen_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-matched_at']
+        unique_together = ('saved_search', 'job')
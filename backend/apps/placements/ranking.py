@@ -0,0 +1,180 @@
+"""
+Personalized Job Ranking for the HireSphereX Project.
+
+Orders a student's eligible open jobs by a weighted score:
+
+    score = pay_weight * pay + deadline_weight * deadline_proximity + job_mode_weight * job_mode_match
+
+- pay: the job's package for the student's degree level (`ug_package_max` for UG students,
+  `pg_package_max` for PG and doctorate students, falling back to the minimum), or the stipend
+  for internships, divided by the best-paying job of the same kind open to the program (0 - 1).
+- deadline_proximity: 1 when the application deadline is now, falling linearly to 0 at
+  `JOB_RANKING_DEADLINE_HORIZON_DAYS` away. Jobs without a deadline score 0.
+- job_mode_match: 1 for the student's first preferred job mode, less for later ones, 0 otherwise.
+
+The weights are set with `JOB_RANKING_WEIGHTS`.
+
+PRECOMPUTATION:
+===============
+The pay scores do not depend on the individual student, so they are computed once per program
+and stored in `CohortJobRanking`. The signals in `apps.placements.signals` rebuild the affected
+programs' rows once the transaction that changed a job, its programs or its drive commits.
+Serving a student is then one row lookup plus the (cached) eligibility of the listed jobs.
+"""
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from apps.core.models import Program
+from .eligibility import eligibility_cache
+from .models import Job, JobProgram, CohortJobRanking
+
+DEFAULT_WEIGHTS = {'pay': 0.5, 'deadline': 0.3, 'job_mode': 0.2}
+
+
+def _pay(job, degree_level):
+    """The pay figure the job is ranked on for the given degree level, and which kind it is."""
+    prefix = 'ug' if degree_level == Program.DegreeLevel.UNDERGRADUATE else 'pg'
+    if job['company_drive__drive_type'] == 'Internship':
+        return 'stipend', job[f'{prefix}_stipend']
+    return 'package', job[f'{prefix}_package_max'] or job[f'{prefix}_package_min']
+
+
+def rebuild_cohort_ranking(program):
+    """
+    Recomputes and stores the ranking entries of every open job `program`'s students can apply for.
+
+    Returns:
+        CohortJobRanking: The stored ranking.
+    """
+    now = timezone.now()
+    prefix = 'ug' if program.degree_level == Program.DegreeLevel.UNDERGRADUATE else 'pg'
+    jobs = list(
+        Job.objects.filter(
+            Q(company_drive__application_deadline__isnull=True) | Q(company_drive__application_deadline__gt=now),
+            jobprogram__program=program,
+            company_drive__status='Open',
+        ).values(
+            'id', 'eligibility_version', f'{prefix}_package_max', f'{prefix}_package_min', f'{prefix}_stipend',
+            'company_drive__drive_type', 'company_drive__job_mode', 'company_drive__application_deadline',
+        )
+    )
+
+    pay = {job['id']: _pay(job, program.degree_level) for job in jobs}
+    best = {}
+    for kind, amount in pay.values():
+        if amount:
+            best[kind] = max(best.get(kind, Decimal('0')), amount)
+
+    entries = []
+    for job in jobs:
+        kind, amount = pay[job['id']]
+        deadline = job['company_drive__application_deadline']
+        entries.append([
+            job['id'],
+            job['eligibility_version'],
+            round(float(amount / best[kind]), 4) if amount else 0.0,
+            int(deadline.timestamp()) if deadline else None,
+            job['company_drive__job_mode'],
+        ])
+
+    ranking, _ = CohortJobRanking.objects.update_or_create(program=program, defaults={'entries': entries})
+    return ranking
+
+
+def rebuild_cohort_rankings(program_ids):
+    """Rebuilds the rankings of the given programs."""
+    for program in Program.objects.filter(pk__in=program_ids):
+        rebuild_cohort_ranking(program)
+
+
+def _rebuild_affected(program_ids, job_ids):
+    affected = set(program_ids)
+    if job_ids:
+        affected.update(JobProgram.objects.filter(job_id__in=job_ids).values_list('program_id', flat=True))
+    rebuild_cohort_rankings(affected)
+
+
+def schedule_ranking_rebuild(program_ids=None, job_ids=None):
+    """
+    Rebuilds the rankings of the given programs, and of every program the given jobs are open to,
+    once the current transaction commits.
+
+    Calls within one atomic block add to a single pending rebuild (kept on the connection) with
+    a single on_commit callback, so posting a drive with many jobs and programs rebuilds each
+    affected program once.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        _rebuild_affected(set(program_ids or ()), set(job_ids or ()))
+        return
+
+    pending = getattr(connection, 'pending_ranking_rebuild', None)
+    savepoint_ids = set(connection.savepoint_ids)
+    # A batch is reused while its callback is still queued for the current atomic block; the
+    # callback is discarded when its transaction or savepoint rolls back.
+    if pending is None or not any(
+        callback is pending['run'] and sids == savepoint_ids for sids, callback, *_ in connection.run_on_commit
+    ):
+        pending = {'program_ids': set(), 'job_ids': set()}
+
+        def run():
+            if getattr(connection, 'pending_ranking_rebuild', None) is pending:
+                connection.pending_ranking_rebuild = None
+            _rebuild_affected(pending['program_ids'], pending['job_ids'])
+
+        pending['run'] = run
+        connection.pending_ranking_rebuild = pending
+        transaction.on_commit(run)
+
+    pending['program_ids'].update(program_ids or ())
+    pending['job_ids'].update(job_ids or ())
+
+
+def rank_jobs(student, preferred_job_modes=(), weights=None, now=None):
+    """
+    Ranks the open jobs `student` is eligible for, best first.
+
+    Args:
+        student (StudentProfile): The student; their program determines the cohort.
+        preferred_job_modes (sequence): Job modes in order of preference, e.g. ['Remote', 'Hybrid'].
+        weights (dict): Overrides `JOB_RANKING_WEIGHTS`.
+
+    Returns:
+        list: (job_id, score) pairs, highest score first.
+    """
+    if not student.program_id:
+        return []
+    ranking = CohortJobRanking.objects.filter(program_id=student.program_id).first()
+    if ranking is None:
+        ranking = rebuild_cohort_ranking(student.program)
+
+    weights = {**DEFAULT_WEIGHTS, **getattr(settings, 'JOB_RANKING_WEIGHTS', {}), **(weights or {})}
+    horizon = getattr(settings, 'JOB_RANKING_DEADLINE_HORIZON_DAYS', 14) * 86400
+    now = (now or timezone.now()).timestamp()
+    mode_scores = {
+        mode: (len(preferred_job_modes) - index) / len(preferred_job_modes)
+        for index, mode in reversed(list(enumerate(preferred_job_modes)))
+    }
+
+    # Deadlines may have passed since the ranking was built.
+    entries = [entry for entry in ranking.entries if entry[3] is None or entry[3] > now]
+    # Only the id and version are needed to look the decisions up in the eligibility cache.
+    eligibility = eligibility_cache.get_many_reasons(
+        student, [Job(pk=job_id, eligibility_version=version) for job_id, version, *_ in entries]
+    )
+
+    scored = []
+    for job_id, _, pay, deadline, job_mode in entries:
+        if eligibility.get(job_id, True):
+            continue
+        proximity = max(0.0, 1 - (deadline - now) / horizon) if deadline is not None else 0.0
+        score = (
+            weights['pay'] * pay
+            + weights['deadline'] * proximity
+            + weights['job_mode'] * mode_scores.get(job_mode, 0.0)
+        )
+        scored.append((job_id, round(score, 4)))
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored
@@ -0,0 +1,77 @@
+"""
+Saved Job Searches for the HireSphereX Project.
+
+When a job is posted, it is matched once against every student's saved searches and each match
+is recorded in `SavedSearchMatch`, so students check their matches instead of polling the job list.
+
+MATCHING:
+=========
+1. Candidates come from the inverted index (`SavedSearchTerm`): for each indexed field, the job's
+   value and the '*' wildcard are looked up, and a saved search is a candidate when all of its
+   terms were hit. This is one query on the (field, value) index, whatever the number of searches.
+2. The candidates' range predicates (minimum package / stipend for the student's degree level)
+   are checked in the same query.
+"""
+from django.db.models import Q, Count
+from apps.core.models import Program
+from .models import SavedSearch, SavedSearchTerm, SavedSearchMatch
+
+
+def job_index_terms(job):
+    """The (field, value) pairs a job can satisfy, for looking it up in the inverted index."""
+    company_drive = job.company_drive
+    locations = company_drive.locations or []
+    if isinstance(locations, str):
+        locations = [locations]
+    return {
+        'drive_type': {company_drive.drive_type.lower()},
+        'job_mode': {company_drive.job_mode.lower()},
+        'location': {str(location).strip().lower() for location in locations if str(location).strip()},
+    }
+
+
+def _pay_q(job):
+    """Matches saved searches whose minimum package and stipend `job` meets for the student's degree level."""
+    def at_least(field, ug_amount, pg_amount):
+        predicate = Q(**{f'{field}__isnull': True})
+        if ug_amount is not None:
+            predicate |= Q(**{f'{field}__lte': ug_amount}) & Q(student__program__degree_level=Program.DegreeLevel.UNDERGRADUATE)
+        if pg_amount is not None:
+            predicate |= Q(**{f'{field}__lte': pg_amount}) & ~Q(student__program__degree_level=Program.DegreeLevel.UNDERGRADUATE)
+        return predicate
+
+    return (
+        at_least('min_package', job.ug_package_max or job.ug_package_min, job.pg_package_max or job.pg_package_min)
+        & at_least('min_stipend', job.ug_stipend, job.pg_stipend)
+    )
+
+
+def matching_saved_searches(job):
+    """
+    Returns the saved searches that `job` matches, found through the inverted index.
+    """
+    terms = Q()
+    for field, values in job_index_terms(job).items():
+        terms |= Q(field=field, value__in=values | {SavedSearch.ANY})
+
+    candidates = SavedSearchTerm.objects.filter(terms).values('saved_search').annotate(
+        hits=Count('field', distinct=True)
+    ).filter(hits=len(SavedSearch.INDEXED_FIELDS)).values('saved_search')
+
+    return SavedSearch.objects.filter(_pay_q(job), pk__in=candidates)
+
+
+def match_saved_searches(jobs):
+    """
+    Matches newly posted jobs against the saved searches and records the matches.
+
+    Returns:
+        int: The number of matches recorded.
+    """
+    matches = [
+        SavedSearchMatch(saved_search_id=saved_search_id, job=job)
+        for job in jobs
+        for saved_search_id in matching_saved_searches(job).values_list('pk', flat=True)
+    ]
+    SavedSearchMatch.objects.bulk_create(matches, ignore_conflicts=True)
+    return len(matches)
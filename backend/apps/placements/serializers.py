@@ -2,13 +2,17 @@ from django.db import transaction
 from rest_framework import serializers
 from apps.core.serializers import ProgramSerializer
 from apps.companies.serializers import CompanySerializer
-from .models import PlacementDrive, CompanyDrive, Job, JobProgram
-from apps.core.models import Program
+from .models import (
+    PlacementDrive, CompanyDrive, Job, JobProgram, DriveNotification, DriveEligibilitySnapshot,
+    SavedSearch, SavedSearchMatch
+)
+from apps.core.models import Program, EmailOutbox
 from apps.students.models import StudentProfile
 from django.utils import timezone
 from django.db.models import Q
 from django.conf import settings
-from .utils import send_drive_notification
+from .utils import schedule_drive_notification
+from .searches import match_saved_searches
 
 class PlacementDriveSerializer(serializers.ModelSerializer):
     class Meta:
@@ -34,6 +38,24 @@ class CompanyDriveReadSerializer(serializers.ModelSerializer):
         return obj.jobs.count()
 
 
+class DriveNotificationSerializer(serializers.ModelSerializer):
+    """
+    A drive announcement and the delivery progress of its emails (queued/sent/failed recipients).
+    """
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DriveNotification
+        fields = [
+            'id', 'company_drive', 'status', 'scheduled_for', 'started_at', 'completed_at',
+            'progress', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        return EmailOutbox.group_progress(obj.email_group)
+
+
 class JobWriteSerializer(serializers.ModelSerializer):
     eligible_programs = serializers.ListField(
         child=serializers.IntegerField(),
@@ -43,6 +65,7 @@ class JobWriteSerializer(serializers.ModelSerializer):
     )
 
     job_pdf = serializers.FileField(required=False, allow_null=True)
+    notification = serializers.SerializerMethodField()
     
     class Meta:
         model = Job
@@ -51,8 +74,12 @@ class JobWriteSerializer(serializers.ModelSerializer):
             'title', 'description_ug', 'description_pg', 'job_pdf', 'job_desc',
             'min_ug_cgpa', 'min_pg_cgpa', 'min_tenth_percentage', 'min_twelfth_percentage',
             'max_active_backlogs', 'ug_package_min', 'ug_package_max', 'pg_package_min',
-            'pg_package_max', 'ug_stipend', 'pg_stipend', 'eligible_programs'
+            'pg_package_max', 'ug_stipend', 'pg_stipend', 'eligible_programs', 'notification'
         ]
+
+    def get_notification(self, obj):
+        notification = getattr(obj, '_notification', None)
+        return DriveNotificationSerializer(notification).data if notification else None
     
     def create(self, validated_data):
         eligible_programs = validated_data.pop('eligible_programs', [])
@@ -69,16 +96,12 @@ class JobWriteSerializer(serializers.ModelSerializer):
             else:
                 print(f"Warning: Skipped duplicate JobProgram: Job {job.id} -> Program {program_id}")
 
-        company_drive = job.company_drive
-        program_ids = set()
-        drive_jobs = company_drive.jobs.all()
-        job_titles = []
-        for job in drive_jobs:
-            job_programs = job.eligible_programs.values_list('id', flat=True)
-            program_ids.update(job_programs)
-            job_titles.append(job.title)
+        # Only the new job is matched against the students' saved searches.
+        match_saved_searches([job])
 
-        send_drive_notification(company_drive.company.name, company_drive.application_deadline, program_ids, job_titles)
+        # Jobs are often added one after another; the announcement is coalesced per drive
+        # and sent once, with the final job list, after the drive has been quiet for a while.
+        job._notification = schedule_drive_notification(job.company_drive)
         return job
         
 
@@ -121,13 +144,18 @@ class CompanyDriveJobSerializer(serializers.ModelSerializer):
 
 class CompanyDriveWriteSerializer(serializers.ModelSerializer):
     jobs = CompanyDriveJobSerializer(many=True, required=True)
+    notification = serializers.SerializerMethodField()
     
     class Meta:
         model = CompanyDrive
         fields = [
             'id', 'placement_drive', 'company', 'drive_type', 'job_mode', 'multiple_allowed',
-            'application_deadline', 'status', 'rounds', 'locations', 'jobs'
+            'application_deadline', 'status', 'rounds', 'locations', 'jobs', 'notification'
         ]
+
+    def get_notification(self, obj):
+        notification = getattr(obj, '_notification', None)
+        return DriveNotificationSerializer(notification).data if notification else None
     
     def validate_jobs(self, value):
         """Enforce at least one job"""
@@ -140,18 +168,20 @@ class CompanyDriveWriteSerializer(serializers.ModelSerializer):
         jobs_data = validated_data.pop('jobs')
         company_drive = CompanyDrive.objects.create(**validated_data)
         
-        program_ids = set()
+        jobs = []
         for job_data in jobs_data: 
             eligible_programs = job_data.pop('eligible_programs', [])
             job = Job.objects.create(company_drive=company_drive, **job_data)
-
-            program_ids.update(eligible_programs)
+            jobs.append(job)
             
             for program_id in eligible_programs:
                 JobProgram.objects.create(job=job, program_id=program_id)
 
-        job_title_list = [job_data['title'] for job_data in jobs_data]
-        send_drive_notification(company_drive.company.name, company_drive.application_deadline, program_ids, job_title_list)
+        match_saved_searches(jobs)
+
+        # The announcement is only scheduled here; it is sent by a background runner after
+        # this transaction commits. Its id is returned so the caller can poll its progress.
+        company_drive._notification = schedule_drive_notification(company_drive)
 
         return company_drive
 
@@ -169,4 +199,155 @@ class JobReadSerializer(serializers.ModelSerializer):
             'max_active_backlogs', 'ug_package_min', 'ug_package_max', 'pg_package_min',
             'pg_package_max', 'ug_stipend', 'pg_stipend', 'eligible_programs',
             'company_name', 'drive_title', 'posted_at', 'updated_at'
-        ]
\ No newline at end of file
+        ]
+
+
+class JobEligibilitySerializer(JobReadSerializer):
+    """
+    A job as seen by one student, with whether they may apply and, if not, why.
+    Expects `eligibility` in the context: {job_id: reasons}, as returned by `EligibilityCache`.
+    """
+    application_deadline = serializers.DateTimeField(source='company_drive.application_deadline', read_only=True)
+    is_eligible = serializers.SerializerMethodField()
+    reasons = serializers.SerializerMethodField()
+
+    class Meta(JobReadSerializer.Meta):
+        fields = JobReadSerializer.Meta.fields + ['application_deadline', 'is_eligible', 'reasons']
+
+    def get_is_eligible(self, obj):
+        return not self.context['eligibility'][obj.pk]
+
+    def get_reasons(self, obj):
+        return self.context['eligibility'][obj.pk]
+
+
+class RankedJobSerializer(JobReadSerializer):
+    """
+    A job in a student's personalized ranking.
+    Expects `scores` in the context: {job_id: score}, as returned by `apps.placements.ranking.rank_jobs`.
+    """
+    application_deadline = serializers.DateTimeField(source='company_drive.application_deadline', read_only=True)
+    job_mode = serializers.CharField(source='company_drive.job_mode', read_only=True)
+    score = serializers.SerializerMethodField()
+
+    class Meta(JobReadSerializer.Meta):
+        fields = JobReadSerializer.Meta.fields + ['application_deadline', 'job_mode', 'score']
+
+    def get_score(self, obj):
+        return self.context['scores'][obj.pk]
+
+
+class EligibleStudentSerializer(serializers.ModelSerializer):
+    """A compact student row for eligibility listings (used by the placement cell)."""
+    student_id = serializers.IntegerField(source='user_id', read_only=True)
+    full_name = serializers.CharField(source='user.get_full_name', read_only=True)
+    email = serializers.EmailField(source='user.email', read_only=True)
+    phone_number = serializers.CharField(source='user.phone_number', read_only=True)
+    program = serializers.CharField(source='program.abbreviation', read_only=True)
+    degree_level = serializers.CharField(source='program.degree_level', read_only=True)
+
+    class Meta:
+        model = StudentProfile
+        fields = [
+            'student_id', 'full_name', 'email', 'phone_number', 'enrollment_number', 'program',
+            'degree_level', 'joining_year', 'graduation_year', 'current_cgpa', 'tenth_percentage',
+            'twelfth_percentage', 'active_backlogs', 'is_placed', 'is_verified'
+        ]
+        read_only_fields = fields
+
+
+class CutoffSimulationSerializer(serializers.Serializer):
+    """
+    A proposed set of job criteria for the cutoff what-if simulator, plus the student population to
+    evaluate it against. Leaving `eligible_programs` empty considers every program.
+    """
+    eligible_programs = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    min_ug_cgpa = serializers.DecimalField(max_digits=4, decimal_places=2, required=False, allow_null=True)
+    min_pg_cgpa = serializers.DecimalField(max_digits=4, decimal_places=2, required=False, allow_null=True)
+    min_tenth_percentage = serializers.DecimalField(max_digits=5, decimal_places=2, required=False, allow_null=True)
+    min_twelfth_percentage = serializers.DecimalField(max_digits=5, decimal_places=2, required=False, allow_null=True)
+    max_active_backlogs = serializers.IntegerField(min_value=0, required=False, allow_null=True)
+
+    graduation_year = serializers.IntegerField(required=False, allow_null=True)
+    include_placed = serializers.BooleanField(default=False)
+    verified_only = serializers.BooleanField(default=True)
+
+    CRITERIA_FIELDS = (
+        'min_ug_cgpa', 'min_pg_cgpa', 'min_tenth_percentage', 'min_twelfth_percentage', 'max_active_backlogs'
+    )
+
+    def get_criteria(self):
+        return {field: self.validated_data.get(field) for field in self.CRITERIA_FIELDS}
+
+    def get_program_ids(self):
+        return self.validated_data['eligible_programs'] or list(Program.objects.values_list('id', flat=True))
+
+    def get_students(self):
+        """The StudentProfile population selected by the scope fields."""
+        students = StudentProfile.objects.all()
+        if self.validated_data.get('graduation_year'):
+            students = students.filter(graduation_year=self.validated_data['graduation_year'])
+        if not self.validated_data['include_placed']:
+            students = students.filter(is_placed=False)
+        if self.validated_data['verified_only']:
+            students = students.filter(is_verified=True)
+        return students
+
+
+class DriveEligibilitySnapshotSerializer(serializers.ModelSerializer):
+    """A student's eligibility for one job, as frozen at the drive's application deadline."""
+    student_name = serializers.CharField(source='student.user.get_full_name', read_only=True)
+    job_title = serializers.CharField(source='job.title', read_only=True)
+    program = serializers.CharField(source='program.abbreviation', read_only=True, default=None)
+
+    class Meta:
+        model = DriveEligibilitySnapshot
+        fields = [
+            'id', 'job', 'job_title', 'student', 'student_name', 'enrollment_number', 'program',
+            'degree_level', 'graduation_year', 'current_cgpa', 'tenth_percentage', 'twelfth_percentage',
+            'active_backlogs', 'is_verified', 'is_placed', 'is_eligible', 'has_applied',
+            'application_status', 'captured_at'
+        ]
+        read_only_fields = fields
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    """A student's saved job search. Empty fields match any job."""
+    unseen_matches = serializers.IntegerField(read_only=True, default=0)
+
+    class Meta:
+        model = SavedSearch
+        fields = [
+            'id', 'name', 'drive_type', 'job_mode', 'location', 'min_package', 'min_stipend',
+            'unseen_matches', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+    def validate(self, data):
+        max_saved_searches = getattr(settings, 'MAX_SAVED_SEARCHES_PER_STUDENT', 20)
+        student = self.context['student_profile']
+        if self.instance is None and SavedSearch.objects.filter(student=student).count() >= max_saved_searches:
+            raise serializers.ValidationError(f"You can save at most {max_saved_searches} searches.")
+        return data
+
+    def create(self, validated_data):
+        return SavedSearch.objects.create(student=self.context['student_profile'], **validated_data)
+
+
+class SavedSearchMatchSerializer(serializers.ModelSerializer):
+    """A job that matched one of the student's saved searches when it was posted."""
+    saved_search_name = serializers.CharField(source='saved_search.name', read_only=True)
+    job_title = serializers.CharField(source='job.title', read_only=True)
+    company_drive = serializers.IntegerField(source='job.company_drive_id', read_only=True)
+    company_name = serializers.CharField(source='job.company_drive.company.name', read_only=True)
+    drive_type = serializers.CharField(source='job.company_drive.drive_type', read_only=True)
+    job_mode = serializers.CharField(source='job.company_drive.job_mode', read_only=True)
+    application_deadline = serializers.DateTimeField(source='job.company_drive.application_deadline', read_only=True)
+
+    class Meta:
+        model = SavedSearchMatch
+        fields = [
+            'id', 'saved_search', 'saved_search_name', 'job', 'job_title', 'company_drive', 'company_name',
+            'drive_type', 'job_mode', 'application_deadline', 'matched_at', 'seen_at'
+        ]
+
@@ -0,0 +1,74 @@
+"""
+Signal Handlers for the Placements App.
+
+SIGNAL HANDLERS:
+===============
+- bump_job_eligibility_version: Invalidates cached eligibility when a job's criteria change
+- bump_job_program_eligibility_version: Invalidates cached eligibility when a job's programs change
+- rebuild_rankings_for_job / _for_job_program / _for_company_drive: Recompute the per-program job
+  rankings (see apps.placements.ranking) after a job, its programs or its drive change
+"""
+from django.db.models import F
+from django.dispatch import receiver
+from django.db.models.signals import pre_save, post_save, post_delete
+from .models import CompanyDrive, Job, JobProgram
+from .ranking import schedule_ranking_rebuild
+
+# The Job fields that eligibility is evaluated on (see apps.placements.eligibility).
+ELIGIBILITY_FIELDS = (
+    'min_ug_cgpa', 'min_pg_cgpa', 'min_tenth_percentage', 'min_twelfth_percentage', 'max_active_backlogs'
+)
+
+
+def _increment_eligibility_version(job_id):
+    Job.objects.filter(pk=job_id).update(eligibility_version=F('eligibility_version') + 1)
+
+
+@receiver(pre_save, sender=Job)
+def remember_job_criteria(sender, instance, **kwargs):
+    """Stores the criteria currently in the database so post_save can tell whether they changed."""
+    instance._previous_eligibility = (
+        Job.objects.filter(pk=instance.pk).values(*ELIGIBILITY_FIELDS, 'eligibility_version').first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Job)
+def bump_job_eligibility_version(sender, instance, created, **kwargs):
+    """Increments the job's eligibility version if any of its criteria changed."""
+    previous = getattr(instance, '_previous_eligibility', None)
+    if created or previous is None:
+        return
+    if all(previous[field] == getattr(instance, field) for field in ELIGIBILITY_FIELDS):
+        return
+
+    _increment_eligibility_version(instance.pk)
+    instance.eligibility_version = previous['eligibility_version'] + 1
+
+
+@receiver(post_save, sender=JobProgram)
+@receiver(post_delete, sender=JobProgram)
+def bump_job_program_eligibility_version(sender, instance, **kwargs):
+    """Adding or removing an eligible program changes who is eligible for the job."""
+    _increment_eligibility_version(instance.job_id)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def rebuild_rankings_for_job(sender, instance, **kwargs):
+    """A job's pay or criteria may have changed, so every program it is open to is re-ranked."""
+    schedule_ranking_rebuild(job_ids=[instance.pk])
+
+
+@receiver(post_save, sender=JobProgram)
+@receiver(post_delete, sender=JobProgram)
+def rebuild_rankings_for_job_program(sender, instance, **kwargs):
+    """The job was opened to, or withdrawn from, the program."""
+    schedule_ranking_rebuild(program_ids=[instance.program_id])
+
+
+@receiver(post_save, sender=CompanyDrive)
+def rebuild_rankings_for_company_drive(sender, instance, created, **kwargs):
+    """The drive's status, deadline, type or job mode may have changed for all of its jobs."""
+    if not created:
+        schedule_ranking_rebuild(job_ids=instance.jobs.values_list('id', flat=True))
@@ -1,3 +1,623 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+from django.utils import timezone
+from apps.users.models import User
+from apps.core.models import Degree, Program, EmailOutbox
+from apps.companies.models import Company
+from apps.students.models import StudentProfile
+from .models import (
+    PlacementDrive, CompanyDrive, Job, JobProgram, DriveNotification, DriveEligibilitySnapshot, CohortJobRanking,
+    SavedSearch, SavedSearchMatch,
+)
+from .utils import run_due_drive_notifications
+from .ranking import rebuild_cohort_ranking, rank_jobs
+from .searches import matching_saved_searches, match_saved_searches
+from .eligibility import (
+    eligible_students_q, annotate_job_eligibility, eligibility_reasons, eligibility_cache,
+    snapshot_drive_eligibility, snapshot_due_drives, simulate_cutoffs,
+)
 
-# Create your tests here.
+
+def create_company_drive(deadline_in=timedelta(days=7), **fields):
+    """
+    A UG program and a drive of one company in 'Placements 2026' whose application deadline is
+    `deadline_in` from now. `fields` override the drive's defaults. Returns (program, company_drive).
+    """
+    degree = Degree.objects.create(name='Bachelor of Technology', abbreviation='BTech')
+    program = Program.objects.create(
+        name='Computer Science', abbreviation='CSE', degree_level='UG', duration_years=4, degree=degree
+    )
+    company = Company.objects.create(name='Acme', email='hr@acme.com', phone_number='9999999999')
+    defaults = {'drive_type': 'FullTime', 'job_mode': 'Remote', 'application_deadline': timezone.now() + deadline_in}
+    company_drive = CompanyDrive.objects.create(
+        placement_drive=PlacementDrive.objects.create(title='Placements 2026'), company=company,
+        **{**defaults, **fields}
+    )
+    return program, company_drive
+
+
+@mock.patch('apps.core.tasks.get_email_dispatcher')
+class DriveNotificationRecoveryTests(TestCase):
+    """A notification left `Running` by a process that died mid-send must still go out, exactly once."""
+    @classmethod
+    def setUpTestData(cls):
+        program, cls.company_drive = create_company_drive()
+        job = Job.objects.create(company_drive=cls.company_drive, title='Engineer')
+        JobProgram.objects.create(job=job, program=program)
+        user = User.objects.create_user(email='student@example.com', phone_number='9000000001', first_name='Asha')
+        StudentProfile.objects.create(
+            user=user, program=program, enrollment_number='ENR1', joining_year=timezone.now().year - 3,
+            current_cgpa=Decimal('8.00'), tenth_percentage=Decimal('80.00'), twelfth_percentage=Decimal('80.00')
+        )
+
+    def _running(self, started_ago):
+        return DriveNotification.objects.create(
+            company_drive=self.company_drive, status=DriveNotification.Status.RUNNING,
+            scheduled_for=timezone.now() - started_ago, started_at=timezone.now() - started_ago
+        )
+
+    def test_stale_running_notification_is_sent(self, get_dispatcher):
+        notification = self._running(timedelta(hours=1))
+
+        self.assertEqual(run_due_drive_notifications(), 1)
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, DriveNotification.Status.COMPLETED)
+        self.assertEqual(
+            list(EmailOutbox.objects.filter(group=notification.email_group).values_list('recipients', flat=True)),
+            [['student@example.com']]
+        )
+
+    def test_stale_running_notification_with_queued_emails_is_not_sent_again(self, get_dispatcher):
+        notification = self._running(timedelta(hours=1))
+        EmailOutbox.objects.create(
+            subject='New Campus Job From Acme', template_name='emails/drive_notification.html',
+            recipients=['student@example.com'], recipient_count=1, is_bulk=True, group=notification.email_group
+        )
+
+        run_due_drive_notifications()
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, DriveNotification.Status.COMPLETED)
+        self.assertEqual(EmailOutbox.objects.filter(group=notification.email_group).count(), 1)
+
+    def test_recently_started_notification_is_left_alone(self, get_dispatcher):
+        notification = self._running(timedelta(minutes=1))
+
+        self.assertEqual(run_due_drive_notifications(), 0)
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, DriveNotification.Status.RUNNING)
+        self.assertFalse(EmailOutbox.objects.exists())
+
+
+class SnapshotDueDrivesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        program, cls.company_drive = create_company_drive(deadline_in=-timedelta(hours=1))
+        job = Job.objects.create(company_drive=cls.company_drive, title='Engineer', min_ug_cgpa=Decimal('7.00'))
+        JobProgram.objects.create(job=job, program=program)
+        for index, cgpa in enumerate((Decimal('8.00'), None)):
+            user = User.objects.create_user(email=f'student{index}@example.com', phone_number=f'900000000{index}')
+            StudentProfile.objects.create(
+                user=user, program=program, enrollment_number=f'ENR{index}', joining_year=timezone.now().year - 3,
+                current_cgpa=cgpa, tenth_percentage=Decimal('80.00'), twelfth_percentage=Decimal('80.00')
+            )
+
+    def test_due_drive_is_snapshotted_once(self):
+        self.assertEqual(snapshot_due_drives(), 1)
+        self.assertEqual(snapshot_due_drives(), 0)
+
+        self.company_drive.refresh_from_db()
+        self.assertIsNotNone(self.company_drive.eligibility_snapshot_at)
+        # A student without a CGPA is recorded as not eligible, not NULL.
+        self.assertEqual(
+            dict(DriveEligibilitySnapshot.objects.values_list('enrollment_number', 'is_eligible')),
+            {'ENR0': True, 'ENR1': False}
+        )
+
+    def test_failed_build_releases_the_claim(self):
+        with mock.patch('apps.placements.eligibility.snapshot_drive_eligibility', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                snapshot_due_drives()
+
+        self.company_drive.refresh_from_db()
+        self.assertIsNone(self.company_drive.eligibility_snapshot_at)
+        self.assertEqual(snapshot_due_drives(), 1)
+
+
+class EligibilityAgreementTests(TestCase):
+    """
+    The set-based SQL filter (`eligible_students_q`) and the per-student explanation
+    (`annotate_job_eligibility` + `eligibility_reasons`) must reach the same verdict for every pair.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cse, cls.company_drive = create_company_drive()
+        degree = cse.degree
+        ece = Program.objects.create(name='Electronics', abbreviation='ECE', degree_level='UG', duration_years=4, degree=degree)
+        mca = Program.objects.create(name='Computer Applications', abbreviation='MCA', degree_level='PG', duration_years=2, degree=degree)
+        phd = Program.objects.create(name='Doctorate', abbreviation='PhD', degree_level='Doctorate', duration_years=5, degree=degree)
+
+        cls.strict = Job.objects.create(
+            company_drive=cls.company_drive, title='Strict', min_ug_cgpa=Decimal('7.00'), min_pg_cgpa=Decimal('6.00'),
+            min_tenth_percentage=Decimal('60.00'), min_twelfth_percentage=Decimal('60.00'), max_active_backlogs=1
+        )
+        # Cutoffs of 0 / NULL do not apply; a backlog limit of 0 does.
+        cls.open = Job.objects.create(
+            company_drive=cls.company_drive, title='Open', min_ug_cgpa=Decimal('0'), max_active_backlogs=0
+        )
+        for program in (cse, mca, phd):
+            JobProgram.objects.create(job=cls.strict, program=program)
+        JobProgram.objects.create(job=cls.open, program=cse)
+
+        year = cls.company_drive.application_deadline.year
+        cls.students = {}
+        rows = (
+            # name, program, cgpa, 10th, 12th, backlogs, graduation year
+            ('ug_strong', cse, '8.50', '85', '85', 0, year),
+            ('ug_at_cutoffs', cse, '7.00', '60', '60', 1, year),
+            ('ug_low_cgpa', cse, '6.99', '85', '85', 0, year),
+            ('ug_backlogs', cse, '9.00', '85', '85', 2, year),
+            ('ug_low_tenth', cse, '8.00', '59.99', '85', 0, year),
+            ('ug_no_cgpa', cse, None, '85', '85', 0, year + 1),
+            ('pg_mid', mca, '6.50', '70', '70', 0, year),
+            ('pg_low', mca, '5.50', '70', '70', 0, year),
+            ('phd_low_cgpa', phd, '4.00', '70', '70', 0, year),
+            ('other_program', ece, '9.50', '90', '90', 0, year),
+            ('graduated', cse, '9.00', '90', '90', 0, year - 2),
+        )
+        for index, (name, program, cgpa, tenth, twelfth, backlogs, graduation_year) in enumerate(rows):
+            user = User.objects.create_user(email=f'{name}@example.com', phone_number=f'91000000{index:02}', first_name=name)
+            cls.students[name] = StudentProfile.objects.create(
+                user=user, program=program, enrollment_number=name, active_backlogs=backlogs,
+                joining_year=graduation_year - program.duration_years + 1,
+                current_cgpa=Decimal(cgpa) if cgpa else None,
+                tenth_percentage=Decimal(tenth), twelfth_percentage=Decimal(twelfth),
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def _sql_eligible(self, job, program_ids=None):
+        return set(
+            StudentProfile.objects.filter(eligible_students_q(job, program_ids)).values_list('enrollment_number', flat=True)
+        )
+
+    def _reasons(self, job, student):
+        student = StudentProfile.objects.select_related('program').get(pk=student.pk)
+        return eligibility_reasons(annotate_job_eligibility(Job.objects.filter(pk=job.pk), student).get(), student)
+
+    def test_sql_filter_applies_every_rule(self):
+        self.assertEqual(
+            self._sql_eligible(self.strict),
+            {'ug_strong', 'ug_at_cutoffs', 'pg_mid', 'phd_low_cgpa', 'graduated'}
+        )
+        self.assertEqual(
+            self._sql_eligible(self.open),
+            {'ug_strong', 'ug_low_cgpa', 'ug_low_tenth', 'ug_no_cgpa', 'graduated'}
+        )
+
+    def test_sql_filter_and_reasons_agree(self):
+        for job in (self.strict, self.open):
+            eligible = self._sql_eligible(job)
+            program_ids = JobProgram.objects.filter(job=job).values_list('program_id', flat=True)
+            self.assertEqual(self._sql_eligible(job, program_ids), eligible)
+            for name, student in self.students.items():
+                with self.subTest(job=job.title, student=name):
+                    reasons = self._reasons(job, student)
+                    self.assertEqual(not reasons, name in eligible, reasons)
+                    self.assertEqual(eligibility_cache.get_reasons(student, job), reasons)
+
+    def test_reasons_name_the_failed_rule(self):
+        expected = {
+            'ug_low_cgpa': 'UG CGPA 6.99 below required 7.00',
+            'pg_low': 'PG CGPA 5.50 below required 6.00',
+            'ug_backlogs': 'Active backlogs 2 exceed maximum 1',
+            'ug_low_tenth': '10th percentage 59.99 below required 60.00',
+            'other_program': 'Your program is not eligible for this job',
+        }
+        for name, reason in expected.items():
+            with self.subTest(student=name):
+                self.assertEqual(self._reasons(self.strict, self.students[name]), [reason])
+
+    def test_snapshot_covers_students_graduating_by_the_deadline_with_the_same_verdicts(self):
+        snapshot_drive_eligibility(self.company_drive)
+
+        for job in (self.strict, self.open):
+            rows = dict(
+                DriveEligibilitySnapshot.objects.filter(job=job).values_list('enrollment_number', 'is_eligible')
+            )
+            program_ids = set(JobProgram.objects.filter(job=job).values_list('program_id', flat=True))
+            population = {
+                name for name, student in self.students.items()
+                if student.program_id in program_ids and name != 'graduated'
+            }
+            with self.subTest(job=job.title):
+                self.assertEqual(set(rows), population)
+                self.assertEqual({name for name, eligible in rows.items() if eligible}, self._sql_eligible(job) - {'graduated'})
+
+
+class EligibilityCacheInvalidationTests(TestCase):
+    """Changing a student's academic data or a job's criteria must change the cached decision."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.program, company_drive = create_company_drive()
+        cls.job = Job.objects.create(company_drive=company_drive, title='Engineer', min_ug_cgpa=Decimal('7.00'))
+        JobProgram.objects.create(job=cls.job, program=cls.program)
+        user = User.objects.create_user(email='student@example.com', phone_number='9000000001')
+        cls.student = StudentProfile.objects.create(
+            user=user, program=cls.program, enrollment_number='ENR1', joining_year=timezone.now().year - 3,
+            current_cgpa=Decimal('8.00'), tenth_percentage=Decimal('80.00'), twelfth_percentage=Decimal('80.00')
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.student = StudentProfile.objects.select_related('program').get(pk=self.student.pk)
+        self.job = Job.objects.get(pk=self.job.pk)
+        self.assertEqual(eligibility_cache.get_reasons(self.student, self.job), [])
+
+    def test_student_cgpa_change(self):
+        self.student.current_cgpa = Decimal('6.50')
+        self.student.save()
+
+        self.assertEqual(eligibility_cache.get_reasons(self.student, self.job), ['UG CGPA 6.50 below required 7.00'])
+        reloaded = StudentProfile.objects.select_related('program').get(pk=self.student.pk)
+        self.assertEqual(eligibility_cache.get_reasons(reloaded, self.job), ['UG CGPA 6.50 below required 7.00'])
+
+    def test_unrelated_student_change_keeps_the_cached_decision(self):
+        version = self.student.eligibility_version
+        self.student.is_verified = True
+        self.student.save()
+
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.eligibility_version, version)
+
+    def test_job_criteria_change(self):
+        self.job.max_active_backlogs = 0
+        self.job.min_ug_cgpa = Decimal('8.50')
+        self.job.save()
+
+        self.assertEqual(eligibility_cache.get_reasons(self.student, self.job), ['UG CGPA 8.00 below required 8.50'])
+        self.assertEqual(
+            eligibility_cache.get_reasons(self.student, Job.objects.get(pk=self.job.pk)),
+            ['UG CGPA 8.00 below required 8.50']
+        )
+
+    def test_job_program_removed(self):
+        JobProgram.objects.filter(job=self.job, program=self.program).delete()
+
+        self.assertEqual(
+            eligibility_cache.get_reasons(self.student, Job.objects.get(pk=self.job.pk)),
+            ['Your program is not eligible for this job']
+        )
+
+
+class EligibleJobFeedTests(TestCase):
+    """The student's job feed (GET /jobs/eligible/): eligibility is evaluated in the query that loads the jobs."""
+    URL = '/api/v1/placements/jobs/eligible/'
+
+    @classmethod
+    def setUpTestData(cls):
+        program, company_drive = create_company_drive()
+        cls.eligible = Job.objects.create(company_drive=company_drive, title='Engineer', min_ug_cgpa=Decimal('7.00'))
+        cls.strict = Job.objects.create(company_drive=company_drive, title='Researcher', min_ug_cgpa=Decimal('9.00'))
+        for job in (cls.eligible, cls.strict):
+            JobProgram.objects.create(job=job, program=program)
+        user = User.objects.create_user(email='student@example.com', phone_number='9000000001')
+        cls.student = StudentProfile.objects.create(
+            user=user, program=program, enrollment_number='ENR1', joining_year=timezone.now().year - 3,
+            current_cgpa=Decimal('8.00'), tenth_percentage=Decimal('80.00'), twelfth_percentage=Decimal('80.00')
+        )
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('apps.core.permissions.IsStudentRole.has_permission', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student.user)
+
+    def _feed(self, query=''):
+        # Cache misses must be answered from the annotated jobs, without evaluating them again.
+        with mock.patch('apps.placements.eligibility.annotate_job_eligibility') as reevaluate:
+            response = self.client.get(self.URL + query)
+        reevaluate.assert_not_called()
+        self.assertEqual(response.status_code, 200, response.data)
+        return {job['title']: (job['is_eligible'], job['reasons']) for job in response.data['data']}
+
+    def test_every_open_job_with_its_reasons(self):
+        self.assertEqual(self._feed(), {
+            'Engineer': (True, []), 'Researcher': (False, ['UG CGPA 8.00 below required 9.00']),
+        })
+
+    def test_eligible_only_is_filtered_in_the_query(self):
+        self.assertEqual(self._feed('?eligible_only=true'), {'Engineer': (True, [])})
+        # A cached decision is served as well.
+        self.assertEqual(self._feed('?eligible_only=true'), {'Engineer': (True, [])})
+
+    def test_jobs_past_their_deadline_are_not_listed(self):
+        closed = CompanyDrive.objects.create(
+            placement_drive=self.eligible.company_drive.placement_drive,
+            company=Company.objects.create(name='Globex', email='hr@globex.com', phone_number='8888888888'),
+            drive_type='FullTime', job_mode='Remote', application_deadline=timezone.now() - timedelta(minutes=1)
+        )
+        JobProgram.objects.create(job=Job.objects.create(company_drive=closed, title='Analyst'), program=self.student.program)
+
+        self.assertEqual(set(self._feed()), {'Engineer', 'Researcher'})
+
+
+class CohortRankingRebuildTests(TestCase):
+    """Job, program and drive changes rebuild the affected programs' rankings (apps.placements.ranking) on commit."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.program, cls.company_drive = create_company_drive()
+        cls.other_program = Program.objects.create(
+            name='Electronics', abbreviation='ECE', degree_level='UG', duration_years=4, degree=cls.program.degree
+        )
+
+    def _ranked_job_ids(self, program):
+        return sorted(entry[0] for entry in CohortJobRanking.objects.get(program=program).entries)
+
+    def test_posting_a_drive_rebuilds_each_program_once(self):
+        with mock.patch('apps.placements.ranking.rebuild_cohort_ranking', wraps=rebuild_cohort_ranking) as rebuild:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                jobs = []
+                for index in range(3):
+                    jobs.append(Job.objects.create(
+                        company_drive=self.company_drive, title=f'Role {index}', ug_package_max=Decimal(10 + index)
+                    ))
+                    for program in (self.program, self.other_program):
+                        JobProgram.objects.create(job=jobs[-1], program=program)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(
+            sorted(call.args[0].pk for call in rebuild.call_args_list), sorted([self.program.pk, self.other_program.pk])
+        )
+        for program in (self.program, self.other_program):
+            self.assertEqual(self._ranked_job_ids(program), [job.pk for job in jobs])
+
+    def test_job_and_program_changes_are_applied_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = Job.objects.create(company_drive=self.company_drive, title='Engineer', ug_package_max=Decimal('10'))
+            JobProgram.objects.create(job=job, program=self.program)
+        self.assertEqual(self._ranked_job_ids(self.program), [job.pk])
+
+        def ranked_version():
+            [entry] = CohortJobRanking.objects.get(program=self.program).entries
+            return entry[1]
+
+        version = ranked_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            job.min_ug_cgpa = Decimal('6.00')
+            job.save()
+            JobProgram.objects.create(job=job, program=self.other_program)
+        self.assertEqual(ranked_version(), version)
+        self.assertFalse(CohortJobRanking.objects.filter(program=self.other_program).exists())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(ranked_version(), Job.objects.get(pk=job.pk).eligibility_version)
+        self.assertGreater(ranked_version(), version)
+        self.assertEqual(self._ranked_job_ids(self.other_program), [job.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            JobProgram.objects.filter(job=job, program=self.program).delete()
+        self.assertEqual(self._ranked_job_ids(self.program), [])
+        self.assertEqual(self._ranked_job_ids(self.other_program), [job.pk])
+
+
+class JobRankingTests(TestCase):
+    """Scores of a student's open eligible jobs (apps.placements.ranking.rank_jobs)."""
+    PAY_ONLY = {'pay': 1, 'deadline': 0, 'job_mode': 0}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        cls.program, remote = create_company_drive(deadline_in=timedelta(days=10), job_mode='Remote')
+        cls.pg_program = Program.objects.create(
+            name='Computer Applications', abbreviation='MCA', degree_level='PG', duration_years=2, degree=cls.program.degree
+        )
+
+        def drive(name, **fields):
+            company = Company.objects.create(name=name, email=f'hr@{name.lower()}.com', phone_number=f'{name}-hr')
+            return CompanyDrive.objects.create(
+                placement_drive=remote.placement_drive, company=company, drive_type='FullTime', **fields
+            )
+
+        hybrid = drive('Globex', job_mode='Hybrid', application_deadline=cls.now + timedelta(days=1))
+        onsite = drive('Initech', job_mode='Onsite')
+        closed = drive('Umbrella', job_mode='Remote', status='Closed')
+        expired = drive('Hooli', job_mode='Remote', application_deadline=cls.now - timedelta(hours=1))
+
+        cls.jobs = {}
+        for company_drive, title, ug_package, pg_package in (
+            (remote, 'Remote', '20', '5'), (hybrid, 'Hybrid', '10', '30'), (onsite, 'Onsite', '15', '15'),
+            (closed, 'Closed', '50', '50'), (expired, 'Expired', '50', '50'),
+        ):
+            job = Job.objects.create(
+                company_drive=company_drive, title=title,
+                ug_package_max=Decimal(ug_package), pg_package_max=Decimal(pg_package)
+            )
+            for program in (cls.program, cls.pg_program):
+                JobProgram.objects.create(job=job, program=program)
+            cls.jobs[title] = job
+
+        cls.students = {}
+        for program in (cls.program, cls.pg_program):
+            user = User.objects.create_user(email=f'{program.abbreviation}@example.com', phone_number=program.abbreviation)
+            cls.students[program.degree_level] = StudentProfile.objects.create(
+                user=user, program=program, enrollment_number=program.abbreviation, joining_year=cls.now.year - 1,
+                current_cgpa=Decimal('8.00'), tenth_percentage=Decimal('80.00'), twelfth_percentage=Decimal('80.00')
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def _rank(self, degree_level='UG', preferred_job_modes=(), weights=None, now=None):
+        student = StudentProfile.objects.select_related('program').get(pk=self.students[degree_level].pk)
+        titles = {job.pk: title for title, job in self.jobs.items()}
+        return [
+            (titles[job_id], score)
+            for job_id, score in rank_jobs(student, preferred_job_modes, weights, now=now or self.now)
+        ]
+
+    def test_pay_is_scored_for_the_students_degree_level(self):
+        # Relative to the best-paying open job; the closed and expired drives' 50 LPA do not count.
+        self.assertEqual(self._rank('UG', weights=self.PAY_ONLY), [('Remote', 1.0), ('Onsite', 0.75), ('Hybrid', 0.5)])
+        self.assertEqual(self._rank('PG', weights=self.PAY_ONLY), [('Hybrid', 1.0), ('Onsite', 0.5), ('Remote', 0.1667)])
+
+    def test_closer_deadlines_rank_higher(self):
+        # 1 and 10 days out on a 14-day horizon; a drive without a deadline gets no deadline score.
+        self.assertEqual(
+            self._rank(weights={'pay': 0, 'deadline': 1, 'job_mode': 0}),
+            [('Hybrid', 0.9286), ('Remote', 0.2857), ('Onsite', 0.0)]
+        )
+
+    def test_preferred_job_modes_rank_higher(self):
+        self.assertEqual(
+            self._rank(preferred_job_modes=['Hybrid', 'Remote'], weights={'pay': 0, 'deadline': 0, 'job_mode': 1}),
+            [('Hybrid', 1.0), ('Remote', 0.5), ('Onsite', 0.0)]
+        )
+
+    def test_closed_and_past_deadline_jobs_drop_out(self):
+        self.assertEqual({title for title, _ in self._rank()}, {'Remote', 'Hybrid', 'Onsite'})
+        # The Hybrid deadline passes after the ranking was built.
+        self.assertEqual({title for title, _ in self._rank(now=self.now + timedelta(days=2))}, {'Remote', 'Onsite'})
+
+
+class CutoffSimulationTests(TestCase):
+    """The what-if simulator (apps.placements.eligibility.simulate_cutoffs) over a small fixed population."""
+    CRITERIA = {
+        'min_ug_cgpa': Decimal('7.00'), 'min_pg_cgpa': Decimal('6.00'),
+        'min_tenth_percentage': Decimal('60.00'), 'max_active_backlogs': 1,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cse, _ = create_company_drive()
+        cls.mca = Program.objects.create(
+            name='Computer Applications', abbreviation='MCA', degree_level='PG', duration_years=2, degree=cls.cse.degree
+        )
+        ece = Program.objects.create(
+            name='Electronics', abbreviation='ECE', degree_level='UG', duration_years=4, degree=cls.cse.degree
+        )
+        rows = (
+            # name, program, cgpa, 10th, backlogs, joining year
+            ('ug_strong', cls.cse, '8.10', '85', 0, 2022),
+            ('ug_at_cutoffs', cls.cse, '7.00', '60', 1, 2023),
+            ('ug_just_below_cgpa', cls.cse, '6.90', '85', 0, 2022),
+            ('ug_low_cgpa', cls.cse, '6.10', '85', 0, 2023),
+            ('ug_low_cgpa_and_tenth', cls.cse, '6.50', '55', 0, 2023),
+            ('ug_low_cgpa_and_backlogs', cls.cse, '6.60', '85', 2, 2023),
+            ('ug_backlogs', cls.cse, '9.00', '85', 3, 2022),
+            ('pg_eligible', cls.mca, '6.50', '70', 0, 2024),
+            ('pg_low_cgpa', cls.mca, '5.80', '70', 0, 2024),
+            ('other_program', ece, '9.00', '90', 0, 2022),
+        )
+        for index, (name, program, cgpa, tenth, backlogs, joining_year) in enumerate(rows):
+            user = User.objects.create_user(email=f'{name}@example.com', phone_number=f'92000000{index:02}')
+            StudentProfile.objects.create(
+                user=user, program=program, enrollment_number=name, joining_year=joining_year,
+                current_cgpa=Decimal(cgpa), tenth_percentage=Decimal(tenth), twelfth_percentage=Decimal('80.00'),
+                active_backlogs=backlogs
+            )
+
+    def _simulate(self, **changes):
+        return simulate_cutoffs({**self.CRITERIA, **changes}, [self.cse.pk, self.mca.pk])
+
+    def test_eligible_count_and_breakdowns(self):
+        result = self._simulate()
+
+        # ug_strong, ug_at_cutoffs and pg_eligible.
+        self.assertEqual(result['eligible'], 3)
+        self.assertEqual(result['by_program'], [
+            {'program_id': self.cse.pk, 'program_name': 'CSE', 'count': 2},
+            {'program_id': self.mca.pk, 'program_name': 'MCA', 'count': 1},
+        ])
+        self.assertEqual(result['by_degree_level'], [{'degree_level': 'PG', 'count': 1}, {'degree_level': 'UG', 'count': 2}])
+        self.assertEqual(result['by_joining_year'], [
+            {'joining_year': 2022, 'count': 1}, {'joining_year': 2023, 'count': 1}, {'joining_year': 2024, 'count': 1},
+        ])
+        self.assertEqual(set(result['histograms']), {'ug_cgpa', 'pg_cgpa', 'tenth_percentage'})
+
+    def test_histogram_counts_students_who_meet_every_other_criterion(self):
+        histogram = self._simulate()['histograms']['ug_cgpa']
+
+        self.assertEqual(
+            [(bucket['from'], bucket['to'], bucket['count'], bucket['clears_cutoff']) for bucket in histogram],
+            [
+                (Decimal('6.00'), Decimal('6.25'), 1, False), (Decimal('6.25'), Decimal('6.50'), 0, False),
+                (Decimal('6.50'), Decimal('6.75'), 0, False), (Decimal('6.75'), Decimal('7.00'), 1, False),
+                (Decimal('7.00'), Decimal('7.25'), 1, True), (Decimal('7.25'), Decimal('7.50'), 0, True),
+                (Decimal('7.50'), Decimal('7.75'), 0, True), (Decimal('7.75'), Decimal('8.00'), 0, True),
+            ]
+        )
+        # The bins below the cutoff hold exactly the students who fail only the UG CGPA cutoff
+        # (ug_just_below_cgpa and ug_low_cgpa), i.e. those that dropping it would add.
+        below_cutoff = sum(bucket['count'] for bucket in histogram if not bucket['clears_cutoff'])
+        self.assertEqual(below_cutoff, 2)
+        self.assertEqual(self._simulate(min_ug_cgpa=None)['eligible'] - self._simulate()['eligible'], below_cutoff)
+
+
+class SavedSearchMatchingTests(TestCase):
+    """New jobs are matched against saved searches through the inverted index (apps.placements.searches)."""
+    @classmethod
+    def setUpTestData(cls):
+        cse, company_drive = create_company_drive(job_mode='Remote', locations=['Bengaluru', 'Pune'])
+        mca = Program.objects.create(
+            name='Computer Applications', abbreviation='MCA', degree_level='PG', duration_years=2, degree=cse.degree
+        )
+        cls.job = Job.objects.create(
+            company_drive=company_drive, title='Engineer', ug_package_max=Decimal('12.00'), pg_package_max=Decimal('20.00')
+        )
+        cls.students = {}
+        for program in (cse, mca):
+            user = User.objects.create_user(email=f'{program.abbreviation}@example.com', phone_number=program.abbreviation)
+            cls.students[program.degree_level] = StudentProfile.objects.create(
+                user=user, program=program, enrollment_number=program.abbreviation, joining_year=2023
+            )
+
+    def _search(self, name, degree_level='UG', **fields):
+        return SavedSearch.objects.create(student=self.students[degree_level], name=name, **fields)
+
+    def _matching(self):
+        return set(matching_saved_searches(self.job).values_list('name', flat=True))
+
+    def test_blank_fields_are_wildcards(self):
+        self._search('anything')
+        self._search('remote full-time', drive_type='FullTime', job_mode='Remote')
+        self._search('pune', location=' PUNE ')
+        self.assertEqual(self._matching(), {'anything', 'remote full-time', 'pune'})
+
+    def test_every_indexed_field_must_match(self):
+        self._search('mumbai', location='Mumbai')
+        self._search('onsite', job_mode='Onsite')
+        self._search('remote internship', drive_type='Internship', job_mode='Remote', location='Pune')
+        self.assertEqual(self._matching(), set())
+
+    def test_minimum_package_uses_the_students_degree_level(self):
+        # The job pays 12 LPA to UG students and 20 LPA to PG students.
+        self._search('ug 10', min_package=Decimal('10'))
+        self._search('ug 15', min_package=Decimal('15'))
+        self._search('pg 15', degree_level='PG', min_package=Decimal('15'))
+        self._search('pg 25', degree_level='PG', min_package=Decimal('25'))
+        # No stipend is offered, so any minimum stipend rules the job out.
+        self._search('stipend', min_stipend=Decimal('10000'))
+        self.assertEqual(self._matching(), {'ug 10', 'pg 15'})
+
+    def test_matches_are_recorded_once(self):
+        first = self._search('anything')
+        second = self._search('remote', job_mode='Remote')
+        SavedSearchMatch.objects.create(saved_search=first, job=self.job)
+
+        match_saved_searches([self.job])
+        match_saved_searches([self.job])
+
+        self.assertEqual(
+            sorted(SavedSearchMatch.objects.values_list('saved_search_id', 'job_id')),
+            sorted([(first.pk, self.job.pk), (second.pk, self.job.pk)])
+        )
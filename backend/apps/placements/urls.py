@@ -1,11 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PlacementDriveViewSet, CompanyDriveViewSet, JobViewSet
+from .views import PlacementDriveViewSet, CompanyDriveViewSet, JobViewSet, DriveNotificationViewSet, SavedSearchViewSet
 
 router = DefaultRouter()
 router.register(r'placement-drives', PlacementDriveViewSet, basename='placement-drive')
 router.register(r'company-drives', CompanyDriveViewSet, basename='company-drive')
 router.register(r'jobs', JobViewSet, basename='job')
+router.register(r'drive-notifications', DriveNotificationViewSet, basename='drive-notification')
+router.register(r'saved-searches', SavedSearchViewSet, basename='saved-search')
 
 urlpatterns = [
     path('', include(router.urls)),
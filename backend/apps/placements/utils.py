@@ -1,43 +1,271 @@
-from datetime import datetime
-from django.db.models import Q
+import logging
+import threading
+from collections import defaultdict
+from datetime import timedelta
 from django.conf import settings
-from apps.core.models import Program
+from django.utils import timezone
+from django.db import transaction
+from django.db.models import Q
+from apps.core.models import EmailOutbox
 from apps.students.models import StudentProfile
-from apps.core.tasks import send_email_in_background
-
-def send_drive_notification(company_name, application_deadline, program_ids, job_title_list):
-    current_calendar_year = datetime.now().year
-    programs_with_duration = Program.objects.filter(id__in=program_ids).values('id', 'duration_years') 
-    target_joining_years = {}
-    for p in programs_with_duration:
-        # Target Joining Year = Current Year - (Duration - 1)
-        target_year = current_calendar_year - (p['duration_years'] - 1)
-        target_joining_years[p['id']] = target_year
-    
-    q_objects = Q()
-    for program_id, target_year in target_joining_years.items():
-        q_objects |= Q(program_id=program_id, joining_year=target_year)
-
-    final_year_students_to_notify = StudentProfile.objects.filter(
-            q_objects,
-            is_placed=False, 
-            user__is_active=True 
-        ).select_related('user').distinct()
+from apps.core.tasks import send_bulk_email_in_background, get_email_dispatcher
+from .models import DriveNotification, Job, JobProgram
+
+logger = logging.getLogger(__name__)
+
+
+def format_deadline(application_deadline):
+    """Formats a drive deadline the way it is shown in notification emails."""
+    if not application_deadline:
+        return "Not specified"
+    return application_deadline.strftime('%B %#d, %Y, %I:%M %p')
+
+
+def send_drive_notification(company_name, application_deadline, program_ids, job_title_list, group=''):
+    # Final-year students of the eligible programs, resolved through the
+    # (program, graduation_year, is_placed) cohort index.
+    recipient_emails = StudentProfile.objects.final_year(program_ids).notifiable().values_list(
+        'user__email', flat=True
+    )
             
-    deadline_datetime = application_deadline
-    
     base_email_context = {
         'company_name': company_name,
         'job_roles': job_title_list,
-        'deadline': deadline_datetime.strftime('%B %#d, %Y, %I:%M %p'),
+        'deadline': format_deadline(application_deadline),
         'drive_url': settings.FRONTEND_URL
     }
 
-    for profile in final_year_students_to_notify:
-        print(f"Sending email to: {profile.user.email}")
-        send_email_in_background(
-            subject=f"New Campus Job From {company_name}", 
-            template_name="emails/drive_notification.html", 
-            context=base_email_context, 
-            recipient_list=[profile.user.email]
-        )
\ No newline at end of file
+    # The context is identical for every student, so the whole cohort is sent
+    # as a handful of batch API calls instead of one email job per student.
+    send_bulk_email_in_background(
+        subject=f"New Campus Job From {company_name}", 
+        template_name="emails/drive_notification.html", 
+        context=base_email_context, 
+        recipient_list=list(recipient_emails),
+        group=group
+    )
+
+
+def schedule_drive_notification(company_drive):
+    """
+    Schedules (or postpones) the "new drive" announcement for a CompanyDrive.
+
+    Every call pushes the drive's single `Scheduled` notification back by
+    `DRIVE_NOTIFICATION_COALESCE_SECONDS`. An admin entering several jobs one after another
+    therefore produces one announcement, sent once the drive has been quiet for the window,
+    which lists the final set of jobs and targets the union of their programs.
+
+    Args:
+        company_drive (CompanyDrive): The drive that was created or received a new job.
+
+    Returns:
+        DriveNotification: The scheduled notification.
+    """
+    window = getattr(settings, 'DRIVE_NOTIFICATION_COALESCE_SECONDS', 120)
+    run_at = timezone.now() + timedelta(seconds=window)
+
+    with transaction.atomic():
+        notification = DriveNotification.objects.select_for_update().filter(
+            company_drive=company_drive,
+            status=DriveNotification.Status.SCHEDULED
+        ).first()
+
+        if notification:
+            notification.scheduled_for = run_at
+            notification.save(update_fields=['scheduled_for', 'updated_at'])
+        else:
+            notification = DriveNotification.objects.create(
+                company_drive=company_drive,
+                scheduled_for=run_at
+            )
+
+    # Wake up this process when the window closes. Earlier timers for the same drive find
+    # nothing due and do nothing; if the process dies first, the row stays `Scheduled` and
+    # is picked up by `python manage.py send_drive_notifications`. A row left `Running` by a
+    # process that died mid-send is reclaimed by the same command after
+    # `DRIVE_NOTIFICATION_RUNNING_TIMEOUT`.
+    transaction.on_commit(lambda: _start_notification_timer(window))
+    return notification
+
+
+def _start_notification_timer(delay):
+    """Runs due notifications on the shared worker pool after `delay` seconds."""
+    timer = threading.Timer(
+        delay + 1,
+        lambda: get_email_dispatcher().submit(run_due_drive_notifications)
+    )
+    timer.daemon = True
+    timer.start()
+
+
+def run_due_drive_notifications(batch_size=20):
+    """
+    Sends every drive notification whose coalescing window has closed.
+    In digest mode (`DRIVE_NOTIFICATION_DIGEST`), they are queued for the next digest instead.
+
+    Rows are claimed with `SELECT ... FOR UPDATE SKIP LOCKED`, so several processes can call this
+    concurrently without announcing a drive twice. A row left `Running` for longer than
+    `DRIVE_NOTIFICATION_RUNNING_TIMEOUT` seconds (its process died or was redeployed mid-send) is
+    claimed again; if its emails had already reached the outbox, it is only marked completed.
+
+    Returns:
+        int: The number of notifications that were sent.
+    """
+    now = timezone.now()
+    stale_run = now - timedelta(seconds=getattr(settings, 'DRIVE_NOTIFICATION_RUNNING_TIMEOUT', 900))
+    with transaction.atomic():
+        due_ids = list(
+            DriveNotification.objects.select_for_update(skip_locked=True).filter(
+                Q(status=DriveNotification.Status.SCHEDULED, scheduled_for__lte=now) |
+                Q(status=DriveNotification.Status.RUNNING, started_at__lt=stale_run)
+            ).values_list('id', flat=True)[:batch_size]
+        )
+        DriveNotification.objects.filter(id__in=due_ids).update(
+            status=DriveNotification.Status.RUNNING, started_at=now
+        )
+
+    notifications = list(DriveNotification.objects.filter(id__in=due_ids).select_related(
+        'company_drive__company'
+    ))
+    already_queued = set(
+        EmailOutbox.objects.filter(
+            group__in=[notification.email_group for notification in notifications]
+        ).values_list('group', flat=True).distinct()
+    )
+    digest_mode = getattr(settings, 'DRIVE_NOTIFICATION_DIGEST', False)
+    for notification in notifications:
+        if digest_mode:
+            # Held back for the next digest (see `send_drive_digest`).
+            notification.status = DriveNotification.Status.DIGEST
+            notification.save(update_fields=['status', 'updated_at'])
+            continue
+        if notification.email_group in already_queued:
+            # Reclaimed after its emails were queued; the outbox delivers them.
+            notification.status = DriveNotification.Status.COMPLETED
+            notification.completed_at = timezone.now()
+            notification.save(update_fields=['status', 'completed_at', 'updated_at'])
+            continue
+        try:
+            notify_company_drive(notification.company_drive, group=notification.email_group)
+        except Exception:
+            logger.exception("Drive notification %s failed.", notification.id)
+            notification.status = DriveNotification.Status.FAILED
+        else:
+            notification.status = DriveNotification.Status.COMPLETED
+        notification.completed_at = timezone.now()
+        notification.save(update_fields=['status', 'completed_at', 'updated_at'])
+
+    return len(due_ids)
+
+
+def notify_company_drive(company_drive, group=''):
+    """
+    Announces a CompanyDrive, with its current jobs, to the final-year students of every eligible program.
+
+    Args:
+        company_drive (CompanyDrive): The drive to announce.
+        group (str): The `EmailOutbox.group` used to track delivery of the announcement.
+    """
+    job_titles = list(company_drive.jobs.values_list('title', flat=True))
+    program_ids = set(
+        JobProgram.objects.filter(job__company_drive=company_drive).values_list('program_id', flat=True)
+    )
+    if not job_titles or not program_ids:
+        return
+
+    send_drive_notification(
+        company_drive.company.name, company_drive.application_deadline, program_ids, job_titles, group=group
+    )
+
+
+def send_drive_digest():
+    """
+    Sends one aggregated email per student covering every drive announcement queued since the last digest.
+
+    Drives are targeted by cohort (the final-year students of a program), so all students of a
+    cohort receive the same digest. The cohort is resolved with a single set-based query over
+    `StudentProfile`, and each cohort's digest is rendered once and sent as a bulk email, instead
+    of looping over students. Drives that closed or passed their deadline in the meantime are left out.
+
+    Returns:
+        int: The number of drive announcements included in this digest run.
+    """
+    with transaction.atomic():
+        notification_ids = list(
+            DriveNotification.objects.select_for_update(skip_locked=True).filter(
+                status=DriveNotification.Status.DIGEST
+            ).values_list('id', flat=True)
+        )
+        DriveNotification.objects.filter(id__in=notification_ids).update(
+            status=DriveNotification.Status.RUNNING, started_at=timezone.now()
+        )
+
+    if not notification_ids:
+        return 0
+
+    try:
+        now = timezone.now()
+        drives = {
+            notification.company_drive_id: notification.company_drive
+            for notification in DriveNotification.objects.filter(id__in=notification_ids).select_related(
+                'company_drive__company'
+            )
+            if notification.company_drive.status == 'Open' and (
+                not notification.company_drive.application_deadline
+                or notification.company_drive.application_deadline > now
+            )
+        }
+
+        job_titles = defaultdict(list)
+        for drive_id, title in Job.objects.filter(company_drive_id__in=drives).values_list('company_drive_id', 'title'):
+            job_titles[drive_id].append(title)
+
+        drive_programs = JobProgram.objects.filter(job__company_drive_id__in=drives).values_list(
+            'job__company_drive_id', 'program_id'
+        ).distinct()
+
+        # Every drive targets the final-year cohort of each of its programs, so the
+        # program id identifies the cohort: program_id -> ids of the drives announced to it.
+        cohort_drives = defaultdict(set)
+        for drive_id, program_id in drive_programs:
+            cohort_drives[program_id].add(drive_id)
+
+        cohort_emails = defaultdict(list)
+        if cohort_drives:
+            students = StudentProfile.objects.final_year(list(cohort_drives)).notifiable().values_list(
+                'program_id', 'user__email'
+            )
+            for program_id, email in students:
+                cohort_emails[program_id].append(email)
+
+        for cohort, emails in cohort_emails.items():
+            cohort_drive_list = sorted(
+                (drives[drive_id] for drive_id in cohort_drives[cohort]),
+                key=lambda drive: (drive.application_deadline is None, drive.application_deadline or now)
+            )
+            send_bulk_email_in_background(
+                subject=f"{len(cohort_drive_list)} New Campus Drive(s) For You",
+                template_name="emails/drive_digest.html",
+                context={
+                    'drives': [
+                        {
+                            'company_name': drive.company.name,
+                            'job_roles': job_titles[drive.id],
+                            'deadline': format_deadline(drive.application_deadline),
+                        }
+                        for drive in cohort_drive_list
+                    ],
+                    'drive_url': settings.FRONTEND_URL
+                },
+                recipient_list=emails
+            )
+    except Exception:
+        logger.exception("Drive digest failed; notifications %s were re-queued.", notification_ids)
+        DriveNotification.objects.filter(id__in=notification_ids).update(status=DriveNotification.Status.DIGEST)
+        raise
+
+    DriveNotification.objects.filter(id__in=notification_ids).update(
+        status=DriveNotification.Status.COMPLETED,
+        completed_at=timezone.now()
+    )
+    return len(notification_ids)
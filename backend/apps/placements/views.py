@@ -1,18 +1,32 @@
 from rest_framework import permissions
 from apps.core.views import BaseViewSet
 from rest_framework.decorators import action  
-from apps.core.permissions import IsAdminRole
-from .models import PlacementDrive, CompanyDrive, Job
+from apps.core.permissions import IsAdminRole, IsPlacementTeam, IsStudentRole
+from .models import PlacementDrive, CompanyDrive, Job, DriveNotification, DriveEligibilitySnapshot, SavedSearch, SavedSearchMatch
 from django_filters.rest_framework import DjangoFilterBackend
-from apps.core.response import SuccessResponse  
+from apps.core.response import SuccessResponse, NotFoundResponse, ValidationErrorResponse
 from .serializers import (
     PlacementDriveSerializer,
     CompanyDriveReadSerializer,
     CompanyDriveWriteSerializer,
     JobReadSerializer,
-    JobWriteSerializer
+    JobWriteSerializer,
+    DriveNotificationSerializer,
+    EligibleStudentSerializer,
+    JobEligibilitySerializer,
+    RankedJobSerializer,
+    CutoffSimulationSerializer,
+    DriveEligibilitySnapshotSerializer,
+    SavedSearchSerializer,
+    SavedSearchMatchSerializer
 )
-from django.db.models import F
+from django.db.models import F, Q, Count
+from django.utils import timezone
+from apps.students.models import StudentProfile
+from .eligibility import (
+    eligible_students_q, annotate_job_eligibility, eligibility_cache, EligibilityCache, simulate_cutoffs,
+)
+from .ranking import rank_jobs
 
 class PlacementDriveViewSet(BaseViewSet):
     """
@@ -47,6 +61,8 @@ class CompanyDriveViewSet(BaseViewSet):
         
         This works for both standard actions (list, retrieve) and custom actions (jobs, etc.)
         """
+        if self.action == 'eligibility_snapshot':
+            return [permissions.IsAuthenticated(), IsPlacementTeam()]
         # SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS') - these are read-only operations
         if self.request.method in permissions.SAFE_METHODS:
             return [permissions.IsAuthenticated()]
@@ -80,6 +96,40 @@ class CompanyDriveViewSet(BaseViewSet):
             message=f"Jobs retrieved for {company_drive.company.name} drive"
         )
 
+    @action(detail=True, methods=['get'], url_path='eligibility-snapshot')
+    def eligibility_snapshot(self, request, pk=None):
+        """
+        Each student's eligibility for this drive's jobs, frozen at the application deadline.
+        URL: GET /api/v1/placements/company-drives/{id}/eligibility-snapshot/
+
+        Optional filters: ?job=<id>, ?is_eligible=true|false, ?has_applied=true|false
+        """
+        company_drive = self.get_object()
+        if company_drive.eligibility_snapshot_at is None:
+            return NotFoundResponse(message="No eligibility snapshot has been taken for this drive yet.")
+
+        snapshots = DriveEligibilitySnapshot.objects.filter(company_drive=company_drive).select_related(
+            'job', 'program', 'student__user'
+        )
+        job_id = request.query_params.get('job')
+        if job_id and job_id.isdigit():
+            snapshots = snapshots.filter(job_id=int(job_id))
+        for field in ('is_eligible', 'has_applied'):
+            value = request.query_params.get(field)
+            if value is not None:
+                snapshots = snapshots.filter(**{field: value.lower() in ('true', '1')})
+
+        page = self.paginate_queryset(snapshots)
+        if page is not None:
+            serializer = DriveEligibilitySnapshotSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = DriveEligibilitySnapshotSerializer(snapshots, many=True)
+        return SuccessResponse(
+            data=serializer.data,
+            message=f"Eligibility snapshot retrieved for {company_drive.company.name} drive"
+        )
+
 
 class JobViewSet(BaseViewSet):
     """
@@ -115,7 +165,223 @@ class JobViewSet(BaseViewSet):
         - GET requests (read operations): Any authenticated user
         - POST/PUT/PATCH/DELETE (write operations): Admin only
         """
+        if self.action in ('eligible_students', 'eligibility_cache_stats'):
+            return [permissions.IsAuthenticated(), IsPlacementTeam()]
+        if self.action in ('eligible', 'ranked'):
+            return [permissions.IsAuthenticated(), IsStudentRole()]
         if self.request.method in permissions.SAFE_METHODS:
             return [permissions.IsAuthenticated()]
         else:
-            return [permissions.IsAuthenticated(), IsAdminRole()]
\ No newline at end of file
+            return [permissions.IsAuthenticated(), IsAdminRole()]
+
+    @action(detail=True, methods=['get'], url_path='eligible-students')
+    def eligible_students(self, request, pk=None):
+        """
+        List every student who meets this job's criteria, evaluated as a single SQL query.
+        URL: GET /api/v1/placements/jobs/{id}/eligible-students/
+
+        Optional filters: ?is_placed=true|false, ?is_verified=true|false, ?graduation_year=2026
+        """
+        job = self.get_object()
+        students = StudentProfile.objects.filter(eligible_students_q(job)).select_related(
+            'user', 'program'
+        ).order_by('enrollment_number')
+
+        for field in ('is_placed', 'is_verified'):
+            value = request.query_params.get(field)
+            if value is not None:
+                students = students.filter(**{field: value.lower() in ('true', '1')})
+        graduation_year = request.query_params.get('graduation_year')
+        if graduation_year and graduation_year.isdigit():
+            students = students.filter(graduation_year=int(graduation_year))
+
+        page = self.paginate_queryset(students)
+        if page is not None:
+            serializer = EligibleStudentSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = EligibleStudentSerializer(students, many=True)
+        return SuccessResponse(
+            data=serializer.data,
+            message=f"Eligible students retrieved for {job.title}"
+        )
+
+    @action(detail=False, methods=['get'])
+    def eligible(self, request):
+        """
+        Every job in an open drive whose deadline has not passed, with the current student's
+        eligibility for each one.
+        URL: GET /api/v1/placements/jobs/eligible/
+
+        Jobs are loaded with the student's eligibility evaluated in the same query, so
+        ?eligible_only is filtered in SQL and cache misses on the page cost no extra query.
+        Optional filters: ?eligible_only=true, ?company_drive=<id>
+        """
+        try:
+            student = StudentProfile.objects.select_related('program').get(user=request.user)
+        except StudentProfile.DoesNotExist:
+            return NotFoundResponse(message="Student profile not found.")
+
+        now = timezone.now()
+        jobs = annotate_job_eligibility(
+            self.filter_queryset(self.get_queryset()).filter(
+                Q(company_drive__application_deadline__isnull=True) | Q(company_drive__application_deadline__gt=now),
+                company_drive__status='Open'
+            ),
+            student
+        ).order_by('company_drive__application_deadline', 'id')
+
+        if request.query_params.get('eligible_only', '').lower() in ('true', '1'):
+            jobs = jobs.filter(is_eligible=True)
+
+        page = self.paginate_queryset(jobs)
+        rows = list(jobs if page is None else page)
+        eligibility = eligibility_cache.get_many_reasons(student, rows)
+
+        context = {**self.get_serializer_context(), 'eligibility': eligibility}
+        serializer = JobEligibilitySerializer(rows, many=True, context=context)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return SuccessResponse(data=serializer.data, message="Eligible jobs retrieved successfully")
+
+    @action(detail=False, methods=['get'])
+    def ranked(self, request):
+        """
+        The open jobs the current student is eligible for, best match first.
+        URL: GET /api/v1/placements/jobs/ranked/
+
+        Scores combine pay for the student's degree level, deadline proximity and job mode
+        preference (see apps.placements.ranking); pay scores are precomputed per program.
+        Optional: ?job_mode=Remote,Hybrid (preferred job modes, most preferred first)
+        """
+        try:
+            student = StudentProfile.objects.select_related('program').get(user=request.user)
+        except StudentProfile.DoesNotExist:
+            return NotFoundResponse(message="Student profile not found.")
+
+        preferred_job_modes = [
+            mode.strip() for mode in request.query_params.get('job_mode', '').split(',') if mode.strip()
+        ]
+        ranked = rank_jobs(student, preferred_job_modes)
+
+        page = self.paginate_queryset(ranked)
+        rows = ranked if page is None else page
+        scores = dict(rows)
+        jobs = {job.pk: job for job in self.get_queryset().filter(pk__in=scores)}
+        jobs = [jobs[job_id] for job_id, _ in rows if job_id in jobs]
+
+        context = {**self.get_serializer_context(), 'scores': scores}
+        serializer = RankedJobSerializer(jobs, many=True, context=context)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return SuccessResponse(data=serializer.data, message="Ranked jobs retrieved successfully")
+
+    @action(detail=False, methods=['get'], url_path='eligibility-cache-stats')
+    def eligibility_cache_stats(self, request):
+        """
+        Hit/miss counters of the eligibility cache in this worker process.
+        URL: GET /api/v1/placements/jobs/eligibility-cache-stats/
+        """
+        return SuccessResponse(data=EligibilityCache.stats(), message="Eligibility cache stats retrieved successfully")
+
+    @action(detail=False, methods=['post'], url_path='simulate-cutoffs')
+    def simulate_cutoffs(self, request):
+        """
+        What-if simulator for proposed job criteria - ADMIN ONLY (POST = write permissions).
+        URL: POST /api/v1/placements/jobs/simulate-cutoffs/
+
+        Returns how many students would be eligible, broken down by program, degree level and
+        joining year, plus CGPA and 10th/12th percentage histograms around each cutoff. Nothing is saved.
+        """
+        serializer = CutoffSimulationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return ValidationErrorResponse(errors=serializer.errors)
+
+        result = simulate_cutoffs(
+            serializer.get_criteria(),
+            serializer.get_program_ids(),
+            students=serializer.get_students()
+        )
+        return SuccessResponse(data=result, message="Cutoff simulation completed successfully")
+
+
+class DriveNotificationViewSet(BaseViewSet):
+    """
+    Read-only access to drive announcements, so the placement team can poll the
+    progress of a notification returned when a CompanyDrive or Job was created.
+    URL: GET /api/v1/placements/drive-notifications/{id}/
+    """
+    queryset = DriveNotification.objects.all().select_related('company_drive').order_by('-created_at')
+    serializer_class = DriveNotificationSerializer
+    permission_classes = [permissions.IsAuthenticated, IsPlacementTeam]
+    http_method_names = ['get', 'head', 'options']
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['company_drive', 'status']
+
+
+class SavedSearchViewSet(BaseViewSet):
+    """
+    A student's saved job searches - STUDENT ONLY
+    New jobs are matched against saved searches when they are posted, so students read their
+    matches here instead of polling the jobs list.
+    URL: /api/v1/placements/saved-searches/
+    """
+    serializer_class = SavedSearchSerializer
+    permission_classes = [permissions.IsAuthenticated, IsStudentRole]
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(student__user=self.request.user).annotate(
+            unseen_matches=Count('matches', filter=Q(matches__seen_at__isnull=True))
+        ).order_by('-created_at')
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['student_profile'] = StudentProfile.objects.filter(user=self.request.user).first()
+        return context
+
+    def create(self, request, *args, **kwargs):
+        if self.get_serializer_context()['student_profile'] is None:
+            return NotFoundResponse(message="Student profile not found.")
+        return super().create(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    def matches(self, request):
+        """
+        Jobs that matched the student's saved searches, newest first.
+        URL: GET /api/v1/placements/saved-searches/matches/
+
+        Optional filters: ?unseen=true, ?saved_search=<id>
+        """
+        matches = SavedSearchMatch.objects.filter(saved_search__student__user=request.user).select_related(
+            'saved_search', 'job__company_drive__company'
+        )
+        if request.query_params.get('unseen', '').lower() in ('true', '1'):
+            matches = matches.filter(seen_at__isnull=True)
+        saved_search = request.query_params.get('saved_search')
+        if saved_search and saved_search.isdigit():
+            matches = matches.filter(saved_search_id=int(saved_search))
+
+        page = self.paginate_queryset(matches)
+        if page is not None:
+            serializer = SavedSearchMatchSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = SavedSearchMatchSerializer(matches, many=True)
+        return SuccessResponse(data=serializer.data, message="Saved search matches retrieved successfully")
+
+    @action(detail=False, methods=['post'], url_path='mark-seen')
+    def mark_seen(self, request):
+        """
+        Marks the student's unseen matches as seen: all of them, or only the given ids.
+        URL: POST /api/v1/placements/saved-searches/mark-seen/
+        Body: {"ids": [1, 2, 3]} (optional)
+        """
+        matches = SavedSearchMatch.objects.filter(saved_search__student__user=request.user, seen_at__isnull=True)
+        ids = request.data.get('ids')
+        if ids is not None:
+            if not isinstance(ids, list) or not all(isinstance(match_id, int) for match_id in ids):
+                return ValidationErrorResponse(errors={'ids': ["Must be a list of match ids."]})
+            matches = matches.filter(pk__in=ids)
+
+        updated = matches.update(seen_at=timezone.now())
+        return SuccessResponse(data={'marked_seen': updated}, message=f"{updated} matches marked as seen")
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class StudentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.students'
+
+    def ready(self):
+        # Connects the receivers that keep StudentProfile.graduation_year up to date.
+        import apps.students.signals
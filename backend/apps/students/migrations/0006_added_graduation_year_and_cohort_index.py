@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:04
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_graduation_year(apps, schema_editor):
+    """One UPDATE per program: graduation_year = joining_year + duration_years - 1."""
+    Program = apps.get_model('core', 'Program')
+    StudentProfile = apps.get_model('students', 'StudentProfile')
+    for program_id, duration_years in Program.objects.values_list('id', 'duration_years'):
+        StudentProfile.objects.filter(program_id=program_id).update(
+            graduation_year=F('joining_year') + (duration_years - 1)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_alter_city_options_alter_country_options_and_more'),
+        ('students', '0005_added_validation_in_student_verification'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentprofile',
+            name='graduation_year',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_graduation_year, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='studentprofile',
+            index=models.Index(fields=['program', 'graduation_year', 'is_placed'], name='student_cohort_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0006_added_graduation_year_and_cohort_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentprofile',
+            name='eligibility_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
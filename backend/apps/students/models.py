@@ -1,7 +1,32 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from cloudinary.models import CloudinaryField
 
+
+class StudentProfileQuerySet(models.QuerySet):
+    """
+    Cohort queries for StudentProfile.
+
+    A cohort is the set of students of a program who graduate in a given year. These lookups are
+    served by the (program, graduation_year, is_placed) index as a single index range scan.
+    """
+    def graduating_in(self, year, program_ids=None):
+        """Students graduating in `year`, optionally restricted to the given programs."""
+        queryset = self.filter(graduation_year=year)
+        if program_ids is not None:
+            queryset = queryset.filter(program_id__in=program_ids)
+        return queryset
+
+    def final_year(self, program_ids=None):
+        """Students in their final year, i.e. graduating in the current calendar year."""
+        return self.graduating_in(timezone.now().year, program_ids)
+
+    def notifiable(self):
+        """Students who should still receive placement announcements."""
+        return self.filter(is_placed=False, user__is_active=True)
+
+
 class StudentProfile(models.Model):
     GENDER_CHOICES = [
         ('Male', 'Male'), 
@@ -33,15 +58,41 @@ class StudentProfile(models.Model):
     tenth_percentage = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     twelfth_percentage = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     joining_year = models.IntegerField(null=False, blank=False,default=2024) 
+    # Derived from joining_year and program.duration_years; maintained in save() and
+    # whenever a program's duration changes (see apps.students.signals).
+    graduation_year = models.IntegerField(null=True, blank=True, editable=False)
     is_placed = models.BooleanField(default=False)
     is_verified = models.BooleanField(default=False)
+    # Incremented whenever a field used by job eligibility changes (see apps.students.signals),
+    # so cached eligibility decisions for the old values are never read again.
+    eligibility_version = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = StudentProfileQuerySet.as_manager()
+
     def __str__(self):
         return self.user.get_full_name() or self.user.username
+
+    @staticmethod
+    def compute_graduation_year(joining_year, duration_years):
+        """The calendar year in which a student of a `duration_years` program joining in `joining_year` graduates."""
+        return joining_year + duration_years - 1
+
+    def save(self, *args, **kwargs):
+        self.graduation_year = (
+            self.compute_graduation_year(self.joining_year, self.program.duration_years)
+            if self.program_id else None
+        )
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'joining_year', 'program', 'program_id'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'graduation_year'}
+        super().save(*args, **kwargs)
     
     class Meta:
+        indexes = [
+            models.Index(fields=['program', 'graduation_year', 'is_placed'], name='student_cohort_idx'),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=~models.Q(is_verified=True) | 
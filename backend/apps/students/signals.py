@@ -0,0 +1,72 @@
+"""
+Signal Handlers for the Students App.
+
+SIGNAL HANDLERS:
+===============
+- sync_graduation_years: Keeps StudentProfile.graduation_year in step with Program.duration_years
+- bump_eligibility_version: Invalidates cached job eligibility when a student's academic data changes
+"""
+from django.db.models import F
+from django.dispatch import receiver
+from apps.core.models import Program
+from django.db.models.signals import pre_save, post_save
+from .models import StudentProfile
+
+
+# The StudentProfile fields that job eligibility is evaluated on (see apps.placements.eligibility).
+ELIGIBILITY_FIELDS = ('program_id', 'current_cgpa', 'tenth_percentage', 'twelfth_percentage', 'active_backlogs')
+
+
+@receiver(pre_save, sender=Program)
+def remember_previous_duration(sender, instance, **kwargs):
+    """Stores the duration and level currently in the database so post_save can tell whether they changed."""
+    previous = (
+        Program.objects.filter(pk=instance.pk).values('duration_years', 'degree_level').first()
+        if instance.pk else None
+    ) or {}
+    instance._previous_duration_years = previous.get('duration_years')
+    instance._previous_degree_level = previous.get('degree_level')
+
+
+@receiver(post_save, sender=Program)
+def sync_graduation_years(sender, instance, created, **kwargs):
+    """
+    Recomputes the stored graduation year of every student in a program whose duration changed,
+    with a single UPDATE statement. A change of degree level (which selects the UG or PG CGPA
+    cutoff) invalidates the cached eligibility of the program's students.
+    """
+    if created:
+        return
+
+    if getattr(instance, '_previous_duration_years', None) != instance.duration_years:
+        StudentProfile.objects.filter(program=instance).update(
+            graduation_year=F('joining_year') + (instance.duration_years - 1)
+        )
+    if getattr(instance, '_previous_degree_level', None) != instance.degree_level:
+        StudentProfile.objects.filter(program=instance).update(
+            eligibility_version=F('eligibility_version') + 1
+        )
+
+
+@receiver(pre_save, sender=StudentProfile)
+def remember_eligibility_fields(sender, instance, **kwargs):
+    """Stores the eligibility fields currently in the database so post_save can tell whether they changed."""
+    instance._previous_eligibility = (
+        StudentProfile.objects.filter(pk=instance.pk).values(*ELIGIBILITY_FIELDS, 'eligibility_version').first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=StudentProfile)
+def bump_eligibility_version(sender, instance, created, **kwargs):
+    """
+    Increments the student's eligibility version if any field used by job eligibility changed.
+    """
+    previous = getattr(instance, '_previous_eligibility', None)
+    if created or previous is None:
+        return
+    if all(previous[field] == getattr(instance, field) for field in ELIGIBILITY_FIELDS):
+        return
+
+    StudentProfile.objects.filter(pk=instance.pk).update(eligibility_version=F('eligibility_version') + 1)
+    instance.eligibility_version = previous['eligibility_version'] + 1
@@ -171,7 +171,7 @@ CORS_ALLOW_METHODS = [
 ]
 CORS_ALLOW_HEADERS = [
     'accept', 'accept-encoding', 'authorization', 'content-type', 'dnt',
-    'origin', 'user-agent', 'x-csrftoken', 'x-requested-with',
+    'origin', 'user-agent', 'x-csrftoken', 'x-requested-with', 'idempotency-key',
 ]
 
 # --- Static Files ---
@@ -196,7 +196,90 @@ EMAIL_BACKEND = "anymail.backends.brevo.EmailBackend"
 ANYMAIL = {
     "BREVO_API_KEY": config("BREVO_API_KEY"),  # stored in Render env
 }
-DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL') 
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL')
+
+# Background email delivery (see apps.core.tasks.EmailDispatcher).
+# A fixed pool of worker threads per process, fed by a bounded queue.
+EMAIL_WORKER_COUNT = config('EMAIL_WORKER_COUNT', default=4, cast=int)
+EMAIL_QUEUE_MAXSIZE = config('EMAIL_QUEUE_MAXSIZE', default=1000, cast=int)
+# Seconds a caller waits for queue space before sending in its own thread.
+EMAIL_ENQUEUE_TIMEOUT = config('EMAIL_ENQUEUE_TIMEOUT', default=5.0, cast=float)
+# Seconds a stopping worker process waits for queued emails to drain.
+EMAIL_SHUTDOWN_TIMEOUT = config('EMAIL_SHUTDOWN_TIMEOUT', default=30.0, cast=float)
+# Maximum recipients per batch API call for bulk sends (e.g. drive notifications).
+EMAIL_BATCH_SIZE = config('EMAIL_BATCH_SIZE', default=500, cast=int)
+# Number of rendered bulk emails kept in memory by apps.core.utils.email_renderer.
+EMAIL_RENDER_CACHE_SIZE = config('EMAIL_RENDER_CACHE_SIZE', default=128, cast=int)
+
+# In-process stand-in for the email provider, used by `python manage.py benchmark_drive_notifications`
+# or for local development (EMAIL_BACKEND=apps.core.email_backends.FakeESPBackend).
+EMAIL_FAKE_LATENCY_MS = config('EMAIL_FAKE_LATENCY_MS', default=100, cast=float)
+EMAIL_FAKE_LATENCY_JITTER_MS = config('EMAIL_FAKE_LATENCY_JITTER_MS', default=0, cast=float)
+EMAIL_FAKE_ERROR_RATE = config('EMAIL_FAKE_ERROR_RATE', default=0.0, cast=float)
+
+# Durable outbox retries (see `python manage.py process_email_outbox`).
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+# Retry delay is base * 2^(attempt - 1) seconds, capped at the maximum.
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = config('EMAIL_OUTBOX_RETRY_BASE_SECONDS', default=30, cast=int)
+EMAIL_OUTBOX_RETRY_MAX_SECONDS = config('EMAIL_OUTBOX_RETRY_MAX_SECONDS', default=3600, cast=int)
+# Seconds after which an email stuck in 'Sending' (its worker died) is claimed again.
+EMAIL_OUTBOX_CLAIM_TIMEOUT = config('EMAIL_OUTBOX_CLAIM_TIMEOUT', default=300, cast=int)
+
+# --- Logging ---
+# Email delivery (apps.core) logs one JSON line per send attempt, with the template,
+# recipient count, render/send latency and any error, for monitoring provider slowdowns.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'apps.core.log_formatters.JSONFormatter'},
+    },
+    'handlers': {
+        'json_console': {'class': 'logging.StreamHandler', 'formatter': 'json'},
+    },
+    'loggers': {
+        'apps.core': {
+            'handlers': ['json_console'],
+            'level': config('CORE_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# --- Placement Notifications ---
+# A drive is announced once it has received no new jobs for this many seconds,
+# so adding several jobs in a row results in a single announcement.
+DRIVE_NOTIFICATION_COALESCE_SECONDS = config('DRIVE_NOTIFICATION_COALESCE_SECONDS', default=120, cast=int)
+# Seconds after which a notification stuck in 'Running' (its process died mid-send) is claimed again.
+DRIVE_NOTIFICATION_RUNNING_TIMEOUT = config('DRIVE_NOTIFICATION_RUNNING_TIMEOUT', default=900, cast=int)
+# Opt-in: instead of one email per drive, students receive one digest of all new drives
+# each time `python manage.py send_drive_digest` runs (e.g. daily from a cron job).
+DRIVE_NOTIFICATION_DIGEST = config('DRIVE_NOTIFICATION_DIGEST', default=False, cast=bool)
+# Seconds a cached student/job eligibility decision is kept. Entries are versioned, so a change
+# to a student's academic data or a job's criteria takes effect immediately regardless.
+ELIGIBILITY_CACHE_TIMEOUT = config('ELIGIBILITY_CACHE_TIMEOUT', default=3600, cast=int)
+# Weights of the personalized job ranking (see apps.placements.ranking): pay for the student's
+# degree level, closeness of the application deadline, and match with the preferred job mode.
+JOB_RANKING_WEIGHTS = {
+    'pay': config('JOB_RANKING_PAY_WEIGHT', default=0.5, cast=float),
+    'deadline': config('JOB_RANKING_DEADLINE_WEIGHT', default=0.3, cast=float),
+    'job_mode': config('JOB_RANKING_JOB_MODE_WEIGHT', default=0.2, cast=float),
+}
+# Deadlines further away than this many days do not add to a job's ranking.
+JOB_RANKING_DEADLINE_HORIZON_DAYS = config('JOB_RANKING_DEADLINE_HORIZON_DAYS', default=14, cast=int)
+# Upper limit on saved job searches per student; each one is checked whenever a job is posted.
+MAX_SAVED_SEARCHES_PER_STUDENT = config('MAX_SAVED_SEARCHES_PER_STUDENT', default=20, cast=int)
+
+# --- Applications ---
+# Rows of an uploaded round results file that are looked up and applied together, in one transaction.
+RESULT_IMPORT_CHUNK_SIZE = config('RESULT_IMPORT_CHUNK_SIZE', default=500, cast=int)
+
+# --- Idempotency Keys ---
+# How long (in seconds) the first response to a POST with an Idempotency-Key is replayed to retries.
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=86400, cast=int)
+# A key still in progress after this many seconds is assumed abandoned and may be taken over by a retry.
+IDEMPOTENCY_KEY_LOCK_TIMEOUT = config('IDEMPOTENCY_KEY_LOCK_TIMEOUT', default=60, cast=int)
+
 # --- Frontend Configuration ---
 # The base URL for your frontend application. 
 # This is used to construct absolute URLs in emails (e.g., for password reset links).
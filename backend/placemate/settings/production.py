@@ -64,7 +64,7 @@ CORS_ALLOWED_ORIGINS = [
 # Add these CORS settings:
 CORS_ALLOW_ALL_ORIGINS = False
 CORS_ALLOW_CREDENTIALS = True
-CORS_EXPOSE_HEADERS = ['Content-Type', 'X-CSRFToken']
+CORS_EXPOSE_HEADERS = ['Content-Type', 'X-CSRFToken', 'Idempotent-Replayed']
 
 # A list of trusted origins for CSRF protection.
 CSRF_TRUSTED_ORIGINS = [